@@ -17,7 +17,7 @@
 import os
 import json
 from pathlib import Path
-from flask import Flask, request, render_template, jsonify, url_for
+from flask import Flask, request, render_template, jsonify, url_for, Response, stream_with_context
 from dotenv import load_dotenv
 
 # 환경변수 로드
@@ -128,11 +128,83 @@ def api_chat():
         print(f"[ERROR] 응답 생성 실패: {e}")
         return jsonify({'reply': '죄송해요, 일시적인 오류가 발생했어요. 다시 시도해주세요.'}), 500
 
+# API 엔드포인트: 챗봇 응답 스트리밍 (Server-Sent Events)
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    data = request.get_json() or {}
+    user_message = data.get('message', '')
+    username = data.get('username', '사용자')
+    
+    if not user_message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    try:
+        from services import get_chatbot_service
+        chatbot = get_chatbot_service()
+    except ImportError as e:
+        print(f"[ERROR] 챗봇 서비스 임포트 실패: {e}")
+        return jsonify({'reply': '챗봇 서비스를 불러올 수 없습니다. services/chatbot_service.py를 구현해주세요.'}), 500
+    
+    def event_stream():
+        try:
+            for event, payload in chatbot.stream_response(user_message, username):
+                yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            print(f"[ERROR] 스트리밍 응답 실패: {e}")
+            error = {'reply': '죄송해요, 일시적인 오류가 발생했어요. 다시 시도해주세요.'}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+    
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# API 엔드포인트: 백그라운드 작업 상태 조회 (편지 생성 등 - 응답의 letter_job으로 폴링)
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    try:
+        from services import get_chatbot_service
+        chatbot = get_chatbot_service()
+    except ImportError as e:
+        print(f"[ERROR] 챗봇 서비스 임포트 실패: {e}")
+        return jsonify({'error': '챗봇 서비스를 불러올 수 없습니다.'}), 500
+    
+    # username은 클라이언트가 보내는 값이라 신원 확인이 안 됨 → 대조하지 않음.
+    # 작업 id(uuid4)는 요청한 사용자의 응답으로만 전달되므로 id 자체가 조회 권한
+    job = chatbot.jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
 # 헬스체크 엔드포인트 (Vercel용)
 @app.route('/health')
 def health():
     return jsonify({'status': 'ok', 'chatbot': config.get('name', 'unknown')})
 
+# 헬스체크: 프로세스 생존 여부 (liveness)
+@app.route('/health/live')
+def health_live():
+    return jsonify({'status': 'ok'})
+
+# 헬스체크: 트래픽을 받을 준비가 되었는지 (readiness - 워밍업 완료 + 인덱싱 종료)
+@app.route('/health/ready')
+def health_ready():
+    try:
+        from services import peek_chatbot_service, start_background_warmup
+    except ImportError as e:
+        print(f"[ERROR] 챗봇 서비스 임포트 실패: {e}")
+        return jsonify({'ready': False, 'reason': 'import_failed'}), 503
+    
+    chatbot = peek_chatbot_service()
+    if chatbot is None or not chatbot.readiness()['warmed_up']:
+        # preload 없이 띄운 경우(개발 서버) 첫 프로브가 백그라운드 초기화를 시작
+        start_background_warmup()
+    if chatbot is None:
+        return jsonify({'ready': False, 'reason': 'initializing'}), 503
+    status = chatbot.readiness()
+    return jsonify(status), (200 if status['ready'] else 503)
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
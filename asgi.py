@@ -0,0 +1,128 @@
+"""
+ASGI 엔트리포인트 (async 경로)
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+- /api/chat, /api/chat/stream: ChatbotService.agenerate_response / astream_response를 이벤트 루프에서 직접 처리
+  → 대화 하나가 OS 스레드를 점유하지 않으므로 프로세스 하나로 수백 개의 대화를 동시에 유지
+- 그 외 페이지/정적 파일/헬스체크: Flask 앱(app.py)을 asgiref WsgiToAsgi로 그대로 사용
+- 서비스는 lifespan startup에서 생성 + 워밍업 (첫 요청이 초기화를 기다리지 않음)
+- 프로세스 1개로만 실행 (--workers 미지원: 세션 캐시/작업 큐가 프로세스 메모리에 있음)
+"""
+
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+from app import app as flask_app  # noqa: E402
+
+ERROR_REPLY = {'reply': '죄송해요, 일시적인 오류가 발생했어요. 다시 시도해주세요.'}
+IMPORT_ERROR_REPLY = {'reply': '챗봇 서비스를 불러올 수 없습니다. services/chatbot_service.py를 구현해주세요.'}
+
+flask_asgi = WsgiToAsgi(flask_app)
+_service = None
+
+
+async def _startup():
+    global _service
+    import asyncio
+    from services import get_chatbot_service
+
+    _service = await asyncio.to_thread(get_chatbot_service)
+    await asyncio.to_thread(_service.warmup)
+
+
+async def _read_json(receive) -> dict:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(body or b"{}") or {}
+    except ValueError:
+        return {}
+
+
+async def _send_json(send, payload: dict, status: int = 200):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def api_chat(scope, receive, send):
+    data = await _read_json(receive)
+    user_message = data.get('message', '')
+    username = data.get('username', '사용자')
+    if not user_message:
+        return await _send_json(send, {'error': 'Message is required'}, 400)
+    if _service is None:
+        return await _send_json(send, IMPORT_ERROR_REPLY, 500)
+    try:
+        response = await _service.agenerate_response(user_message, username)
+    except Exception as e:
+        print(f"[ERROR] 응답 생성 실패: {e}")
+        return await _send_json(send, ERROR_REPLY, 500)
+    await _send_json(send, response)
+
+
+async def api_chat_stream(scope, receive, send):
+    data = await _read_json(receive)
+    user_message = data.get('message', '')
+    username = data.get('username', '사용자')
+    if not user_message:
+        return await _send_json(send, {'error': 'Message is required'}, 400)
+    if _service is None:
+        return await _send_json(send, IMPORT_ERROR_REPLY, 500)
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no")],
+    })
+    try:
+        async for event, payload in _service.astream_response(user_message, username):
+            chunk = f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+    except Exception as e:
+        print(f"[ERROR] 스트리밍 응답 실패: {e}")
+        chunk = f"event: error\ndata: {json.dumps(ERROR_REPLY, ensure_ascii=False)}\n\n"
+        await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+ROUTES = {
+    ("POST", "/api/chat"): api_chat,
+    ("POST", "/api/chat/stream"): api_chat_stream,
+}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await _startup()
+                except Exception as e:
+                    print(f"[ERROR] 챗봇 서비스 초기화 실패: {e}")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    handler = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if handler is None:
+        return await flask_asgi(scope, receive, send)
+    await handler(scope, receive, send)
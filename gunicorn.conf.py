@@ -0,0 +1,39 @@
+"""
+gunicorn 설정 (프로덕션 서빙)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- WEB_WORKERS : 워커 프로세스 수 (1만 지원 - 동시성은 WEB_THREADS로)
+- WEB_THREADS : 워커당 동시 요청 수 (gthread, SSE 스트림 하나가 스레드 하나를 점유)
+- WEB_TIMEOUT : 요청 타임아웃(초) - LLM 응답/편지 생성이 길 수 있어 넉넉히
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_WORKERS", "1"))
+if workers > 1:
+    # 세션 캐시 / 편지·요약 작업 큐 / 유저별 턴 락이 워커 프로세스 메모리에 있어서,
+    # 같은 유저의 요청이 다른 워커로 가면 이전 상태를 보거나(저장소가 version 충돌로 그 턴을 버림)
+    # /api/jobs 조회가 404가 됨 → 경고만 하고 띄우지 않고 기동을 막음
+    raise RuntimeError(f"WEB_WORKERS={workers}: 워커 프로세스는 1개만 지원합니다. WEB_THREADS로 동시성을 늘리세요")
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "16"))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# master에서 wsgi.py를 import하며 서비스 생성/워밍업 → 준비가 끝난 뒤에 포트를 열고 워커를 fork
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    print(f"[gunicorn] 워커 {workers}개 × 스레드 {threads}개로 서빙 시작 ({bind})")
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.after_fork()
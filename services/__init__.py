@@ -4,6 +4,6 @@ Services 패키지
 이 패키지는 챗봇의 비즈니스 로직을 담당합니다.
 """
 
-from .chatbot_service import get_chatbot_service
+from .chatbot_service import get_chatbot_service, peek_chatbot_service, start_background_warmup
 
-__all__ = ['get_chatbot_service']
+__all__ = ['get_chatbot_service', 'peek_chatbot_service', 'start_background_warmup']
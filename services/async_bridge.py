@@ -0,0 +1,56 @@
+"""
+동기 턴 로직을 asyncio 이벤트 루프에서 스레드 없이 실행하기 위한 greenlet 브리지
+
+ChatbotService._generate_response는 동기 코드지만, greenlet_spawn으로 실행하면
+그 안의 await_only(coro) 호출이 코루틴을 이벤트 루프 쪽으로 넘겨 await하고, 결과를 받아 이어서 실행함
+(SQLAlchemy asyncio 확장과 같은 방식). 네트워크 대기 동안 OS 스레드를 점유하지 않음.
+
+greenlet이 설치되어 있지 않으면 available()이 False → 호출 측에서 스레드 실행으로 대체
+"""
+
+import sys
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - 선택 의존성
+    greenlet = None
+
+
+def available() -> bool:
+    return greenlet is not None
+
+
+if greenlet is not None:
+    class _BridgeGreenlet(greenlet.greenlet):
+        """greenlet_spawn이 만든 greenlet (await_only가 호출 가능한 구간 표시)"""
+
+        def __init__(self, fn, driver):
+            super().__init__(fn, driver)
+            self.driver = driver
+
+
+def in_async_context() -> bool:
+    """현재 코드가 greenlet_spawn 안에서 실행 중인지 (await_only 사용 가능 여부)"""
+    return greenlet is not None and isinstance(greenlet.getcurrent(), _BridgeGreenlet)
+
+
+def await_only(awaitable):
+    """greenlet_spawn 안에서 awaitable을 이벤트 루프에 넘기고 결과가 나올 때까지 대기"""
+    current = greenlet.getcurrent() if greenlet is not None else None
+    if not isinstance(current, _BridgeGreenlet):
+        raise RuntimeError("await_only는 greenlet_spawn 안에서만 호출할 수 있습니다")
+    return current.driver.switch(awaitable)
+
+
+async def greenlet_spawn(fn, *args, **kwargs):
+    """동기 함수 fn을 greenlet에서 실행하며, fn 안의 await_only 호출을 이 코루틴에서 대신 await"""
+    context = _BridgeGreenlet(fn, greenlet.getcurrent())
+    result = context.switch(*args, **kwargs)
+    while not context.dead:
+        try:
+            value = await result
+        except BaseException:
+            result = context.throw(*sys.exc_info())
+        else:
+            result = context.switch(value)
+    return result
@@ -7,11 +7,26 @@
 
 import os
 import json
+import asyncio
+import atexit
+import hashlib
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
-import chromadb
 import threading
+from concurrent.futures import CancelledError
+from contextlib import asynccontextmanager, contextmanager
+
+from .async_bridge import available as async_bridge_available, await_only, greenlet_spawn, in_async_context
+from .embedding_store import EmbeddingStore, wrap_langchain_embeddings
+from .emotion_classifier import LexiconEmotionClassifier
+from .intent_detector import IntentDetector
+from .job_queue import DONE, QUEUED, RUNNING, JobQueue
+from .persona_index import PersonaIndex
+from .prompt_fragments import PromptFragments
+from .session_cache import SessionCache
+from .session_store import LazyHistory, Message, WriteBehindSessionWriter, create_session_store
+
+# openai / chromadb / numpy(vector_index) / langchain은 무거워서 필요한 시점에 import (콜드 스타트 단축)
 
 # 환경변수 로드
 load_dotenv()
@@ -30,7 +45,17 @@ MAX_DRAWER_CONVERSATIONS = 30 # 서랍에서의 최대 대화 횟수
 
 
 class PostOfficeSession:
-    """별빛 우체국 세션 관리"""
+    """별빛 우체국 세션 관리 (__slots__: 상주 세션이 많을 때 인스턴스 __dict__ 비용 제거)"""
+    
+    __slots__ = (
+        "username", "phase", "intro_step", "selected_room", "selected_drawer",
+        "conversation_history", "room_conversation_count", "drawer_conversation_count",
+        "letter_content", "stamp_image", "summary_text", "last_summary_messages_len",
+        "last_intent_key", "repeated_intent_count", "crisis_cooldown", "crisis_mode_active",
+        "crisis_emotion_shown", "crisis_recovery_count", "awaiting_letter_confirm",
+        "awaiting_room_change_confirm", "requested_new_room", "awaiting_reenter_confirm",
+        "used_persona_stories", "used_persona_categories", "last_emotion", "repetition_window",
+    )
     
     def __init__(self, username: str):
         self.username = username
@@ -70,16 +95,15 @@ class PostOfficeSession:
         self.used_persona_categories = set()  # deprecated, used_persona_stories로 대체됨
         # 감정 추적 (변화 감지용)
         self.last_emotion = "기본"  # 마지막 출력된 감정
+        # 의미 반복 감지: 최근 유저 메시지의 정규화 임베딩 창 (메모리 전용, 저장하지 않음)
+        self.repetition_window = None
         
     def add_message(self, role: str, content: str):
         """대화 기록 추가"""
-        self.conversation_history.append({
-            "role": role,
-            "content": content
-        })
+        self.conversation_history.append(Message(role, content))
     
-    def get_summary(self) -> str:
-        """전체 대화 요약 (편지 생성용) - 배포용: 긴 대화 지원"""
+    def summary_parts(self) -> tuple:
+        """get_summary의 재료: (장기 요약, 함께 들어가는 유저 메시지 목록)"""
         # 요약이 있으면 요약을 우선 사용하고, 최근 대화만 추가
         if self.summary_text:
             # 최근 30개 사용자 메시지만 추가 (맥락 보존, 긴 대화 대응)
@@ -87,12 +111,17 @@ class PostOfficeSession:
                 msg['content'] for msg in self.conversation_history[-30:] 
                 if msg['role'] == 'user'
             ]
-            recent_text = " ".join(recent_messages)
-            return f"{self.summary_text}\n\n[최근 대화]\n{recent_text}"
-        else:
-            # 요약이 없으면 전체 사용자 메시지 사용 (초기 대화)
-            messages = [msg['content'] for msg in self.conversation_history if msg['role'] == 'user']
-            return " ".join(messages)
+            return self.summary_text, recent_messages
+        # 요약이 없으면 전체 사용자 메시지 사용 (초기 대화)
+        return "", [msg['content'] for msg in self.conversation_history if msg['role'] == 'user']
+    
+    def get_summary(self) -> str:
+        """전체 대화 요약 (편지 생성용) - 배포용: 긴 대화 지원"""
+        summary_text, messages = self.summary_parts()
+        if summary_text:
+            recent_text = " ".join(messages)
+            return f"{summary_text}\n\n[최근 대화]\n{recent_text}"
+        return " ".join(messages)
 
     def to_dict(self) -> dict:
         return {
@@ -129,7 +158,9 @@ class PostOfficeSession:
         s.intro_step = data.get("intro_step", 0)
         s.selected_room = data.get("selected_room")
         s.selected_drawer = data.get("selected_drawer")
-        s.conversation_history = data.get("conversation_history", [])
+        history = data.get("conversation_history", [])
+        # 저장소가 돌려준 LazyHistory는 그대로, dict 목록(예전 형식/외부 입력)은 Message로 변환
+        s.conversation_history = history if isinstance(history, LazyHistory) else [Message.coerce(m) for m in history]
         s.room_conversation_count = data.get("room_conversation_count", 0)
         s.drawer_conversation_count = data.get("drawer_conversation_count", 0)
         s.letter_content = data.get("letter_content")
@@ -192,40 +223,263 @@ class ChatbotService:
         # 1. Config 로드
         self.config = self._load_config()
         
-        # 2. OpenAI Client
+        # 2. OpenAI Client (openai 패키지 import는 첫 호출 때 - self.client 프로퍼티)
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다!")
-        self.client = OpenAI(api_key=api_key)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._aclient = None  # AsyncOpenAI (이벤트 루프에 묶이므로 async 경로 첫 호출 때 생성)
+        self._aclient_loop = None
         
-        # 3. (중요) 임베딩 캐시를 먼저 초기화
-        self._embedding_cache = {}
+        # 3. (중요) 임베딩 캐시를 먼저 초기화 (디스크 영속 캐시 + LRU 핫 티어, 재기동/워커 간 공유)
+        self._embedding_cache = EmbeddingStore(
+            os.getenv("EMBEDDING_CACHE_PATH", str(BASE_DIR / "static" / "data" / "chatbot" / "embedding_cache.sqlite3")),
+            hot_size=int(os.getenv("EMBEDDING_CACHE_HOT_SIZE", "1000"))
+        )
+
+        # 3-1. 감정 분류 백엔드: local(어휘 분류기) / llm(gpt-4o) / hybrid(저신뢰도일 때만 LLM)
+        self.emotion_backend = os.getenv("EMOTION_BACKEND", "hybrid").lower()
+        self.emotion_min_confidence = float(os.getenv("EMOTION_MIN_CONFIDENCE", "0.55"))
+        self.emotion_classifier = LexiconEmotionClassifier()
 
         # 4. 디버그: RAG 출처 노출 여부
         self.debug_rag = os.getenv("DEBUG_RAG", "0") == "1"
-        self._last_sources = []
+
+        # 4-1. 방 우선 검색: 단일 쿼리 over-fetch 배수 + 전역 fallback 통계
+        self.rag_overfetch = int(os.getenv("RAG_OVERFETCH", "6"))
+        self._rag_stats = {"queries": 0, "fallback": 0, "fallback_hits": 0}
+        self._rag_stats_lock = threading.Lock()
 
         # 5. ChromaDB 초기화 (임베딩 캐시 이후에 수행해야 함)
+        self.vector_backend = os.getenv("VECTOR_BACKEND", "chroma").lower()
         self.loading_embeddings = False
+        self._ingest_thread = None  # 백그라운드 chardb 인덱싱 스레드 (warmup에서 완료 대기)
+        self._warmed_up = False
+        self._warmup_queries = 0
+        self._rooms_ready = set()  # 인덱싱이 끝나 검색 가능한 방
         self.collection = self._init_chromadb()
         
         # 6. RAG-D 상담 매뉴얼 벡터 DB 초기화 (전문 지식)
-        self.counseling_vectordb = self._init_counseling_vectordb()
+        #    COUNSELING_PRELOAD=1이면 매뉴얼 청크를 인메모리 인덱스로 올려 검색
+        #    COUNSELING_INIT_BACKGROUND=1이면 LangChain import + 로드를 백그라운드로 미룸 (그동안 RAG-D 없이 응답)
+        self.counseling_preload = os.getenv("COUNSELING_PRELOAD", "1") == "1"
+        self._counseling_index = None
+        self.counseling_vectordb = None
+        self._counseling_thread = None
+        if os.getenv("COUNSELING_INIT_BACKGROUND", "0") == "1":
+            def _bg_counseling():
+                self.counseling_vectordb = self._init_counseling_vectordb()
+            self._counseling_thread = threading.Thread(target=_bg_counseling, daemon=True)
+            self._counseling_thread.start()
+        else:
+            self.counseling_vectordb = self._init_counseling_vectordb()
         
-        # 7. 페르소나 로드 (부엉이의 개인 정보 - RAG-P)
-        self.persona = self._load_persona()
+        # 7-8. 정적 프롬프트 조각: 페르소나(RAG-P) / 캐릭터 정보 / 상담 원칙 / 페르소나 JSON 덤프
+        #      한 번만 만들고 소스 파일이 바뀌면 다시 만듦 (self.persona / self.character_txt는 이 캐시를 읽음)
+        self._fragments = PromptFragments(check_interval=float(os.getenv("PROMPT_RELOAD_INTERVAL", "2.0")))
+        self._register_prompt_fragments()
+        self._fragments.warm()
         
-        # 8. 캐릭터 정보 로드 (부엉이 말투/특징 - 시스템 프롬프트용)
-        self.character_txt = self._load_character_txt()
+        # 턴 단위 키워드 감지기 (INTENT_TABLE을 한 번만 컴파일, 메시지당 scan() 한 번)
+        self.intent_detector = IntentDetector()
+        # 의미 반복 감지에 쓰는 최근 유저 메시지 수 (임베딩은 세션에 쌓아 두므로 늘려도 API 호출은 그대로)
+        self.repetition_window = int(os.getenv("REPETITION_WINDOW", "3"))
         
         # 9. 세션 관리
-        self.sessions = {}  # {username: PostOfficeSession}
+        # 메모리 상주 세션은 개수 / 메모리 예산 / 유휴 TTL로 제한 (내보낼 때 저장소에 기록)
+        self.sessions = SessionCache(
+            max_sessions=int(os.getenv("SESSION_CACHE_MAX", "1000")),
+            max_bytes=int(float(os.getenv("SESSION_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            ttl=float(os.getenv("SESSION_CACHE_TTL", "3600")),
+            on_evict=self._evict_session
+        )
+        
+        # 9-1. 세션 영속화: dirty 표시 후 백그라운드에서 기록 (write-behind)
+        #      저장소는 SESSION_BACKEND로 선택 (file: JSON 헤더 + append-only 로그 / sqlite: WAL DB)
+        self._session_store = create_session_store(
+            os.getenv("SESSION_BACKEND", "file").lower(),
+            BASE_DIR / "static" / "data" / "chatbot" / "sessions",
+            tail_messages=int(os.getenv("SESSION_TAIL_MESSAGES", "60")),
+            db_path=os.getenv("SESSION_DB_PATH") or None
+        )
+        self._session_writer = WriteBehindSessionWriter(
+            self._session_store,
+            interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "1.0")),
+            session_lock=lambda username: self._user_lock(username, blocking=False),
+            on_conflict=self._discard_session
+        )
+        atexit.register(self._session_writer.close)
+        
+        # 9-2. 유저별 턴 직렬화 락 {username: [Lock, 대기 수]} (동기/async 경로가 같은 표를 공유)
+        self._user_locks = {}
+        self._user_locks_guard = threading.Lock()
+        self._atasks = set()  # astream_response가 띄운 턴 task (GC 방지)
+        
+        # 10. 턴 단위 병렬 조회용 공유 executor (감정 분석 / RAG / RAG-D / RAG-P)
+        from concurrent.futures import ThreadPoolExecutor
+        self.turn_workers = int(os.getenv("TURN_WORKERS", "8"))
+        self._executor = ThreadPoolExecutor(max_workers=self.turn_workers, thread_name_prefix="turn")
+        
+        # 11. 백그라운드 작업 큐: 편지 생성 / 대화 요약처럼 긴 LLM 호출을 요청 경로 밖에서 처리 (/api/jobs/<id>)
+        self.jobs = JobQueue(
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            max_pending=int(os.getenv("JOB_QUEUE_MAX", "64")),
+            ttl=float(os.getenv("JOB_TTL", "600"))
+        )
+        self.letter_async = os.getenv("LETTER_ASYNC", "1") == "1"  # 편지는 작업 id로 먼저 응답, 클라이언트가 완료 확인
+        self.summary_background = os.getenv("SUMMARY_BACKGROUND", "1") == "1"  # 요약은 다음 턴에 반영
+        self._summary_jobs = {}  # {username: 진행 중인 요약 작업 정보}
+        self._letter_jobs = {}  # {username: 응답 후 생성 중인 편지 작업 정보} - 다음 턴 시작 때 세션에 반영
+        
+        # 11-1. 편지 선생성: 서랍 대화가 전환 기준에 가까워지면 편지를 작업 큐에서 미리 만들어 둠
+        #       (요약 + 우표 코드 해시로 구분, 이후 대화가 크게 바뀌면 버리고 전환 시점에 다시 생성)
+        self.letter_precompute = os.getenv("LETTER_PRECOMPUTE", "1") == "1"
+        self.letter_precompute_lead = int(os.getenv("LETTER_PRECOMPUTE_LEAD", "1"))
+        self.letter_precompute_slack = int(os.getenv("LETTER_PRECOMPUTE_SLACK", "20"))
+        self._letter_drafts = {}  # {username: 선생성 편지 정보}
+        self._letter_drafts_lock = threading.Lock()
+
+    # --------------------------------------------
+    # 서버 기동: 워밍업 / fork 후 재초기화 (gunicorn preload_app, wsgi.py)
+    # --------------------------------------------
+    def warmup(self, wait_ingest: bool = True, timeout: float = None):
+        """
+        트래픽을 받기 전에 준비 (readiness()가 ready를 돌려주는 조건)
+
+        1. 백그라운드 chardb 인덱싱 완료 대기
+        2. 방마다 대표 질의로 _search_similar / _search_persona (+ RAG-D) 1회 실행
+           → 검색 인덱스 로드, LangChain 지연 import, 질의 임베딩 캐시까지 미리 채움 (WARMUP_QUERIES=0이면 생략)
+        """
+        import time
+        start = time.time()
+        if wait_ingest and self._ingest_thread is not None:
+            print("[별빛 우체국] chardb 인덱싱 완료 대기 중...")
+            self._ingest_thread.join(timeout)
+        if self._counseling_thread is not None:
+            self._counseling_thread.join(timeout)
+        if os.getenv("WARMUP_QUERIES", "1") == "1":
+            for room, info in self.config.get("rooms", {}).items():
+                query = " ".join(info.get("keywords", [])) or info.get("name", room)
+                try:
+                    self._search_similar(query, top_k=1, room_filter=room)
+                    self._search_persona(query)
+                    if self.counseling_vectordb:
+                        self._search_counseling_knowledge(query, top_k=1)
+                    self._warmup_queries += 1
+                except Exception as e:
+                    print(f"[경고] 워밍업 질의 실패 ({room}): {e}")
+        self._warmed_up = True
+        print(f"[별빛 우체국] 워밍업 완료 ({time.time() - start:.1f}s, 질의 {self._warmup_queries}개, "
+              f"인덱싱 진행 중: {self.loading_embeddings})")
+
+    def readiness(self) -> dict:
+        """/health/ready 응답 본문 (ready: 워밍업 완료 + 인덱싱 종료)"""
+        def _count(collection):
+            try:
+                return collection.count() if collection is not None else 0
+            except Exception:
+                return None
+
+        counseling = self.counseling_vectordb._collection if self.counseling_vectordb else None
+        cache = self._embedding_cache.stats()
+        return {
+            "ready": self._warmed_up and not self.loading_embeddings,
+            "warmed_up": self._warmed_up,
+            "warmup_queries": self._warmup_queries,
+            "loading_embeddings": self.loading_embeddings,
+            "chardb": {
+                "available": self.collection is not None,
+                "backend": self.vector_backend,
+                "documents": _count(self.collection),
+            },
+            "rag_d": {
+                "available": self.counseling_vectordb is not None,
+                "initializing": self._counseling_thread is not None and self._counseling_thread.is_alive(),
+                "preloaded": self._counseling_index is not None,
+                "documents": _count(self._counseling_index or counseling),
+            },
+            "embedding_cache": dict(cache, warm=cache["hot_entries"] > 0),
+            "rag": self.get_rag_stats(),
+        }
+
+    def after_fork(self):
+        """
+        fork된 워커 프로세스에서 호출: 프로세스 간 공유하면 안 되는 자원만 새로 만듦
+
+        - OpenAI HTTP 연결 풀, SQLite 연결(임베딩 캐시 / 세션 / ChromaDB), 락, 스레드(executor / 세션 writer)
+        - 인메모리 인덱스 행렬, 페르소나, 설정 등 읽기 전용 데이터는 부모 것을 copy-on-write로 공유
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._aclient = None
+        self._aclient_loop = None
+        self._embedding_cache.after_fork()
+        self._session_writer.after_fork()
+        self._rag_stats_lock = threading.Lock()
+        self._user_locks = {}
+        self._user_locks_guard = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.turn_workers, thread_name_prefix="turn")
+        self.jobs.after_fork()
+        self._summary_jobs = {}
+        self._letter_jobs = {}
+        self._letter_drafts = {}
+        self._letter_drafts_lock = threading.Lock()
+        self._reopen_vector_stores()
+
+    def _reopen_vector_stores(self):
+        """부모 프로세스가 연 ChromaDB 클라이언트를 버리고 워커 전용으로 다시 연결 (동기화/재인덱싱 없음)"""
+        import chromadb
+        from .vector_index import NumpyVectorIndex
+        try:
+            from chromadb.api.client import SharedSystemClient
+            SharedSystemClient.clear_system_cache()
+        except Exception:
+            pass
+        data_dir = BASE_DIR / "static" / "data" / "chatbot"
+        if self.collection is not None:
+            try:
+                client = chromadb.PersistentClient(path=str(data_dir / "chardb_embedding"))
+                collection = client.get_collection("post_office_memories")
+                if isinstance(self.collection, NumpyVectorIndex):
+                    self.collection.attach(collection)
+                else:
+                    self.collection = collection
+            except Exception as e:
+                print(f"[경고] ChromaDB 재연결 실패: {e}")
+        if self.counseling_vectordb is not None:
+            try:
+                from langchain_community.vectorstores import Chroma  # type: ignore
+                self.counseling_vectordb = Chroma(
+                    persist_directory=str(data_dir / "counseling_vectordb"),
+                    embedding_function=self.counseling_vectordb._embedding_function,
+                    collection_name="counseling_knowledge"
+                )
+                if self._counseling_index is not None:
+                    self._counseling_index.attach(self.counseling_vectordb._collection)
+            except Exception as e:
+                print(f"[RAG-D] ⚠️ 벡터 DB 재연결 실패: {e}")
 
     # --------------------------------------------
     # OpenAI 호출 래퍼 (재시도/백오프)
     # --------------------------------------------
-    def _chat_completion(self, messages, model="gpt-5-pro", temperature=0.7, max_tokens=400, max_retries=3):
+    @property
+    def client(self):
+        """동기 OpenAI 클라이언트 (openai 패키지는 첫 사용 시 import)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    def _chat_completion(self, messages, model="gpt-5-pro", temperature=0.7, max_tokens=400, max_retries=3, on_token=None):
         import time
+        if in_async_context():
+            return await_only(self._achat_completion(messages, model, temperature, max_tokens, max_retries, on_token))
+        if on_token is not None:
+            return self._chat_completion_stream(messages, model, temperature, max_tokens, max_retries, on_token)
         delay = 0.8
         for attempt in range(max_retries):
             try:
@@ -242,8 +496,46 @@ class ChatbotService:
                 time.sleep(delay)
                 delay *= 1.8
 
-    def _embedding_create(self, text: str, model="text-embedding-3-small", max_retries=3):
+    def _chat_completion_stream(self, messages, model, temperature, max_tokens, max_retries, on_token):
+        """
+        스트리밍 Chat 호출: 토큰이 도착할 때마다 on_token(delta) 호출
+
+        반환값은 _chat_completion과 동일하게 response.choices[0].message.content로 접근 가능.
+        재시도는 첫 토큰 전 실패에만 적용 (이미 흘려보낸 토큰은 되돌릴 수 없음)
+        """
         import time
+        from types import SimpleNamespace
+        delay = 0.8
+        for attempt in range(max_retries):
+            parts = []
+            try:
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        on_token(delta)
+                content = "".join(parts)
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+            except Exception as e:
+                print(f"[경고] Chat 스트리밍 실패(시도 {attempt+1}/{max_retries}): {e}")
+                if parts or attempt == max_retries - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 1.8
+
+    def _embedding_create(self, text: str | list, model="text-embedding-3-small", max_retries=3):
+        import time
+        if in_async_context():
+            return await_only(self._aembedding_create(text, model, max_retries))
         delay = 0.8
         for attempt in range(max_retries):
             try:
@@ -256,6 +548,70 @@ class ChatbotService:
                 delay *= 1.8
         
         print("[별빛 우체국] 초기화 완료 ✨")
+
+    # --------------------------------------------
+    # OpenAI 비동기 호출 래퍼 (agenerate_response 경로, 재시도 대기도 이벤트 루프를 막지 않음)
+    # --------------------------------------------
+    def _get_async_client(self):
+        """현재 이벤트 루프에 묶인 AsyncOpenAI 클라이언트 (루프가 바뀌면 새로 생성)"""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            from openai import AsyncOpenAI
+            self._aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self._aclient_loop = loop
+        return self._aclient
+
+    async def _achat_completion(self, messages, model="gpt-5-pro", temperature=0.7, max_tokens=400, max_retries=3, on_token=None):
+        """_chat_completion의 async 버전 (on_token이 있으면 스트리밍, 첫 토큰 전 실패만 재시도)"""
+        from types import SimpleNamespace
+        client = self._get_async_client()
+        delay = 0.8
+        for attempt in range(max_retries):
+            parts = []
+            try:
+                if on_token is None:
+                    return await client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        on_token(delta)
+                content = "".join(parts)
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+            except Exception as e:
+                print(f"[경고] Chat 호출 실패(async, 시도 {attempt+1}/{max_retries}): {e}")
+                if parts or attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 1.8
+
+    async def _aembedding_create(self, text: str | list, model="text-embedding-3-small", max_retries=3):
+        """_embedding_create의 async 버전"""
+        client = self._get_async_client()
+        delay = 0.8
+        for attempt in range(max_retries):
+            try:
+                return await client.embeddings.create(model=model, input=text)
+            except Exception as e:
+                print(f"[경고] Embedding 호출 실패(async, 시도 {attempt+1}/{max_retries}): {e}")
+                if attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 1.8
     
     def _load_config(self) -> dict:
         """설정 파일 로드"""
@@ -267,6 +623,34 @@ class ChatbotService:
             print(f"[경고] {config_path}를 찾을 수 없습니다. 기본 설정 사용")
             return {"name": "부엉", "system_prompts": {}}
 
+    # -----------------------------
+    # 정적 프롬프트 조각 (PromptFragments)
+    # -----------------------------
+    def _register_prompt_fragments(self):
+        text_dir = BASE_DIR / "static" / "data" / "chatbot" / "chardb_text"
+        persona_path = text_dir / "owl_persona.json"
+        self._fragments.register("persona", [persona_path], self._load_persona)
+        self._fragments.register("character_txt", [text_dir / "owl_character.txt"], self._load_character_txt)
+        self._fragments.register(
+            "counselor_principles", [text_dir / "guides" / "counselor_principles.txt"], self._load_counselor_principles
+        )
+        # 일반 질문용 부엉이 상세 정보 (세 분기의 시스템 프롬프트가 공유)
+        self._fragments.register("persona_json", [persona_path], lambda: "\n".join(
+            json.dumps(self.persona.get(key, {}), ensure_ascii=False, indent=2)
+            for key in ("core_persona", "preferences", "life_story")
+        ))
+        # RAG-P 트리거 키워드 자동자 (_search_persona)
+        self._fragments.register("persona_index", [persona_path],
+                                 lambda: PersonaIndex(self.persona.get("memory_vault", {})))
+
+    @property
+    def persona(self) -> dict:
+        return self._fragments.get("persona")
+
+    @property
+    def character_txt(self) -> str:
+        return self._fragments.get("character_txt")
+
     # -----------------------------
     # RAG-P: 페르소나 시스템 (부엉이의 자기 공개를 통한 공감)
     # -----------------------------
@@ -343,56 +727,41 @@ class ChatbotService:
         if is_direct_question:
             print(f"[페르소나] 직접 질문 감지!")
         
-        # 각 카테고리 → 서브 스토리 순회
-        memory_vault = self.persona["memory_vault"]
+        # 트리거 키워드 매칭: 미리 컴파일한 자동자로 combined_text를 한 번만 훑어 스토리별 점수 계산
+        #                    (키워드가 하나라도 맞은 스토리만 파일 순서대로 반환)
         best_match = {"story_id": None, "category": None, "story": None, "guidance": None, "score": 0, "activation": False, "force_use": False}
         all_matches = []  # 모든 매칭 결과 저장 (직접 질문 시 used_stories 무시용)
         
-        for category, category_data in memory_vault.items():
-            # 새 구조: stories 하위에 서브 스토리들이 있음
-            if "stories" not in category_data:
-                continue
+        persona_index = self._fragments.get("persona_index")
+        for category, story_id, story_data, matched_keywords, match_count in persona_index.match(combined_text):
+            # 스토리 전체 ID (예: "love.breakup_bluntness")
+            full_story_id = f"{category}.{story_id}"
             
-            stories = category_data["stories"]
+            print(f"[페르소나] 매칭 발견: {full_story_id} (점수: {match_count}, 키워드: {matched_keywords})")
+            # 대화 길이에 따라 content_short 또는 content_long 선택
+            content_key = "content_long" if len(conversation_context) > 500 else "content_short"
+            story_content = story_data.get(content_key, story_data.get("content_short", ""))
+            guidance = story_data.get("llm_speaking_guidance", "")
             
-            for story_id, story_data in stories.items():
-                # 스토리 전체 ID (예: "love.breakup_bluntness")
-                full_story_id = f"{category}.{story_id}"
-                
-                # 트리거 키워드 매칭
-                if "trigger_keywords" not in story_data:
-                    continue
-                
-                # 키워드 매칭 점수 계산
-                matched_keywords = [kw for kw in story_data["trigger_keywords"] if kw in combined_text]
-                match_count = len(matched_keywords)
-                
-                if match_count > 0:
-                    print(f"[페르소나] 매칭 발견: {full_story_id} (점수: {match_count}, 키워드: {matched_keywords})")
-                    # 대화 길이에 따라 content_short 또는 content_long 선택
-                    content_key = "content_long" if len(conversation_context) > 500 else "content_short"
-                    story_content = story_data.get(content_key, story_data.get("content_short", ""))
-                    guidance = story_data.get("llm_speaking_guidance", "")
-                    
-                    match_data = {
-                        "story_id": full_story_id,
-                        "category": category,
-                        "story": story_content,
-                        "guidance": guidance,
-                        "score": match_count,
-                        "activation": True,
-                        "force_use": False
-                    }
-                    
-                    all_matches.append(match_data)
-                    
-                    # 이미 사용한 스토리 제외 (일반 매칭)
-                    # ✅ 개선: 점수가 매우 높으면 (3점 이상) 재사용 허용
-                    is_high_score = match_count >= 3
-                    if (full_story_id not in used_stories or is_high_score) and match_count > best_match["score"]:
-                        best_match = match_data
-                        if full_story_id in used_stories and is_high_score:
-                            print(f"[페르소나] 재사용 허용 (고득점: {match_count}점) - {full_story_id}")
+            match_data = {
+                "story_id": full_story_id,
+                "category": category,
+                "story": story_content,
+                "guidance": guidance,
+                "score": match_count,
+                "activation": True,
+                "force_use": False
+            }
+            
+            all_matches.append(match_data)
+            
+            # 이미 사용한 스토리 제외 (일반 매칭)
+            # ✅ 개선: 점수가 매우 높으면 (3점 이상) 재사용 허용
+            is_high_score = match_count >= 3
+            if (full_story_id not in used_stories or is_high_score) and match_count > best_match["score"]:
+                best_match = match_data
+                if full_story_id in used_stories and is_high_score:
+                    print(f"[페르소나] 재사용 허용 (고득점: {match_count}점) - {full_story_id}")
         
         # 직접 질문이면 used_stories 무시하고 최고 점수 스토리 사용
         if is_direct_question and all_matches:
@@ -421,30 +790,19 @@ class ChatbotService:
     # -----------------------------
     # 세션 영속화 (재기동/리로드 대비)
     # -----------------------------
-    def _session_dir(self) -> Path:
-        p = BASE_DIR / "static" / "data" / "chatbot" / "sessions"
-        p.mkdir(parents=True, exist_ok=True)
-        return p
-
-    def _session_path(self, username: str) -> Path:
-        import re
-        safe = re.sub(r"[^\w\-가-힣]", "_", username)
-        return self._session_dir() / f"session_{safe}.json"
-
     def _save_session(self, session: PostOfficeSession):
-        try:
-            path = self._session_path(session.username)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(session.to_dict(), f, ensure_ascii=False)
-        except Exception as e:
-            print(f"[경고] 세션 저장 실패: {e}")
+        """세션 변경 표시 (실제 기록은 턴 종료/주기마다 백그라운드 writer가 한 번에 수행)"""
+        self._session_writer.mark_dirty(session)
 
     def _load_session(self, username: str) -> PostOfficeSession | None:
         try:
-            path = self._session_path(username)
-            if path.exists():
-                data = json.loads(path.read_text(encoding="utf-8"))
-                return PostOfficeSession.from_dict(data)
+            data = self._session_store.load(username)
+            if data:
+                session = PostOfficeSession.from_dict(data)
+                if isinstance(session.conversation_history, LazyHistory):
+                    # 앞부분 로그 읽기도 async 경로에서는 이벤트 루프 밖에서
+                    session.conversation_history.wrap_loader(self._blocking)
+                return session
         except Exception as e:
             print(f"[경고] 세션 로드 실패: {e}")
         return None
@@ -458,76 +816,43 @@ class ChatbotService:
             return ""
 
     def _detect_crisis(self, text: str) -> bool:
-        if not text:
-            return False
-        t = text.lower()
-        crisis_keywords = ["자살", "극단적", "죽고", "해치", "학대", "폭력", "살고싶지", "위험"]
-        return any(k in t for k in crisis_keywords)
+        return "crisis" in self.intent_detector.scan(text)
     
     def _detect_crisis_recovery(self, text: str) -> bool:
         """위기 상황 회복 신호 감지"""
-        if not text:
-            return False
-        t = text.lower()
-        recovery_keywords = [
-            "괜찮", "나아", "좀 나은", "괜춘", "좀 낫", "좀 나아졌",
-            "덜 힘들", "조금 나은", "좀 좋", "회복", "나아지",
-            "괜찮아졌", "괜찮아져", "괜찮아질", "좀 괜찮"
-        ]
-        return any(k in t for k in recovery_keywords)
+        return "crisis_recovery" in self.intent_detector.scan(text)
 
     def _normalize_intent_key(self, text: str) -> str:
-        if not text:
-            return ""
-        t = text.lower().strip()
-        # 편지 즉시 요청 의도 (다양한 변형 포함)
-        letter_now_tokens = [
-            "편지나", "편지내놔", "편지줘", "편지 줘", "편지주세요", "편지 주세요",
-            "편지출력", "편지 출력", "편지를", "편지", "바로 편지", "편지 바로"
-        ]
-        if any(tok.replace(" ", "") in t.replace(" ", "") for tok in letter_now_tokens):
-            return "ask_letter_now"
-        # 단순 반복 질의 키(공백/구두점 제거)
-        import re
-        # 유니코드 \p 클래스는 Python re에서 지원되지 않음 → 한글/영문/숫자/공백만 유지
-        base = re.sub(r"\s+", " ", re.sub(r"[^\w\s가-힣]", " ", t)).strip()
-        return base
+        return self.intent_detector.scan(text).intent_key
 
-    def _update_repetition_state(self, session: PostOfficeSession, user_message: str) -> str:
-        intent_key = self._normalize_intent_key(user_message)
+    def _update_repetition_state(self, session: PostOfficeSession, user_message: str, features=None) -> str:
+        if features is None:
+            features = self.intent_detector.scan(user_message)
+        intent_key = features.intent_key
         
         # 의미 기반 중복 감지 (임베딩 유사도)
         is_semantic_repeat = False
         if len(session.conversation_history) >= 2:
-            # 최근 3개 유저 메시지 추출 (현재 메시지 제외!)
+            # 최근 유저 메시지 (현재 메시지 제외!)
             # conversation_history의 마지막 메시지는 방금 추가한 현재 메시지이므로 제외
+            window_size = self.repetition_window
             recent_user_messages = [
-                msg['content'] for msg in session.conversation_history[-7:-1]  # 마지막 1개 제외
+                msg['content'] for msg in session.conversation_history[-(2 * window_size + 1):-1]
                 if msg['role'] == 'user'
-            ][-3:]  # 그 중 마지막 3개만
-            
-            if recent_user_messages:
-                # 현재 메시지 임베딩
-                current_emb = self._create_embedding(user_message)
-                if current_emb:
-                    # 최근 메시지들과 유사도 비교
-                    for recent_msg in recent_user_messages:
-                        # 자기 자신과 비교 방지 (이중 체크)
-                        if recent_msg == user_message:
-                            continue
-                        
-                        recent_emb = self._create_embedding(recent_msg)
-                        if recent_emb:
-                            # 코사인 유사도 계산
-                            import numpy as np
-                            similarity = np.dot(current_emb, recent_emb) / (
-                                np.linalg.norm(current_emb) * np.linalg.norm(recent_emb)
-                            )
-                            # 85% 이상 유사하면 반복으로 간주
-                            if similarity > 0.85:
-                                is_semantic_repeat = True
-                                print(f"[반복 감지] 유사도: {similarity:.2f} | '{user_message[:30]}...' ≈ '{recent_msg[:30]}...'")
-                                break
+            ][-window_size:]
+            window = self._sync_repetition_window(session, recent_user_messages)
+            
+            # 현재 메시지 임베딩 → 창 전체와 한 번에 비교 후 창에 추가 (다음 턴부터 재사용)
+            current_emb = self._create_embedding(user_message)
+            if current_emb:
+                current_unit = window.normalize(current_emb)
+                # 자기 자신과 같은 문장은 비교 제외 (완전 반복은 intent_key로 감지)
+                similarity, recent_msg = window.most_similar(current_unit, exclude=user_message)
+                # 85% 이상 유사하면 반복으로 간주
+                if similarity is not None and similarity > 0.85:
+                    is_semantic_repeat = True
+                    print(f"[반복 감지] 유사도: {similarity:.2f} | '{user_message[:30]}...' ≈ '{recent_msg[:30]}...'")
+                window.push(user_message, current_unit)
         
         # 반복 카운트 업데이트
         if session.last_intent_key is None:
@@ -541,51 +866,50 @@ class ChatbotService:
         
         return intent_key
 
+    def _sync_repetition_window(self, session: PostOfficeSession, texts: list):
+        """
+        세션의 임베딩 창을 최근 유저 메시지 목록에 맞춤
+        
+        보통은 지난 턴에 push한 그대로라 바로 반환. 세션을 새로 읽었거나 대화가 초기화된 경우에만
+        가진 벡터를 재사용하고, 없는 메시지는 임베딩 캐시(없으면 배치 API 1회)로 채워 다시 쌓음
+        """
+        from .vector_index import EmbeddingWindow
+        window = session.repetition_window
+        if window is None or window.size != self.repetition_window:
+            window = session.repetition_window = EmbeddingWindow(self.repetition_window)
+        if window.texts == texts:
+            return window
+        known = window.vectors()
+        missing = [t for t in dict.fromkeys(texts) if t not in known]
+        if missing:
+            for text, emb in zip(missing, self._create_embeddings(missing)):
+                if emb:
+                    known[text] = window.normalize(emb)
+        kept = [t for t in texts if t in known]
+        window.reset(kept, [known[t] for t in kept])
+        return window
+
     def _detect_reenter(self, text: str) -> bool:
-        if not text:
-            return False
-        t = text.replace(" ", "").lower()
-        phrases = [
-            "별빛우체국에한번더입장하시겠습니까?",
-            "다시입장",
-            "처음부터다시",
-            "다시시작",
-            "별빛우체국에다시한번입장",
-            "다시한번입장",
-        ]
-        return any(p in t for p in phrases)
+        return "reenter" in self.intent_detector.scan(text)
 
     def _detect_letter_confirm_yes(self, text: str) -> bool:
-        if not text:
-            return False
-        t = text.replace(" ", "").lower()
-        yes = ["응편지를받을래", "편지를받을래", "편지받을게", "편지받기"]
-        return any(p in t for p in yes)
+        return "letter_confirm_yes" in self.intent_detector.scan(text)
 
     def _detect_letter_confirm_no(self, text: str) -> bool:
-        if not text:
-            return False
-        t = text.replace(" ", "").lower()
-        no = ["아니더대화할래", "더대화할래", "계속대화", "대화계속"]
-        return any(p in t for p in no)
+        return "letter_confirm_no" in self.intent_detector.scan(text)
     
     def _is_early_letter_request(self, user_message: str) -> bool:
         """명시적으로 편지 전달/조기 종료를 요구하는지 식별"""
-        keywords = [
-            "편지줬", "편지를줘", "편지받고싶", "편지내놔", "편지줘", "편지주세요", "편지출력",
-            "그만", "싫어", "시러", "꺼져", "필요없", "불쾌", "하기싫", "묻지마"
-        ]
-        t = user_message.lower().replace(" ", "")
-        return any(k in t for k in keywords)
+        return "early_letter_request" in self.intent_detector.scan(user_message)
 
     def _is_question(self, user_message: str) -> bool:
         """의문문: ?로 끝나거나, '왜', '무슨', '어째서' 등 질문 시작"""
-        t = user_message.strip()
-        lowers = t.lower()
-        return t.endswith("?") or lowers.startswith("왜") or lowers.startswith("무슨") or lowers.startswith("어째서")
+        return self.intent_detector.scan(user_message).is_question
     
     def _init_chromadb(self):
-        """ChromaDB 초기화 및 데이터 로드"""
+        """ChromaDB 초기화 및 chardb_text 증분 동기화"""
+        import chromadb
+        from .vector_index import NumpyVectorIndex
         db_path = BASE_DIR / "static" / "data" / "chatbot" / "chardb_embedding"
         db_path.mkdir(parents=True, exist_ok=True)
         
@@ -596,21 +920,51 @@ class ChatbotService:
                 metadata={"hnsw:space": "cosine"}
             )
             
-            # 데이터가 없으면 로드
+            # 검색 백엔드: chroma(HNSW) / numpy(인메모리 정확 검색, 쓰기는 Chroma에 그대로 영속화)
+            if self.vector_backend == "numpy":
+                collection = NumpyVectorIndex.from_collection(collection)
+                print(f"[ChromaDB] NumPy 인메모리 검색 백엔드 사용")
+            
             current_count = collection.count()
             print(f"[ChromaDB] 현재 컬렉션 문서 수: {current_count}")
             
-            if current_count == 0:
-                print("[ChromaDB] 데이터가 비어있습니다. 백그라운드 로딩 시작...")
+            # 매니페스트와 chardb_text를 비교하여 바뀐 청크만 반영
+            manifest_path = db_path / "chardb_manifest.json"
+            manifest = self._load_manifest(manifest_path)
+            text_dir = BASE_DIR / "static" / "data" / "chatbot" / "chardb_text"
+            
+            # 삭제/추가 대상은 매니페스트가 아니라 컬렉션의 실제 id로 계산
+            # (매니페스트 저장 전에 죽었거나 일부만 들어간 파일의 청크, 매니페스트 도입 이전 id(regret_0 등)까지 정리,
+            #  해시가 같은 파일도 컬렉션에서 빠진 청크가 있으면 다시 청킹해서 채움)
+            existing_ids = set(collection.get(include=[])["ids"]) if current_count else set()
+            files, new_chunks = self._collect_text_chunks(text_dir, manifest, existing_ids)
+            wanted_ids = {cid for entry in files.values() for cid in entry["chunks"]}
+            stale_ids = existing_ids - wanted_ids
+            to_add = {cid: chunk for cid, chunk in new_chunks.items() if cid not in existing_ids}
+            
+            if stale_ids:
+                stale = list(stale_ids)
+                for start in range(0, len(stale), 500):
+                    collection.delete(ids=stale[start:start + 500])
+                print(f"[ChromaDB] 오래된 청크 {len(stale_ids)}개 삭제")
+            
+            if to_add:
+                print(f"[ChromaDB] 새로 추가/변경된 청크 {len(to_add)}개. 백그라운드 임베딩 시작...")
+                pending_rooms = {md["room"] for _, md in to_add.values()}
+                self._rooms_ready.update({entry["room"] for entry in files.values()} - pending_rooms)
+                self.loading_embeddings = True
                 def _bg_load():
                     try:
-                        self.loading_embeddings = True
-                        self._load_text_data(collection)
+                        self._load_text_data(collection, to_add)
+                        self._save_manifest(manifest_path, collection, files)
                     finally:
                         self.loading_embeddings = False
-                threading.Thread(target=_bg_load, daemon=True).start()
+                self._ingest_thread = threading.Thread(target=_bg_load, daemon=True)
+                self._ingest_thread.start()
             else:
-                print(f"[ChromaDB] 기존 데이터 사용 ({current_count}개 문서)")
+                print(f"[ChromaDB] 변경 없음. 기존 데이터 사용")
+                if stale_ids or not manifest.get("files"):
+                    self._save_manifest(manifest_path, collection, files)
             
             print(f"[ChromaDB] 컬렉션 연결 완료: {collection.count()}개 문서")
             return collection
@@ -618,114 +972,186 @@ class ChatbotService:
             print(f"[경고] ChromaDB 초기화 실패: {e}")
             return None
     
-    def _load_text_data(self, collection):
-        """텍스트 데이터를 ChromaDB에 로드"""
-        text_dir = BASE_DIR / "static" / "data" / "chatbot" / "chardb_text"
+    @staticmethod
+    def _load_manifest(path: Path) -> dict:
+        """chardb 매니페스트 로드 ({"files": {상대경로: {"sha256", "room", "chunks"}}})"""
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[경고] 매니페스트 로드 실패 (전체 재확인): {e}")
+            return {}
+    
+    @staticmethod
+    def _save_manifest(path: Path, collection, files: dict):
+        """
+        매니페스트 저장 (원자적 교체)
         
-        documents = []
-        metadatas = []
-        ids = []
-        doc_id = 0
-        
-        def chunk_text(content: str, max_chars: int = 900):
-            blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
-            chunks = []
-            for b in blocks:
-                if len(b) <= max_chars:
-                    chunks.append(b)
-                else:
-                    start = 0
-                    while start < len(b):
-                        end = min(start + max_chars, len(b))
-                        chunks.append(b[start:end])
-                        start = end
-            return chunks
-        
-        # 각 방별 폴더 데이터 로드 (구조화된 데이터)
+        청크가 전부 컬렉션에 들어간 파일만 기록하여,
+        임베딩에 실패한 파일은 다음 기동 때 다시 시도되도록 함
+        """
+        wanted = [cid for entry in files.values() for cid in entry["chunks"]]
+        present = set()
+        for start in range(0, len(wanted), 500):
+            present.update(collection.get(ids=wanted[start:start + 500], include=[])["ids"])
+        complete = {rel: entry for rel, entry in files.items() if all(cid in present for cid in entry["chunks"])}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": 1, "files": complete}, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        if len(complete) < len(files):
+            print(f"[경고] {len(files) - len(complete)}개 파일은 매니페스트에서 제외 (다음 기동 시 재시도)")
+    
+    @staticmethod
+    def _chunk_text(content: str, max_chars: int = 900) -> list:
+        blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
+        chunks = []
+        for b in blocks:
+            if len(b) <= max_chars:
+                chunks.append(b)
+            else:
+                start = 0
+                while start < len(b):
+                    end = min(start + max_chars, len(b))
+                    chunks.append(b[start:end])
+                    start = end
+        return chunks
+    
+    def _collect_text_chunks(self, text_dir: Path, manifest: dict, existing_ids: set = None) -> tuple:
+        """
+        chardb_text 파일을 해시하여 청크 목록 구성
+        
+        - 파일 해시가 매니페스트와 같고 청크가 모두 컬렉션(existing_ids)에 있으면 청킹 없이 기존 청크 id 재사용
+          (청크가 빠져 있으면 변경된 파일처럼 다시 청킹 → 빠진 청크만 추가 대상이 됨)
+        - 청크 id = 방 + sha256(파일 경로, 청크 내용) → 내용이 같으면 id도 같음
+        
+        Returns:
+            tuple: (files, new_chunks)
+                files: {상대경로: {"sha256", "room", "chunks": [id, ...]}}
+                new_chunks: {id: (document, metadata)} - 변경된 파일의 청크
+        """
+        known = manifest.get("files", {})
+        sources = []
+        # 각 방별 폴더 데이터 (구조화된 데이터)
         for room_name in ['regret', 'love', 'anxiety', 'dream']:
             room_dir = text_dir / room_name
             if room_dir.exists():
-                txt_files = list(room_dir.glob("*.txt"))
-                
-                for txt_file in txt_files:
-                    try:
-                        with open(txt_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            # 파일을 청킹하여 여러 문서로 저장
-                            if content.strip():
-                                for idx, ch in enumerate(chunk_text(content)):
-                                    documents.append(ch)
-                                    metadatas.append({
-                                        "room": room_name,
-                                        "filename": txt_file.name,
-                                        "chunk_index": idx,
-                                        "type": "structured"
-                                    })
-                                    ids.append(f"{room_name}_{doc_id}")
-                                    doc_id += 1
-                    except Exception as e:
-                        print(f"[에러] {txt_file.name} 로드 실패: {e}")
-        
+                sources.extend((room_name, "structured", p) for p in sorted(room_dir.glob("*.txt")))
         # (제외) 전역 memories_* 파일은 이 프로젝트 범위에서 사용하지 않음
-        
-        # owl_character.txt 로드
         owl_file = text_dir / "owl_character.txt"
         if owl_file.exists():
+            sources.append(("all", "character", owl_file))
+        
+        files = {}
+        new_chunks = {}
+        for room_name, doc_type, txt_file in sources:
+            rel = txt_file.relative_to(text_dir).as_posix()
             try:
-                with open(owl_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if content.strip():
-                        for idx, ch in enumerate(chunk_text(content)):
-                            documents.append(ch)
-                            metadatas.append({
-                                "room": "all",
-                                "filename": "owl_character.txt",
-                                "chunk_index": idx,
-                                "type": "character"
-                            })
-                            ids.append(f"character_{doc_id}")
-                            doc_id += 1
+                content = txt_file.read_text(encoding="utf-8")
             except Exception as e:
-                print(f"[에러] owl_character.txt 로드 실패: {e}")
+                print(f"[에러] {txt_file.name} 로드 실패: {e}")
+                continue
+            if not content.strip():
+                continue
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            entry = known.get(rel)
+            if entry and entry.get("sha256") == digest and (
+                existing_ids is None or all(cid in existing_ids for cid in entry.get("chunks", []))
+            ):
+                files[rel] = entry
+                continue
+            
+            chunk_ids = []
+            for idx, ch in enumerate(self._chunk_text(content)):
+                digest_ch = hashlib.sha256(f"{rel}\x00{ch}".encode("utf-8")).hexdigest()
+                cid = f"{room_name}_{digest_ch[:16]}"
+                if cid in chunk_ids:
+                    cid = f"{cid}_{idx}"  # 같은 파일 안의 동일 청크
+                chunk_ids.append(cid)
+                new_chunks[cid] = (ch, {
+                    "room": room_name,
+                    "filename": txt_file.name,
+                    "chunk_index": idx,
+                    "type": doc_type
+                })
+            files[rel] = {"sha256": digest, "room": room_name, "chunks": chunk_ids}
+        return files, new_chunks
+    
+    def _load_text_data(self, collection, chunks: dict):
+        """변경된 청크({id: (document, metadata)})를 ChromaDB에 로드"""
+        ids = list(chunks)
+        documents = [chunks[cid][0] for cid in ids]
+        metadatas = [chunks[cid][1] for cid in ids]
         
-        # ChromaDB에 임베딩과 함께 추가
-        if documents:
-            try:
-                print(f"[ChromaDB] {len(documents)}개 문서 임베딩 생성 중...")
-                
-                # 각 문서의 임베딩 생성
-                embeddings = []
-                for i, doc in enumerate(documents):
-                    if i % 5 == 0:
-                        print(f"  진행: {i}/{len(documents)}")
-                    
-                    # OpenAI로 임베딩 생성
-                    embedding = self._create_embedding(doc[:8000])  # 토큰 제한 고려
-                    if embedding:
-                        embeddings.append(embedding)
-                    else:
-                        # 임베딩 생성 실패 시 해당 문서 제외
-                        print(f"[경고] {metadatas[i]['filename']} 임베딩 생성 실패")
-                        continue
-                
-                # ChromaDB에 추가
-                if embeddings:
-                    collection.add(
-                        documents=documents[:len(embeddings)],
-                        embeddings=embeddings,
-                        metadatas=metadatas[:len(embeddings)],
-                        ids=ids[:len(embeddings)]
+        # ChromaDB에 임베딩과 함께 추가 (배치 임베딩 + 제한된 병렬 처리 + 점진적 삽입)
+        try:
+            self._ingest_documents(collection, documents, metadatas, ids)
+        except Exception as e:
+            print(f"[에러] ChromaDB 데이터 추가 실패: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def _ingest_documents(self, collection, documents: list, metadatas: list, ids: list):
+        """
+        문서를 배치 단위로 임베딩하여 컬렉션에 점진적으로 추가
+        
+        - EMBEDDING_BATCH_SIZE개씩 한 번의 임베딩 API 호출
+        - 최대 EMBEDDING_INGEST_WORKERS개 배치를 동시에 처리
+        - 배치가 끝나는 대로 collection.upsert (쓰기는 이 스레드에서만, 이미 있는 id는 덮어씀)
+        - 한 방의 청크가 모두 들어가면 그 방은 즉시 검색 가능 (_rooms_ready)
+        """
+        from collections import Counter
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        workers = int(os.getenv("EMBEDDING_INGEST_WORKERS", "4"))
+        
+        # 방별로 배치 구성 (한 배치에 여러 방이 섞이지 않도록)
+        by_room = {}
+        for i, md in enumerate(metadatas):
+            by_room.setdefault(md["room"], []).append(i)
+        batches = []
+        for room, indices in by_room.items():
+            for start in range(0, len(indices), batch_size):
+                batches.append((room, indices[start:start + batch_size]))
+        pending = Counter(room for room, _ in batches)
+        
+        print(f"[ChromaDB] {len(documents)}개 문서 임베딩 생성 중... ({len(batches)}개 배치, 동시 {workers}개)")
+        added = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+            futures = {
+                pool.submit(self._create_embeddings, [documents[i][:8000] for i in indices]): (room, indices)  # 토큰 제한 고려
+                for room, indices in batches
+            }
+            for future in as_completed(futures):
+                room, indices = futures[future]
+                embeddings = future.result()
+                ok = [(i, emb) for i, emb in zip(indices, embeddings) if emb]
+                if len(ok) < len(indices):
+                    # 임베딩 생성 실패 시 해당 문서 제외
+                    print(f"[경고] {room}: {len(indices) - len(ok)}개 문서 임베딩 생성 실패")
+                if ok:
+                    collection.upsert(
+                        documents=[documents[i] for i, _ in ok],
+                        embeddings=[emb for _, emb in ok],
+                        metadatas=[metadatas[i] for i, _ in ok],
+                        ids=[ids[i] for i, _ in ok]
                     )
-                    print(f"[ChromaDB] ✅ {len(embeddings)}개 문서 로드 완료")
-                else:
-                    print(f"[경고] 임베딩 생성 실패. 문서를 추가하지 못했습니다.")
-                
-            except Exception as e:
-                print(f"[에러] ChromaDB 데이터 추가 실패: {e}")
-                import traceback
-                traceback.print_exc()
+                    added += len(ok)
+                print(f"  진행: {added}/{len(documents)}")
+                pending[room] -= 1
+                if pending[room] == 0:
+                    self._rooms_ready.add(room)
+                    print(f"[ChromaDB] '{room}' 검색 가능")
+        
+        if added:
+            print(f"[ChromaDB] ✅ {added}개 문서 로드 완료")
         else:
-            print(f"[경고] 로드된 문서가 없습니다!")
+            print(f"[경고] 임베딩 생성 실패. 문서를 추가하지 못했습니다.")
+    
+    def _room_loading(self, room: str) -> bool:
+        """해당 방의 자료가 아직 인덱싱 중인지 (다른 방 로딩과 무관)"""
+        return self.loading_embeddings and room not in self._rooms_ready
     
     # ============================================
     # RAG-D: 상담 매뉴얼 벡터 DB
@@ -746,9 +1172,14 @@ class ChatbotService:
             from langchain_community.vectorstores import Chroma  # type: ignore
             from langchain_openai import OpenAIEmbeddings  # type: ignore
             
-            embeddings = OpenAIEmbeddings(
-                model="text-embedding-3-small",
-                openai_api_key=os.getenv("OPENAI_API_KEY")
+            # 쿼리 임베딩도 서비스 영속 캐시를 거치도록 감싸기
+            embeddings = wrap_langchain_embeddings(
+                OpenAIEmbeddings(
+                    model="text-embedding-3-small",
+                    openai_api_key=os.getenv("OPENAI_API_KEY")
+                ),
+                self._embedding_cache,
+                "text-embedding-3-small"
             )
             
             vectordb = Chroma(
@@ -759,6 +1190,14 @@ class ChatbotService:
             
             doc_count = vectordb._collection.count()
             print(f"[RAG-D] ✅ 상담 매뉴얼 벡터 DB 로드 완료 ({doc_count}개 청크)")
+            
+            if self.counseling_preload and doc_count:
+                try:
+                    from .vector_index import NumpyVectorIndex
+                    self._counseling_index = NumpyVectorIndex.from_collection(vectordb._collection)
+                    print(f"[RAG-D] 인메모리 인덱스 적재 완료 ({self._counseling_index.count()}개 청크)")
+                except Exception as e:
+                    print(f"[RAG-D] ⚠️ 인메모리 인덱스 적재 실패, LangChain 검색 사용: {e}")
             return vectordb
             
         except ImportError as ie:
@@ -773,16 +1212,30 @@ class ChatbotService:
             traceback.print_exc()
             return None
     
-    def _search_counseling_knowledge(self, query: str, top_k: int = 3) -> list:
-        """상담 매뉴얼에서 관련 지식 검색 (RAG-D)"""
+    def _search_counseling_knowledge(self, query: str, top_k: int = 3, query_embedding: list = None) -> list:
+        """
+        상담 매뉴얼에서 관련 지식 검색 (RAG-D)
+        
+        쿼리 임베딩은 서비스 임베딩 캐시(_create_embedding)를 공유하므로,
+        같은 턴의 _search_room_context가 이미 만든 벡터를 query_embedding으로 넘기면 재임베딩하지 않음
+        """
         if not self.counseling_vectordb:
             print(f"[RAG-D] ⚠️ 상담 매뉴얼 벡터 DB가 없습니다!")
             return []
         
         try:
             print(f"[RAG-D] 검색 시작 - 쿼리: '{query[:50]}...' (top_k={top_k})")
-            results = self.counseling_vectordb.similarity_search(query, k=top_k)
-            counseling_context = [doc.page_content for doc in results]
+            if query_embedding is None:
+                query_embedding = self._create_embedding(query)
+            if not query_embedding:
+                return []
+            if self._counseling_index is not None:
+                # 인메모리 인덱스 (정규화된 OpenAI 임베딩이라 L2 순위 = 코사인 순위)
+                results = self._counseling_index.query(query_embeddings=[query_embedding], n_results=top_k)
+                counseling_context = results["documents"][0]
+            else:
+                results = self.counseling_vectordb.similarity_search_by_vector(query_embedding, k=top_k)
+                counseling_context = [doc.page_content for doc in results]
             
             print(f"[RAG-D] ✅ 검색 완료: {len(counseling_context)}개 청크")
             for i, ctx in enumerate(counseling_context, 1):
@@ -797,54 +1250,112 @@ class ChatbotService:
     # ============================================
     
     def _get_session(self, username: str) -> PostOfficeSession:
-        """세션 가져오기 또는 생성"""
-        if username not in self.sessions:
-            loaded = self._load_session(username)
-            if loaded:
-                self.sessions[username] = loaded
-            else:
-                self.sessions[username] = PostOfficeSession(username)
-        return self.sessions[username]
+        """세션 가져오기 또는 생성 (저장소 로드 / 캐시에서 내보낸 세션 기록이 블로킹 I/O라 async 경로에서는 스레드에서)"""
+        return self._blocking(self._fetch_session, username)
+
+    def _fetch_session(self, username: str) -> PostOfficeSession:
+        session = self.sessions.get(username)
+        if session is None:
+            # 캐시에서 내려갔지만 아직 기록되지 않은 세션이 있으면 그 객체를 그대로 사용
+            session = self._session_writer.pending(username) or self._load_session(username) or PostOfficeSession(username)
+            self.sessions.put(username, session)
+        return session
+    
+    def _discard_session(self, username: str):
+        """다른 워커 프로세스가 먼저 기록한 세션: 메모리 사본(과 그 사본으로 만든 초안)을 버리고 다음 요청 때 저장소에서 다시 읽음"""
+        self.sessions.discard(username)
+        with self._letter_drafts_lock:
+            self._letter_drafts.pop(username, None)
+            self._summary_jobs.pop(username, None)
+
+    def _evict_session(self, session: PostOfficeSession):
+        """캐시에서 내보내는 세션: 밀린 변경을 바로 기록하고 저장소 추적 정보 해제"""
+        self._session_writer.flush_user(session.username)
+        self._session_store.forget(session.username)
+        with self._letter_drafts_lock:
+            self._letter_drafts.pop(session.username, None)
+            self._summary_jobs.pop(session.username, None)
     
-    def _create_embedding(self, text: str) -> list:
-        """텍스트 임베딩 생성 (캐시 활용)"""
+    def _create_embedding(self, text: str, model: str = "text-embedding-3-small") -> list:
+        """텍스트 임베딩 생성 (영속 캐시 활용: 모델명 + 텍스트 해시 키)"""
         try:
-            # 캐시 키 생성 (해시 사용으로 메모리 절약)
-            import hashlib
-            cache_key = hashlib.md5(text.encode('utf-8')).hexdigest()
-            
-            # 캐시 조회
-            cached = self._embedding_cache.get(cache_key)
+            # 캐시 조회 (LRU 핫 티어 → 디스크)
+            cached = self._blocking(self._embedding_cache.get, model, text)
             if cached is not None:
                 print(f"[캐시 히트] {text[:30]}...")
                 return cached
             
             # API 호출
-            response = self._embedding_create(text=text, model="text-embedding-3-small")
+            response = self._embedding_create(text=text, model=model)
             emb = response.data[0].embedding
             
-            # 캐시 저장 (LRU: 최대 1000개 유지)
-            if len(self._embedding_cache) >= 1000:
-                # 가장 오래된 항목 제거 (FIFO)
-                oldest_key = next(iter(self._embedding_cache))
-                del self._embedding_cache[oldest_key]
-            
-            self._embedding_cache[cache_key] = emb
+            # 캐시 저장
+            self._blocking(self._embedding_cache.put, model, text, emb)
             return emb
         except Exception as e:
             print(f"[에러] Embedding 생성 실패: {e}")
             return None
     
+    def _create_embeddings(self, texts: list, model: str = "text-embedding-3-small") -> list:
+        """
+        여러 텍스트 임베딩을 한 번의 API 호출로 생성 (캐시에 있는 것은 제외)
+        
+        Returns:
+            list: texts와 같은 순서의 임베딩 (실패 시 해당 위치 None)
+        """
+        found = self._blocking(self._embedding_cache.get_many, model, texts)
+        missing = [t for t in dict.fromkeys(texts) if t not in found]
+        if missing:
+            try:
+                response = self._embedding_create(text=missing, model=model)
+                created = [(t, d.embedding) for t, d in zip(missing, response.data)]
+                self._blocking(self._embedding_cache.put_many, model, created)
+                found.update(created)
+            except Exception as e:
+                print(f"[에러] 배치 Embedding 생성 실패 ({len(missing)}개): {e}")
+        return [found.get(t) for t in texts]
+    
     def _analyze_user_emotion(self, user_message: str) -> str:
         """
-        DIR-E-103: LLM 기반 유저 감정 분석
+        DIR-E-103: 유저 감정 분석 (EMOTION_BACKEND에 따라 로컬 분류기 / LLM 선택)
+        
+        Returns:
+            str: "JOY", "SADNESS", "ANGER", "BASIC", "QUESTION" 중 하나
+        """
+        if self.emotion_backend != "llm":
+            emotion, confidence = self.emotion_classifier.classify(user_message)
+            if self.emotion_backend == "local" or confidence >= self.emotion_min_confidence:
+                print(f"[감정 분석] 로컬: {emotion} (신뢰도 {confidence:.2f})")
+                return emotion
+            print(f"[감정 분석] 로컬 신뢰도 낮음 ({emotion}, {confidence:.2f}) → LLM 분류")
+        return self._analyze_user_emotion_llm(user_message)
+
+    def _analyze_user_emotion_llm(self, user_message: str) -> str:
+        """
+        LLM 기반 유저 감정 분석
         유저 메시지의 감정을 5가지 카테고리로 분류
         
         Returns:
             str: "JOY", "SADNESS", "ANGER", "BASIC", "QUESTION" 중 하나
         """
         try:
-            emotion_prompt = f"""당신은 감정 분석 전문가입니다. 다음 유저 메시지의 감정을 정확히 하나만 선택하세요.
+            emotion = self._classify_emotion_llm(user_message)
+            
+            # 유효성 검사
+            valid_emotions = ["JOY", "SADNESS", "ANGER", "QUESTION", "BASIC"]
+            if emotion not in valid_emotions:
+                print(f"[경고] 유효하지 않은 감정 분석 결과: {emotion}, BASIC으로 대체")
+                emotion = "BASIC"
+            
+            return emotion
+            
+        except Exception as e:
+            print(f"[에러] 감정 분석 실패: {e}")
+            return "BASIC"
+    
+    def _classify_emotion_llm(self, user_message: str) -> str:
+        """LLM 감정 분류 원본 응답 (대문자). 호출 실패 시 예외, 유효성 검사 없음 - 평가 도구도 사용"""
+        emotion_prompt = f"""당신은 감정 분석 전문가입니다. 다음 유저 메시지의 감정을 정확히 하나만 선택하세요.
 
 [유저 메시지]
 "{user_message}"
@@ -863,33 +1374,22 @@ class ChatbotService:
 
 출력:"""
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "당신은 감정 분석 전문가입니다. 단어 하나만 출력합니다."},
-                    {"role": "user", "content": emotion_prompt}
-                ],
-                temperature=0.3,  # 일관성을 위해 낮은 temperature
-                max_tokens=10
-            )
-            
-            emotion = response.choices[0].message.content.strip().upper()
-            
-            # 유효성 검사
-            valid_emotions = ["JOY", "SADNESS", "ANGER", "QUESTION", "BASIC"]
-            if emotion not in valid_emotions:
-                print(f"[경고] 유효하지 않은 감정 분석 결과: {emotion}, BASIC으로 대체")
-                emotion = "BASIC"
-            
-            return emotion
-            
-        except Exception as e:
-            print(f"[에러] 감정 분석 실패: {e}")
-            return "BASIC"
+        response = self._chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "당신은 감정 분석 전문가입니다. 단어 하나만 출력합니다."},
+                {"role": "user", "content": emotion_prompt}
+            ],
+            temperature=0.3,  # 일관성을 위해 낮은 temperature
+            max_tokens=10,
+            max_retries=1
+        )
+        
+        return response.choices[0].message.content.strip().upper()
     
     def _determine_owl_emotion(self, user_message: str, session: PostOfficeSession, 
                                user_emotion: str, is_crisis: bool = False,
-                               is_rejection: bool = False) -> str:
+                               is_rejection: bool = False, features=None) -> str:
         """
         DIR-E-104: 상황 기반 부엉이 감정 결정
         LLM 감정 분석 결과를 기반으로, 상황에 따라 오버라이드
@@ -900,11 +1400,31 @@ class ChatbotService:
             user_emotion: LLM이 분석한 유저 감정
             is_crisis: 위기 상황 여부
             is_rejection: 유저의 거부/분노 감지 여부
+            features: 이번 메시지의 IntentFeatures (없으면 여기서 scan)
             
         Returns:
             str: "기본", "기쁨", "슬픔", "분노", "의문" 중 하나
         """
+        if features is None:
+            features = self.intent_detector.scan(user_message)
+        override = self._owl_emotion_override(user_message, session, is_crisis, is_rejection, features)
+        if override is not None:
+            return override
         
+        # 5. LLM 감정 분석 결과 활용 (오버라이드 없을 때)
+        emotion_map = {
+            "JOY": "기쁨",
+            "SADNESS": "슬픔",
+            "ANGER": "분노",
+            "QUESTION": "의문",
+            "BASIC": "기본"
+        }
+        
+        return emotion_map.get(user_emotion, "기본")
+    
+    def _owl_emotion_override(self, user_message: str, session: PostOfficeSession,
+                              is_crisis: bool, is_rejection: bool, features) -> str:
+        """상황 기반 부엉이 감정 (유저 감정 분석과 무관하게 정해지면 그 감정, 아니면 None)"""
         # 1. QUESTION: Phase 전환 확인, 재입장 요청 등
         # 재입장 확인 대기
         if hasattr(session, 'awaiting_reenter_confirm') and session.awaiting_reenter_confirm:
@@ -915,20 +1435,18 @@ class ChatbotService:
             return "의문"
         
         # 편지 즉시 전달 요청 감지
-        early_letter_keywords = ["편지", "내놓", "줘", "보내줘", "빨리", "그만", "끝"]
-        if any(k in user_message for k in early_letter_keywords):
+        if "emotion_early_letter" in features:
             if session.phase == 3 and session.room_conversation_count < 3:
                 return "의문"
             if session.phase == 3.5 and session.drawer_conversation_count < 2:
                 return "의문"
         
         # 재입장 의도 감지
-        reenter_keywords = ["다시", "처음", "새로", "재입장", "리셋"]
-        if any(k in user_message for k in reenter_keywords) and any(w in user_message for w in ["시작", "입장", "해", "할래"]):
+        if "emotion_reenter" in features and "emotion_reenter_action" in features:
             return "의문"
         
         # 유저가 질문할 때
-        if user_message.strip().endswith("?") or user_message.strip().endswith("？"):
+        if features.ends_with_question:
             return "의문"
         
         # 2. ANGER: 유저가 부엉에게 화를 낼 때만! (공격적 표현)
@@ -937,12 +1455,11 @@ class ChatbotService:
         
         # 부엉에게 향한 공격/거부만 분노로 처리 (문맥 고려)
         # "너가 싫어", "너는 싫어" 같은 부엉에게 직접 향한 표현만 감지
-        if any(pattern in user_message for pattern in ["너가 싫어", "너는 싫어", "넌 싫어", "당신 싫어", "부엉 싫어"]):
+        if "emotion_anger_at_owl" in features:
             return "분노"
         
         # 부엉과 무관한 일반 공격어만 체크
-        direct_attack_keywords = ["꺼져", "시러", "불쾌", "까먹", "필요없"]
-        if any(k in user_message for k in direct_attack_keywords):
+        if "emotion_attack" in features:
             return "분노"
         
         # "화났어", "짜증나" 같은 유저의 감정 표현은 제외 (부엉에게 한 말이 아님)
@@ -951,14 +1468,11 @@ class ChatbotService:
         if is_crisis:
             return "슬픔"
         
-        crisis_keywords = ["죽고", "자살", "자해", "극단", "끝", "포기"]
-        if any(k in user_message for k in crisis_keywords):
+        if "emotion_crisis" in features:
             return "슬픔"
         
         # 슬픔 키워드 확장 (실패, 이별, 상실 관련 추가)
-        sad_keywords = ["슬프", "힘들", "우울", "불안", "무서", "두렵", "걱정", "후회", "미안", "아프", "괴롭", "외로",
-                       "실패", "망했", "이별", "헤어", "떠나", "차였", "버림", "잃", "상실", "그리워", "보고싶"]
-        if any(k in user_message for k in sad_keywords):
+        if "emotion_sad" in features:
             return "슬픔"
         
         # 4. JOY: 긍정적 감정, 편지 전달 후
@@ -967,27 +1481,27 @@ class ChatbotService:
             return "기쁨"
         
         # 기쁨 키워드 정제 (맥락 고려)
-        joy_keywords = ["행복", "기쁨", "만족", "감사", "고마", "즐거", "웃"]
-        hope_keywords = ["하고싶", "희망", "바라", "소망"]  # 희망/소망은 기본으로 (부엉이가 무표정하게 듣는 게 적절)
-        
-        # 희망/소망은 기본 감정 (무표정하게 듣기)
-        if any(k in user_message for k in hope_keywords):
+        # 희망/소망은 기본 감정 (무표정하게 듣기 - 부엉이가 무표정하게 듣는 게 적절)
+        if "emotion_hope" in features:
             return "기본"
         
         # 순수한 기쁨 표현만 기쁨으로
-        if any(k in user_message for k in joy_keywords):
+        if "emotion_joy" in features:
             return "기쁨"
         
-        # 5. LLM 감정 분석 결과 활용 (오버라이드 없을 때)
-        emotion_map = {
-            "JOY": "기쁨",
-            "SADNESS": "슬픔",
-            "ANGER": "분노",
-            "QUESTION": "의문",
-            "BASIC": "기본"
-        }
+        return None
+    
+    def _start_emotion_task(self, user_message: str, session: PostOfficeSession,
+                            is_crisis: bool, is_rejection: bool, features):
+        """
+        유저 감정 분석 시작 (메인 LLM 호출과 병렬)
         
-        return emotion_map.get(user_emotion, "기본")
+        위기/재입장/편지 요청/질문/거부처럼 부엉이 감정이 상황으로 정해지는 턴은
+        분석 결과를 쓰지 않으므로 제출하지 않고 None 반환
+        """
+        if self._owl_emotion_override(user_message, session, is_crisis, is_rejection, features) is not None:
+            return None
+        return self._submit(self._analyze_user_emotion, user_message)
     
     def _should_show_emotion(self, current_emotion: str, last_emotion: str, session: PostOfficeSession, is_crisis: bool = False) -> bool:
         """
@@ -1122,15 +1636,17 @@ class ChatbotService:
         
         return result if result else [text]
     
-    def _search_similar(self, query: str, top_k: int = 3, room_filter: str = None, similarity_threshold: float = 0.72) -> list:
-        """RAG 검색 (방별 필터링 지원)"""
+    def _search_similar(self, query: str, top_k: int = 3, room_filter: str = None, similarity_threshold: float = 0.72,
+                        query_embedding: list = None, with_sources: bool = False):
+        """RAG 검색 (방별 필터링 지원, with_sources면 (문서, 디버그 출처) 튜플 반환)"""
         if not self.collection:
-            return []
+            return ([], []) if with_sources else []
             
         try:
-            query_embedding = self._create_embedding(query)
+            if query_embedding is None:
+                query_embedding = self._create_embedding(query)
             if not query_embedding:
-                return []
+                return ([], []) if with_sources else []
             
             # 방 필터링 (특정 방의 데이터만 검색)
             where_filter = None
@@ -1145,6 +1661,7 @@ class ChatbotService:
             )
             
             documents = []
+            sources = []
             if results and results.get('documents'):
                 docs = results['documents'][0]
                 dists = results.get('distances', [[1.0] * len(docs)])[0]
@@ -1163,20 +1680,187 @@ class ChatbotService:
                 # 디버그: 콘솔/상태에 출처 노출
                 if self.debug_rag:
                     debug_list.sort(key=lambda x: x[0], reverse=True)
-                    self._last_sources = [
+                    sources = [
                         f"{md.get('filename')}#chunk={md.get('chunk_index')} sim={s:.3f}"
                         for s, md in debug_list[:max(top_k, 3)]
                     ]
-                    for line in self._last_sources:
+                    for line in sources:
                         print(f"[RAG] {line}")
             
-            return documents
+            return (documents, sources) if with_sources else documents
         except Exception as e:
             print(f"[에러] RAG 검색 실패: {e}")
-            return []
+            return ([], []) if with_sources else []
+
+    @staticmethod
+    def _rag_query_size(top_k: int, overfetch: int) -> int:
+        """_search_room_context의 필터 없는 1회 쿼리 크기 (방 우선 → 전역 완화를 나눌 여유분 포함)"""
+        return max(top_k * overfetch, 12)
+
+    def _search_room_context(self, query: str, top_k: int, room: str, query_embedding: list = None,
+                             with_sources: bool = False):
+        """
+        RAG 검색 (현재 방 우선, 매칭이 없으면 전역으로 완화 검색)
+        
+        필터 없는 쿼리 한 번으로 넉넉하게 가져온 뒤 Python에서 방별로 나눠
+        방 우선(0.72) → 전역(0.65) 정책을 한 번에 적용합니다.
+        방이 없으면 기존과 같이 전역 0.72 → 전역 0.65 순서 (fallback 통계는 방이 있는 검색만 집계)
+        with_sources면 (문서, 디버그 출처) 튜플을 반환 (출처는 턴 결과로만 전달, 인스턴스에 저장하지 않음)
+        """
+        if not self.collection:
+            return ([], []) if with_sources else []
+        
+        try:
+            if query_embedding is None:
+                query_embedding = self._create_embedding(query)
+            if not query_embedding:
+                return ([], []) if with_sources else []
+            
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=self._rag_query_size(top_k, self.rag_overfetch),
+                include=["documents", "metadatas", "distances"]
+            )
+            
+            hits = []
+            if results and results.get('documents'):
+                docs = results['documents'][0]
+                dists = results.get('distances', [[1.0] * len(docs)])[0]
+                metas = results.get('metadatas', [[{}] * len(docs)])[0]
+                # 거리 → 유사도 변환
+                hits = [(1.0 / (1.0 + float(dist)), doc, md or {}) for doc, dist, md in zip(docs, dists, metas)]
+                hits.sort(key=lambda x: x[0], reverse=True)
+            
+            room_hits = [h for h in hits if h[0] >= 0.72 and (not room or h[2].get("room") == room)]
+            fallback = not room_hits
+            selected = room_hits if room_hits else [h for h in hits if h[0] >= 0.65]
+            selected = selected[:top_k]
+            
+            if room:
+                with self._rag_stats_lock:
+                    self._rag_stats["queries"] += 1
+                    if fallback:
+                        self._rag_stats["fallback"] += 1
+                        if selected:
+                            self._rag_stats["fallback_hits"] += 1
+                    stats = dict(self._rag_stats)
+            if room and fallback:
+                print(f"[RAG] '{room}' 매칭 없음 → 전역 검색 {len(selected)}개 "
+                      f"(fallback {stats['fallback']}/{stats['queries']} = {stats['fallback'] / stats['queries']:.0%})")
+            
+            # 디버그: 콘솔/상태에 출처 노출
+            sources = []
+            if self.debug_rag:
+                sources = [
+                    f"{md.get('filename')}#chunk={md.get('chunk_index')} sim={s:.3f}"
+                    for s, _, md in hits[:max(top_k, 3)]
+                ]
+                for line in sources:
+                    print(f"[RAG] {line}")
+            
+            documents = [doc for _, doc, _ in selected]
+            return (documents, sources) if with_sources else documents
+        except Exception as e:
+            print(f"[에러] RAG 검색 실패: {e}")
+            return ([], []) if with_sources else []
+    
+    def get_rag_stats(self) -> dict:
+        """방 우선 검색 통계 (전역 fallback 발생 비율 포함)"""
+        with self._rag_stats_lock:
+            stats = dict(self._rag_stats)
+        stats["fallback_rate"] = stats["fallback"] / stats["queries"] if stats["queries"] else 0.0
+        return stats
+
+    def _start_turn_tasks(self, user_message: str, session: PostOfficeSession, top_k: int = 5,
+                          needs_counseling: bool = False) -> dict:
+        """
+        턴 단위 fan-out: user_message에만 의존하는 조회들을 공유 executor에서 동시에 시작
+        
+        Returns:
+            dict: {"rag", "counseling", "persona"} → Future
+                  (프롬프트 구성 전/후처리 시점에 self._join()으로 합류, "rag"는 (문서, 출처) 튜플)
+                  유저 감정 분석은 쓰는 분기에서만 _start_emotion_task로 따로 시작
+        """
+        from concurrent.futures import Future
+        # 쿼리 임베딩은 한 번만 만들고 RAG / RAG-D가 공유
+        # (임베딩 완료 후 이어서 제출 - 의존 작업이 풀 워커를 잡은 채 대기하지 않음)
+        query_vec = self._submit(self._create_embedding, user_message)
+        room = session.selected_room
+        tasks = {
+            "rag": self._chain(query_vec, self._search_turn_context, user_message, top_k, room),
+            "persona": self._submit(
+                self._search_persona, user_message, session.get_summary(), set(session.used_persona_stories)
+            ),
+        }
+        if needs_counseling and self.counseling_vectordb:
+            tasks["counseling"] = self._chain(query_vec, self._search_counseling_knowledge, user_message, 3)
+        else:
+            tasks["counseling"] = Future()
+            tasks["counseling"].set_result([])
+        return tasks
+
+    def _search_turn_context(self, user_message: str, top_k: int, room: str, query_embedding: list):
+        """턴 fan-out용 RAG 검색: (문서, 디버그 출처) 튜플"""
+        return self._search_room_context(user_message, top_k, room, query_embedding, with_sources=True)
+
+    def _chain(self, task, fn, *args):
+        """task가 끝나면 fn(*args, task 결과)를 이어서 제출 (콜백 체인 - 대기하며 워커를 점유하지 않음)"""
+        from concurrent.futures import Future
+        chained = Future()
+
+        def _relay(inner):
+            exc = inner.exception()
+            if exc is not None:
+                chained.set_exception(exc)
+            else:
+                chained.set_result(inner.result())
+
+        def _start(done):
+            try:
+                self._executor.submit(fn, *args, done.result()).add_done_callback(_relay)
+            except Exception as e:  # 선행 작업 실패 / executor 종료
+                chained.set_exception(e)
+
+        task.add_done_callback(_start)
+        return chained
+
+    def _submit(self, fn, *args):
+        """
+        턴 병렬 작업 제출 (동기/async 경로 모두 공유 executor)
+        
+        조회 작업은 Chroma / SQLite 캐시를 블로킹으로 읽으므로 async 경로에서도 스레드에서 돌리고,
+        이벤트 루프는 _join에서 완료만 await (루프 위에서 차례로 실행되어 fan-out이 직렬화되지 않음)
+        """
+        return self._executor.submit(fn, *args)
+
+    def _join(self, task):
+        """
+        _submit / 작업 큐 Future 대기 (async 경로에서는 이벤트 루프를 막지 않고 await)
+        
+        작업 자체가 취소되었으면 두 경로 모두 concurrent.futures.CancelledError,
+        기다리던 턴 task가 취소된 경우는 asyncio.CancelledError를 그대로 전파 (공유 작업은 shield로 보호)
+        """
+        if in_async_context():
+            try:
+                return await_only(asyncio.shield(asyncio.wrap_future(task)))
+            except asyncio.CancelledError:
+                if task.cancelled():
+                    raise CancelledError() from None
+                raise
+        return task.result()
+
+    @staticmethod
+    def _blocking(fn, *args):
+        """블로킹 I/O 호출 (async 경로의 greenlet에서는 스레드로 넘겨 await, 동기 경로는 그대로 호출)"""
+        if in_async_context():
+            return await_only(asyncio.to_thread(fn, *args))
+        return fn(*args)
 
     def _summarize_if_needed(self, session: PostOfficeSession):
         """대화가 길어지면 자동 요약을 수행하여 프롬프트 컨텍스트를 경량화 (배포용 - 긴 대화 지원)"""
+        # 지난 턴에 백그라운드로 돌린 요약이 끝났으면 먼저 반영
+        if self._apply_summary_job(session):
+            return
         total_msgs = len(session.conversation_history)
         # 일정 간격(30개 메시지 증가)마다 요약
         if total_msgs - session.last_summary_messages_len < 30:
@@ -1184,40 +1868,86 @@ class ChatbotService:
         # 최근 사용자 메시지 중심으로 축약 요약 (최근 60개로 설정 - 긴 대화 대응)
         user_messages = [m['content'] for m in session.conversation_history if m['role'] == 'user']
         recent_slice = "\n".join(user_messages[-60:])  # 최근 60개 사용자 메시지
-        system = (
-            "아래 대화를 8-10문장의 핵심 요약으로 압축하세요. "
-            "인물/사건/감정/목표/주요 고민을 포함하고 불필요한 세부는 제거하세요."
-        )
+        previous_summary = session.summary_text
+
+        if self.summary_background:
+            # 요약(LLM 1~2회)은 응답을 막지 않도록 작업 큐에서 돌리고 다음 턴에 반영
+            job_id = self.jobs.submit("summary", self._compute_summary, recent_slice, previous_summary,
+                                      owner=session.username)
+            if job_id is not None:
+                with self._letter_drafts_lock:
+                    self._summary_jobs[session.username] = {
+                        "job_id": job_id,
+                        "history": session.conversation_history,
+                        "base": previous_summary,
+                        "messages_len": total_msgs,
+                    }
+                return
+
         try:
-            response = self._chat_completion(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": recent_slice}
-                ],
-                temperature=0.2,
-                max_tokens=350  # 토큰 수 증가 (긴 대화 요약 대응)
-            )
-            summary = response.choices[0].message.content.strip()
-            # 누적 요약 방식: 기존 요약과 결합 후 다시 한 줄 정리
-            if session.summary_text:
-                merged = f"[이전 요약]\n{session.summary_text}\n\n[최근 요약]\n{summary}"
-                response2 = self._chat_completion(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "두 요약을 10-12문장으로 통합 요약하세요. 중복을 제거하고 핵심만 남기세요."},
-                        {"role": "user", "content": merged}
-                    ],
-                    temperature=0.2,
-                    max_tokens=350  # 토큰 수 증가
-                )
-                session.summary_text = response2.choices[0].message.content.strip()
-            else:
-                session.summary_text = summary
+            session.summary_text = self._compute_summary(recent_slice, previous_summary)
             session.last_summary_messages_len = total_msgs
             print(f"[요약 완료] 총 {total_msgs}개 메시지, 요약 길이: {len(session.summary_text)}자")
         except Exception as e:
             print(f"[경고] 요약 실패: {e}")
+
+    def _compute_summary(self, recent_slice: str, previous_summary: str) -> str:
+        """최근 사용자 메시지 요약 (+ 기존 요약과 누적 통합) - 실패 시 예외"""
+        system = (
+            "아래 대화를 8-10문장의 핵심 요약으로 압축하세요. "
+            "인물/사건/감정/목표/주요 고민을 포함하고 불필요한 세부는 제거하세요."
+        )
+        response = self._chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": recent_slice}
+            ],
+            temperature=0.2,
+            max_tokens=350  # 토큰 수 증가 (긴 대화 요약 대응)
+        )
+        summary = response.choices[0].message.content.strip()
+        if not previous_summary:
+            return summary
+        # 누적 요약 방식: 기존 요약과 결합 후 다시 한 줄 정리
+        merged = f"[이전 요약]\n{previous_summary}\n\n[최근 요약]\n{summary}"
+        response2 = self._chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "두 요약을 10-12문장으로 통합 요약하세요. 중복을 제거하고 핵심만 남기세요."},
+                {"role": "user", "content": merged}
+            ],
+            temperature=0.2,
+            max_tokens=350  # 토큰 수 증가
+        )
+        return response2.choices[0].message.content.strip()
+
+    def _apply_summary_job(self, session: PostOfficeSession) -> bool:
+        """
+        백그라운드 요약 작업 결과 반영
+
+        Returns:
+            bool: 작업이 아직 진행 중이거나 방금 반영했으면 True (이번 턴에는 새 요약을 시작하지 않음)
+        """
+        with self._letter_drafts_lock:
+            pending = self._summary_jobs.get(session.username)
+        if pending is None:
+            return False
+        job = self.jobs.get(pending["job_id"], owner=session.username)
+        if job is not None and job["status"] in (QUEUED, RUNNING):
+            return True
+        with self._letter_drafts_lock:
+            if self._summary_jobs.get(session.username) is pending:
+                self._summary_jobs.pop(session.username)
+        # 그 사이 리셋/재입장했거나 요약이 바뀌었으면 버림 (실패/만료도 버리고 다음 간격에 다시 시도)
+        if (job is None or job["status"] != DONE
+                or pending["history"] is not session.conversation_history
+                or session.summary_text != pending["base"]):
+            return False
+        session.summary_text = job["result"]
+        session.last_summary_messages_len = pending["messages_len"]
+        print(f"[요약 완료] 총 {pending['messages_len']}개 메시지, 요약 길이: {len(session.summary_text)}자 (백그라운드)")
+        return True
     
     def _detect_room_selection(self, user_message: str, exclude_before_malggo: bool = False) -> str:
         """
@@ -1227,45 +1957,26 @@ class ChatbotService:
             user_message: 유저 메시지
             exclude_before_malggo: "말고" 앞의 방 이름 제외 여부
         """
-        message = user_message
-        message_lower = user_message.lower()
-        
-        # "말고" 뒤의 내용만 검색 (방 변경 요청 시)
-        if exclude_before_malggo and "말고" in message:
-            message = message.split("말고", 1)[1]  # "말고" 뒤만 사용
-            message_lower = message.lower()
-        
-        if '후회' in message or 'regret' in message_lower:
-            return 'regret'
-        elif '사랑' in message or 'love' in message_lower:
-            return 'love'
-        elif '불안' in message or 'anxiety' in message_lower:
-            return 'anxiety'
-        elif '꿈' in message or 'dream' in message_lower:
-            return 'dream'
-        
-        return None
+        features = self.intent_detector.scan(user_message)
+        return features.room_after_malggo if exclude_before_malggo else features.room
     
-    def _detect_room_change_request(self, user_message: str, current_room: str) -> dict:
+    def _detect_room_change_request(self, user_message: str, current_room: str, features=None) -> dict:
         """
         방 변경 요청 감지 (현재 방과 다른 방으로 가려는 시도)
         
         Returns:
             dict: {"type": "specific"/"any"/"same", "room": str or None}
         """
+        if features is None:
+            features = self.intent_detector.scan(user_message)
         # 방 변경 키워드 체크
-        change_keywords = [
-            "방으로", "방 가고", "방에 가", "다른 방", "바꾸고", "이동",
-            "말고", "대신", "방을", "방 할래", "방 하고", "가고 싶",
-            "바꿀래", "옮기고", "변경"
-        ]
-        has_change_intent = any(keyword in user_message for keyword in change_keywords)
+        has_change_intent = "room_change" in features
         
         if not has_change_intent:
             return {"type": None, "room": None}
         
         # "말고" 뒤의 방만 감지 (중요!)
-        requested_room = self._detect_room_selection(user_message, exclude_before_malggo=True)
+        requested_room = features.room_after_malggo
         
         # 디버그 로그
         print(f"[방 변경 감지] 입력: '{user_message}'")
@@ -1283,7 +1994,7 @@ class ChatbotService:
             return {"type": "same", "room": current_room}
         
         # 케이스 3: "다른 방"이라고만 함 (구체적 방 이름 없음)
-        if "다른 방" in user_message or "방 바꾸" in user_message or "방 변경" in user_message:
+        if "room_change_any" in features:
             print(f"[방 변경 감지] ✅ 비구체적 변경 요청: 방 선택 버튼 제공")
             return {"type": "any", "room": None}
         
@@ -1390,11 +2101,226 @@ class ChatbotService:
         return "\n".join(prompt_parts)
     
     def _generate_letter(self, session: PostOfficeSession) -> str:
-        """DIR-S-403: 편지 생성 (우표 코드의 상황 정보 포함)"""
+        """DIR-S-403: 편지 생성 (우표 코드의 상황 정보 포함). 미리 만들어 둔 편지가 아직 유효하면 그대로 사용"""
         
         # 우표 코드 정보 가져오기
         stamp_code = session.selected_drawer  # 우표 코드가 저장되어 있음
         
+        job_id = self._take_letter_draft(session, stamp_code)
+        if job_id:
+            try:
+                result = self._join(self.jobs.future(job_id))  # 아직 생성 중이면 남은 시간만 대기
+                if not result["fallback"]:
+                    print(f"[편지 선생성] 사용 ✅ ({session.username})")
+                    return result["letter"]
+            except CancelledError:
+                print(f"[경고] 편지 선생성 작업이 취소됨 → 즉시 생성")
+            except Exception as e:
+                print(f"[경고] 편지 선생성 실패 → 즉시 생성: {e}")
+        
+        return self._letter_job(
+            session.username, session.selected_room, stamp_code, session.get_summary(),
+            session.room_conversation_count + session.drawer_conversation_count
+        )["letter"]
+    
+    def _deliver_letter(self, session: PostOfficeSession, add_to_history: bool = False) -> tuple:
+        """
+        편지 전달: session.letter_content를 채우고 (편지, None), 아직 생성 중이면 (None, 작업 id) 반환
+        
+        LETTER_ASYNC=1이면 턴 응답은 편지를 기다리지 않고, 클라이언트가 /api/jobs/<id>로 완료를 확인.
+        letter_content는 작업이 끝나는 대로 유저 락 안에서 채우고 저장 (_finish_letter_job,
+        작업 큐가 가득 차면 기존처럼 바로 생성). add_to_history면 그때 편지를 대화 기록에도 추가
+        """
+        letter = None
+        job_id = None
+        if self.letter_async:
+            stamp_code = session.selected_drawer
+            job_id = self._take_letter_draft(session, stamp_code)
+            job = self.jobs.get(job_id, owner=session.username) if job_id else None
+            if job is not None and job["status"] == DONE and not job["result"]["fallback"]:
+                print(f"[편지 선생성] 사용 ✅ ({session.username})")
+                letter, job_id = job["result"]["letter"], None
+            elif job is not None and job["status"] in (QUEUED, RUNNING):
+                print(f"[편지 선생성] 생성 중인 편지로 응답 ({session.username}, 작업 {job_id})")
+            else:
+                job_id = self.jobs.submit(
+                    "letter", self._letter_job, session.username, session.selected_room, stamp_code,
+                    session.get_summary(), session.room_conversation_count + session.drawer_conversation_count,
+                    owner=session.username
+                )
+        if letter is None and job_id is None:
+            letter = self._generate_letter(session)
+        session.letter_content = letter
+        if job_id is None:
+            with self._letter_drafts_lock:
+                self._letter_jobs.pop(session.username, None)
+            return letter, None
+        
+        # 작업 스레드에서 세션을 건드리지 않고, 끝나면 유저 락 안에서 반영 (_finish_letter_job)
+        with self._letter_drafts_lock:
+            for username, pending in list(self._letter_jobs.items()):
+                if self.jobs.future(pending["job_id"]) is None:  # 만료된 작업 정리
+                    del self._letter_jobs[username]
+            self._letter_jobs[session.username] = {
+                "job_id": job_id,
+                "stamp_code": session.selected_drawer,
+                "messages_len": len(session.conversation_history),
+                "add_to_history": add_to_history,
+            }
+        # 완료 콜백은 작업 스레드(이미 끝났으면 지금 유저 락을 쥔 이 스레드)에서 불리므로
+        # 유저 락은 별도 스레드에서 기다림 (편지는 세션당 한 번이라 스레드 수는 적음)
+        username = session.username
+        self.jobs.future(job_id).add_done_callback(
+            lambda _: threading.Thread(target=self._finish_letter_job, args=(username, job_id), daemon=True).start()
+        )
+        return None, job_id
+    
+    def _finish_letter_job(self, username: str, job_id: str):
+        """편지 작업 완료 콜백: 턴이 끝나길 기다렸다가 세션에 편지를 반영하고 바로 기록 (TTL 만료/재기동에도 유지)"""
+        try:
+            with self._user_lock(username):
+                with self._letter_drafts_lock:
+                    pending = self._letter_jobs.get(username)
+                if pending is None or pending["job_id"] != job_id:  # 이미 턴 시작 때 반영했거나 새 편지로 바뀜
+                    return
+                self._apply_letter_job(self._fetch_session(username))
+        except Exception as e:
+            print(f"[경고] 편지 반영 실패 ({username}): {e}")
+        finally:
+            self._session_writer.flush_soon()
+    
+    def _apply_letter_job(self, session: PostOfficeSession):
+        """
+        응답 후 생성된 편지 반영 (작업 완료 콜백, 혹은 그 전에 시작한 턴의 시작 시 호출)
+        
+        그 사이 재입장/새 편지로 상태가 바뀌었으면 버림. 캐시에서 내려갔다 다시 읽힌 세션에도 반영되도록
+        history 객체가 아니라 Phase / 우표 / 대화 길이로 같은 편지 차례인지 확인
+        """
+        with self._letter_drafts_lock:
+            pending = self._letter_jobs.get(session.username)
+        if pending is None:
+            return
+        job = self.jobs.get(pending["job_id"], owner=session.username)
+        if job is not None and job["status"] in (QUEUED, RUNNING):
+            return
+        with self._letter_drafts_lock:
+            if self._letter_jobs.get(session.username) is pending:
+                del self._letter_jobs[session.username]
+        if (job is None or job["status"] != DONE or session.phase != 5 or session.letter_content is not None
+                or session.selected_drawer != pending["stamp_code"]
+                or len(session.conversation_history) < pending["messages_len"]):
+            return
+        session.letter_content = job["result"]["letter"]
+        if pending["add_to_history"]:
+            session.add_message("assistant", session.letter_content)
+        self._save_session(session)
+        print(f"[편지] 생성 완료된 편지 반영 ({session.username})")
+    
+    def _pending_letter_job(self, username: str):
+        """아직 생성 중인 편지 작업 id (없으면 None)"""
+        with self._letter_drafts_lock:
+            pending = self._letter_jobs.get(username)
+        if pending is None:
+            return None
+        job = self.jobs.get(pending["job_id"], owner=username)
+        return pending["job_id"] if job is not None and job["status"] in (QUEUED, RUNNING) else None
+    
+    def _letter_job(self, username: str, room: str, stamp_code: str, conversation_summary: str,
+                    conversation_count: int) -> dict:
+        """편지 작업 본체: {"letter": 편지, "fallback": 생성 실패로 기본 문구를 썼는지}"""
+        try:
+            return {"letter": self._compose_letter(username, room, stamp_code, conversation_summary, conversation_count),
+                    "fallback": False}
+        except Exception as e:
+            print(f"[에러] 편지 생성 실패: {e}")
+            return {"letter": "To. 지금의 나에게.\n\n네가 찾고 있던 그 마음, 여기 있어. 잊지 마.", "fallback": True}
+    
+    def _precompute_letter(self, session: PostOfficeSession, stamp_code: str):
+        """
+        편지 선생성 (투기적 실행): 지금 대화 상태로 편지를 작업 큐에서 미리 생성
+        
+        요약 + 우표 코드 해시가 이미 예약된 것과 같으면 건너뛰고, 다르면 이전 예약을 교체.
+        입력값은 요청 스레드에서 스냅샷으로 넘기므로 작업 중 세션이 바뀌어도 안전
+        """
+        if not self.letter_precompute:
+            return
+        summary = session.get_summary()
+        key = hashlib.sha1(f"{stamp_code}\0{session.selected_room}\0{summary}".encode("utf-8")).hexdigest()
+        summary_text, messages = session.summary_parts()
+        with self._letter_drafts_lock:
+            draft = self._letter_drafts.get(session.username)
+            if draft is not None and self.jobs.future(draft["job_id"]) is not None and (
+                    draft["key"] == key or self._draft_added_chars(draft, session, stamp_code) is not None):
+                # 같은 입력이거나 전환 시점에 그대로 쓸 수 있는 예약이면 유지 (편지당 LLM 호출 1회)
+                return
+            if draft is not None:
+                self.jobs.cancel(draft["job_id"])  # 아직 시작 전이면 취소 (실행 중이면 결과만 버림)
+            job_id = self.jobs.submit(
+                "letter", self._letter_job, session.username, session.selected_room, stamp_code, summary,
+                session.room_conversation_count + session.drawer_conversation_count,
+                owner=session.username
+            )
+            if job_id is None:
+                self._letter_drafts.pop(session.username, None)
+                return
+            self._letter_drafts[session.username] = {
+                "key": key,
+                "stamp_code": stamp_code,
+                "room": session.selected_room,
+                "summary_text": summary_text,
+                "messages": frozenset(messages),
+                "job_id": job_id,
+            }
+        print(f"[편지 선생성] 시작: {session.username} (우표 {stamp_code}, 서랍 대화 {session.drawer_conversation_count}회)")
+    
+    def _precompute_early_letter(self, session: PostOfficeSession):
+        """
+        Phase 3 조기 편지 확인 직전 선생성
+        
+        아직 우표가 없으므로 지금 정한 우표는 예약(draft)에만 두고 세션은 건드리지 않음
+        (확인하면 _early_letter_stamp가 그 우표를 꺼내 전달 시점에 세션에 기록)
+        """
+        if not self.letter_precompute:
+            return
+        self._precompute_letter(session, self._determine_stamp_code(session))
+    
+    def _early_letter_stamp(self, session: PostOfficeSession) -> str:
+        """조기 편지 전달 우표: 아직 유효한 선생성 예약이 있으면 그 우표, 없으면 지금 결정"""
+        with self._letter_drafts_lock:
+            draft = self._letter_drafts.get(session.username)
+        if draft is not None and self._draft_added_chars(draft, session, draft["stamp_code"]) is not None:
+            return draft["stamp_code"]
+        return self._determine_stamp_code(session)
+    
+    def _draft_added_chars(self, draft: dict, session: PostOfficeSession, stamp_code: str):
+        """
+        선생성 이후 새로 들어온 유저 메시지 글자 수 (예약이 무효면 None)
+        
+        무효 조건: 우표/방/장기 요약이 달라졌거나, 새 유저 메시지가
+        LETTER_PRECOMPUTE_SLACK자를 넘음 (편지 확인 버튼 같은 짧은 답은 허용)
+        """
+        summary_text, messages = session.summary_parts()
+        added = sum(len(m) for m in messages if m not in draft["messages"])
+        if (draft["stamp_code"] != stamp_code or draft["room"] != session.selected_room
+                or draft["summary_text"] != summary_text or added > self.letter_precompute_slack):
+            return None
+        return added
+    
+    def _take_letter_draft(self, session: PostOfficeSession, stamp_code: str):
+        """선생성 편지 작업 id 꺼내기 (없거나 무효면 None - 무효 조건은 _draft_added_chars)"""
+        with self._letter_drafts_lock:
+            draft = self._letter_drafts.pop(session.username, None)
+        if draft is None or self.jobs.future(draft["job_id"]) is None:
+            return None
+        if self._draft_added_chars(draft, session, stamp_code) is None:
+            self.jobs.cancel(draft["job_id"])
+            print(f"[편지 선생성] 무효: 우표 {draft['stamp_code']} → {stamp_code} 또는 새 대화 > {self.letter_precompute_slack}자 → 다시 생성")
+            return None
+        return draft["job_id"]
+    
+    def _compose_letter(self, username: str, room: str, stamp_code: str, conversation_summary: str,
+                        conversation_count: int) -> str:
+        """편지 LLM 호출 (세션 스냅샷 값만 사용 → 작업 큐에서도 호출). 실패 시 예외"""
         # 클래스 변수 STAMP_CODES 사용
         stamp_info = self._get_stamp_info(stamp_code)
         
@@ -1404,9 +2330,7 @@ class ChatbotService:
         else:
             stamp_situation = stamp_info['situation']
         
-        # 대화 요약
-        conversation_summary = session.get_summary()
-        room_data = self.config.get('rooms', {}).get(session.selected_room, {})
+        room_data = self.config.get('rooms', {}).get(room, {})
         
         # DIR-S-403: 우표 코드의 '상황'을 프롬프트에 제공
         letter_prompt = f"""당신은 '10년 전의 나' 또는 '10년 후의 나'의 목소리로 편지를 작성합니다.
@@ -1443,9 +2367,9 @@ class ChatbotService:
 - **편지는 위 우표 주제를 반영하여 작성하세요**
 
 [유저 정보]
-- 유저 이름: {session.username}
+- 유저 이름: {username}
 
-[유저와의 대화 내용 (총 {session.room_conversation_count + session.drawer_conversation_count}회)]
+[유저와의 대화 내용 (총 {conversation_count}회)]
 {conversation_summary}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -1454,35 +2378,116 @@ class ChatbotService:
 
 위 긴 대화 내용을 바탕으로 **한국어로만** 편지를 작성하세요.
 
-편지 시작: "To. 지금의 {session.username}에게. \n\n 나는 [10년 전의 너/10년 후의 너]야."
-편지 마무리: "너의 [과거/미래]에서, [화자 이름 또는 {session.username}]."
+편지 시작: "To. 지금의 {username}에게. \n\n 나는 [10년 전의 너/10년 후의 너]야."
+편지 마무리: "너의 [과거/미래]에서, [화자 이름 또는 {username}]."
 
 **⚠️ 다시 한 번 강조: 반드시 한국어로만 작성하세요!**
 유저가 진정으로 필요로 하는 말을 담아주세요.
 """
         
+        response = self._chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": letter_prompt},
+                {"role": "user", "content": "편지를 작성해주세요."}
+            ],
+            temperature=0.7,
+            max_tokens=520
+        )
+        
+        letter = response.choices[0].message.content.strip()
+        return letter
+    
+    def generate_response(self, user_message: str, username: str = "방문자", on_token=None) -> dict:
+        """
+        응답 생성
+        
+        Args:
+            on_token: 상담 LLM 응답 토큰 콜백 (스트리밍용, 선택)
+        """
+        # 같은 유저의 턴은 직렬화 (더블클릭/동시 요청이 세션 상태를 섞지 않도록)
         try:
-            response = self._chat_completion(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": letter_prompt},
-                    {"role": "user", "content": "편지를 작성해주세요."}
-                ],
-                temperature=0.7,
-                max_tokens=520
-            )
-            
-            letter = response.choices[0].message.content.strip()
-            return letter
-        except Exception as e:
-            print(f"[에러] 편지 생성 실패: {e}")
-            return "To. 지금의 나에게.\n\n네가 찾고 있던 그 마음, 여기 있어. 잊지 마."
+            with self._user_lock(username):
+                return self._generate_response(user_message, username, on_token)
+        finally:
+            # 턴 동안 쌓인 세션 변경을 한 번에 기록 (writer가 턴 락을 잡을 수 있도록 락을 놓은 뒤)
+            self._session_writer.flush_soon()
+    
+    @contextmanager
+    def _user_lock(self, username: str, blocking: bool = True):
+        """
+        유저별 락 (참조 카운트로 관리하여 대기 중인 요청이 없으면 제거)
+        
+        blocking=False면 기다리지 않고 획득 여부(bool)를 yield (세션 writer의 턴 경계 스냅샷용)
+        """
+        with self._user_locks_guard:
+            entry = self._user_locks.setdefault(username, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = False
+        try:
+            acquired = entry[0].acquire(blocking)
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._user_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._user_locks.pop(username, None)
+    
+    async def agenerate_response(self, user_message: str, username: str = "방문자", on_token=None) -> dict:
+        """
+        generate_response의 asyncio 버전 (asgi.py의 async 라우트에서 사용)
+
+        턴 로직(_generate_response)은 greenlet 브리지에서 이벤트 루프 위로 실행되고,
+        LLM/임베딩 호출은 AsyncOpenAI로 await되므로 대화 하나가 OS 스레드를 점유하지 않음.
+        greenlet이 없으면 스레드에서 generate_response를 실행
+        """
+        if not async_bridge_available():
+            return await asyncio.to_thread(self.generate_response, user_message, username, on_token)
+        try:
+            async with self._auser_lock(username):
+                return await greenlet_spawn(self._generate_response, user_message, username, on_token)
+        finally:
+            self._session_writer.flush_soon()
+
+    @asynccontextmanager
+    async def _auser_lock(self, username: str):
+        """
+        _user_lock의 async 버전 (같은 락 표를 써서 WSGI/ASGI 턴도 서로 직렬화)
+        
+        바로 못 잡으면 스레드에서 기다려 이벤트 루프를 막지 않음.
+        기다리는 중에 취소되면 나중에 잡히는 락은 그 스레드 콜백에서 바로 놓음
+        """
+        with self._user_locks_guard:
+            entry = self._user_locks.setdefault(username, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = False
+        try:
+            acquired = entry[0].acquire(blocking=False)
+            if not acquired:
+                waiter = asyncio.get_running_loop().run_in_executor(None, entry[0].acquire)
+                try:
+                    await asyncio.shield(waiter)
+                except asyncio.CancelledError:
+                    waiter.add_done_callback(lambda _: entry[0].release())
+                    raise
+                acquired = True
+            yield
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._user_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._user_locks.pop(username, None)
     
-    def generate_response(self, user_message: str, username: str = "방문자") -> dict:
-        """응답 생성"""
+    def _generate_response(self, user_message: str, username: str, on_token=None) -> dict:
+        """응답 생성 본체 (Phase별 분기)"""
         
         # 세션 가져오기
         session = self._get_session(username)
+        self._apply_letter_job(session)  # 지난 턴 응답 후 생성된 편지 반영
         
         # Phase 1: 입장 (명시적 init으로만 시작)
         if user_message.strip().lower() == "init":
@@ -1534,8 +2539,10 @@ class ChatbotService:
         
         # 사용자 메시지 기록 + 반복 의도 상태 갱신 + 위기 완충 세팅
         session.add_message("user", user_message)
-        intent_key = self._update_repetition_state(session, user_message)
-        if self._detect_crisis(user_message):
+        # 이번 메시지의 키워드 의도를 한 번만 감지해 모든 분기에서 사용
+        features = self.intent_detector.scan(user_message)
+        intent_key = self._update_repetition_state(session, user_message, features)
+        if "crisis" in features:
             # 위기 표현 직후 1턴 완충 적용
             session.crisis_cooldown = max(session.crisis_cooldown, 1)
         # 세션 저장
@@ -1597,7 +2604,7 @@ class ChatbotService:
                 }
         
         # ✅ 재입장 의도 감지
-        if self._detect_reenter(user_message):
+        if "reenter" in features:
             # Phase 5(편지 받은 후)에서는 확인 없이 바로 재입장
             if session.phase == 5:
                 # 세션 완전 초기화
@@ -1717,16 +2724,16 @@ class ChatbotService:
 
         # 편지 확인 대기 응답 처리 (전 단계에서 버튼 노출 후)
         if session.awaiting_letter_confirm:
-            if self._detect_letter_confirm_yes(user_message):
-                # DIR-S-404: 편지 즉시 전달 (우표 코드 포함)
-                stamp_code = self._determine_stamp_code(session)
+            if "letter_confirm_yes" in features:
+                # DIR-S-404: 편지 즉시 전달 (우표 코드 포함, 편지도 같은 우표로)
+                stamp_code = self._early_letter_stamp(session)
+                session.selected_drawer = stamp_code  # 우표 코드 저장
                 
                 # 우표 정보 가져오기
                 stamp_info = self._get_stamp_info(stamp_code)
                 stamp_msg = f"자 너의 편지에 붙어 있었던 우표다. {stamp_info['mean']}"
                 
-                letter = self._generate_letter(session)
-                session.letter_content = letter
+                letter, letter_job = self._deliver_letter(session, add_to_history=True)  # 생성 중이면 letter_job으로 완료 확인
                 letter_bubble = f"{letter}"  # 편지 내용만
                 
                 session.phase = 5
@@ -1734,19 +2741,21 @@ class ChatbotService:
                 session.crisis_emotion_shown = False  # 감정 플래그 초기화
                 session.awaiting_letter_confirm = False
                 session.add_message("assistant", stamp_msg)
-                session.add_message("assistant", letter_bubble)
+                if letter:
+                    session.add_message("assistant", letter_bubble)
                 self._save_session(session)
                 return {
-                    "replies": [stamp_msg, letter_bubble],
+                    "replies": [stamp_msg, letter_bubble] if letter else [stamp_msg],
                     "image": None,
                     "phase": 5,
                     "letter": letter,
+                    "letter_job": letter_job,
                     "stamp_code": stamp_code,  # DIR-S-404: 우표 코드 반환
                     "stamp_description": stamp_msg,  # ✅ 우표 설명을 별도 필드로 전달
                     "is_letter_end": True,
                     "buttons": ["별빛 우체국에 다시 한번 입장"]
                 }
-            elif self._detect_letter_confirm_no(user_message):
+            elif "letter_confirm_no" in features:
                 # 확인 취소: 남은 대화 유지, 안내만 하고 계속 Phase 유지
                 session.awaiting_letter_confirm = False
                 self._save_session(session)
@@ -1772,7 +2781,7 @@ class ChatbotService:
         
         # Phase 2: 방 선택
         if session.phase == 2:
-            room_selected = self._detect_room_selection(user_message)
+            room_selected = features.room
             
             if room_selected:
                 # 방 선택 성공 → Phase 3으로 전환
@@ -1810,7 +2819,7 @@ class ChatbotService:
         # Phase 3: 방에서의 대화
         if session.phase == 3:
             # 방 변경 요청 감지
-            room_change_result = self._detect_room_change_request(user_message, session.selected_room)
+            room_change_result = self._detect_room_change_request(user_message, session.selected_room, features)
             
             # 케이스 1: 구체적인 다른 방으로 변경
             if room_change_result["type"] == "specific":
@@ -1869,6 +2878,7 @@ class ChatbotService:
             # ✅ 조기 편지 요청 처리 (Phase 3)
             if intent_key == "ask_letter_now":
                 session.awaiting_letter_confirm = True
+                self._precompute_early_letter(session)  # "응 편지를 받을래"에 대비
                 self._save_session(session)
                 
                 reply = "아직 대화를 마무리하지 못했는데 편지를 먼저 꺼내줄까?"
@@ -1912,6 +2922,7 @@ class ChatbotService:
             # ✅ 반복 스로틀: 동일 의도 3회 이상이면 확인 버튼 제공
             if session.repeated_intent_count >= 3:
                 session.awaiting_letter_confirm = True
+                self._precompute_early_letter(session)  # "응 편지를 받을래"에 대비
                 self._save_session(session)
                 return {
                     "reply": "아직 대화를 마무리하지 못했는데 편지를 먼저 꺼내줄까?",
@@ -1920,7 +2931,7 @@ class ChatbotService:
                     "buttons": ["응 편지를 받을래", "아니, 더 대화할래"]
                 }
             # 로딩 중이더라도, 이미 인덱스가 만들어졌다면 바로 진행
-            if getattr(self, "loading_embeddings", False) and self.collection and self.collection.count() == 0:
+            if self._room_loading(session.selected_room):
                 return {
                     "reply": "(자료를 정리하는 중이네… 잠깐만 기다려 주겠나.)",
                     "image": None,
@@ -1931,41 +2942,20 @@ class ChatbotService:
             self._summarize_if_needed(session)
             
             # 유저의 거부/불쾌감 감지
-            rejection_keywords = ["시러", "싫어", "꺼져", "불쾌", "필요없", "그만", "하기싫", "묻지마"]
-            user_lower = user_message.lower().replace(" ", "")
-            is_rejection = any(keyword in user_lower for keyword in rejection_keywords)
+            is_rejection = "rejection" in features
             
             # 거부 반응 시: 사과 후 주제 전환 (프롬프트에서 처리)
             # 하지만 최소 대화 횟수는 충족해야 함
             
-            # RAG 검색 (현재 방 우선)
-            rag_context = self._search_similar(
-                user_message,
-                top_k=5,
-                room_filter=session.selected_room,
-                similarity_threshold=0.72
-            )
-            # 매칭이 없으면 전역으로 완화 검색
-            if not rag_context:
-                rag_context = self._search_similar(
-                    user_message,
-                    top_k=5,
-                    room_filter=None,
-                    similarity_threshold=0.65
-                )
-            
-            # RAG-D: 위기 상황 또는 전문 상담이 필요한 경우 상담 매뉴얼 참조
-            counseling_knowledge = []
-            
             # ✅ 위기 모드 활성화 체크: 기존 모드 유지 OR 새로운 위기 감지
-            current_crisis_detected = self._detect_crisis(user_message)
+            current_crisis_detected = "crisis" in features
             if current_crisis_detected and not session.crisis_mode_active:
                 session.crisis_mode_active = True
                 print(f"[위기 모드] 활성화 ✅ (키워드 감지)")
             
             # ✅ 위기 모드 회복 감지 (연속 2회 회복 신호 시 해제)
             if session.crisis_mode_active:
-                if self._detect_crisis_recovery(user_message):
+                if "crisis_recovery" in features:
                     session.crisis_recovery_count += 1
                     print(f"[위기 회복] 감지 ({session.crisis_recovery_count}/2회)")
                     
@@ -1981,19 +2971,15 @@ class ChatbotService:
             is_crisis = session.crisis_mode_active  # 세션 플래그 우선
             
             # 위기 상황이거나, 불안/우울 관련 키워드가 있을 때 상담 매뉴얼 검색
-            crisis_keywords = ["우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민", 
-                             "죽고", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠"]
-            needs_counseling = is_crisis or any(k in user_message for k in crisis_keywords)
+            needs_counseling = is_crisis or "needs_counseling" in features
             
-            
-            if needs_counseling and self.counseling_vectordb:
-                counseling_knowledge = self._search_counseling_knowledge(user_message, top_k=3)
-            else:
-                counseling_knowledge = []
+            # 감정 분석 / RAG (현재 방 우선) / RAG-D / RAG-P 병렬 조회
+            turn_tasks = self._start_turn_tasks(user_message, session, top_k=5, needs_counseling=needs_counseling)
+            rag_context, rag_sources = self._join(turn_tasks["rag"])
+            counseling_knowledge = self._join(turn_tasks["counseling"])
             
             # RAG-P: 페르소나 검색 (상황에 맞는 부엉이의 자기 공개)
-            conversation_context = session.get_summary()
-            persona_match = self._search_persona(user_message, conversation_context, session.used_persona_stories)
+            persona_match = self._join(turn_tasks["persona"])
             persona_story = ""
             persona_guidance = ""
             if persona_match["activation"]:
@@ -2005,7 +2991,7 @@ class ChatbotService:
             
             # 시스템 프롬프트 (심층 질문 유도)
             room_data = self.config.get('rooms', {}).get(session.selected_room, {})
-            principles = self._load_counselor_principles()
+            principles = self._fragments.get("counselor_principles")
             safety_rules = ""
             if is_crisis:
                 safety_rules = "\n[안전 지침 - 모델 내부 지침]\n- 위험이 의심되는 경우, 조심스럽게 안전을 우선하고 전문 도움 연결을 부드럽게 안내한다.\n- 단정/지시/위협 금지. 사용자의 자율성을 존중하며 정보 제공에 그친다."
@@ -2089,9 +3075,7 @@ class ChatbotService:
 [부엉이의 상세 정보 - 일반 질문에 답할 때 참고]
 유저가 "너는 누구야?", "좋아하는 게임은?", "취미가 뭐야?" 같은 **부엉이 자신에 대한 직접적인 질문**을 할 경우, 아래 정보를 **적극 활용**하여 답변하세요:
 
-{json.dumps(self.persona.get('core_persona', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('preferences', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('life_story', {}), ensure_ascii=False, indent=2)}
+{self._fragments.get("persona_json")}
 
 ⚠️ **일반 정보 발화 규칙 (DIR-P-103):**
 1. 위 정보를 참고만 할 것. 부엉이의 정체성을 자연스럽게 유지하는 것이 가장 중요. 
@@ -2341,6 +3325,8 @@ class ChatbotService:
             try:
                 # 위기 상황 시 temperature 낮춰서 프로토콜 준수율 높이기
                 temp = 0.6 if is_crisis else 0.85
+                # 유저 감정 분석은 메인 응답과 병렬 (상황으로 부엉이 감정이 정해지는 턴은 생략)
+                emotion_task = self._start_emotion_task(user_message, session, is_crisis, is_rejection, features)
                 
                 response = self._chat_completion(
                     model="gpt-4o",
@@ -2349,7 +3335,8 @@ class ChatbotService:
                         {"role": "user", "content": user_prompt}
                     ],
                     temperature=temp,
-                    max_tokens=600  # 전문 지식 포함 답변을 위해 증가
+                    max_tokens=600,  # 전문 지식 포함 답변을 위해 증가
+                    on_token=on_token
                 )
                 
                 raw_response = response.choices[0].message.content.strip()
@@ -2372,14 +3359,15 @@ class ChatbotService:
                 else:
                     replies = self._split_long_reply(raw_response, max_length=120) if raw_response else ["흐음... 다시 말해주겠나."]
                 
-                # DIR-E-103 & DIR-E-104: 감정 분석 및 태그 추가
-                user_emotion = self._analyze_user_emotion(user_message)
+                # DIR-E-103 & DIR-E-104: 감정 분석 및 태그 추가 (메인 응답과 병렬로 진행된 결과 합류)
+                user_emotion = self._join(emotion_task) if emotion_task else "BASIC"
                 owl_emotion = self._determine_owl_emotion(
                     user_message, 
                     session, 
                     user_emotion, 
                     is_crisis=is_crisis,
-                    is_rejection=is_rejection
+                    is_rejection=is_rejection,
+                    features=features
                 )
                 
                 # DIR-M-305: 감정 태그를 마지막 말풍선에만 추가 (조건부)
@@ -2406,8 +3394,8 @@ class ChatbotService:
                     "phase": 3,
                     "conversation_count": session.room_conversation_count
                 }
-                if self.debug_rag and getattr(self, "_last_sources", None):
-                    resp["sources"] = self._last_sources
+                if self.debug_rag and rag_sources:
+                    resp["sources"] = rag_sources
                 return resp
                 
             except Exception as e:
@@ -2506,7 +3494,7 @@ class ChatbotService:
         # Phase 3.5: 서랍에서의 대화
         if session.phase == 3.5:
             # 방 변경 요청 감지 (서랍 단계에서도 가능)
-            room_change_result = self._detect_room_change_request(user_message, session.selected_room)
+            room_change_result = self._detect_room_change_request(user_message, session.selected_room, features)
             
             # 케이스 1: 구체적인 다른 방으로 변경
             if room_change_result["type"] == "specific":
@@ -2565,8 +3553,9 @@ class ChatbotService:
                 }
             
             # ✅ 조기 편지 요청 처리 (유저가 같은 말 반복, 빨리 받고 싶어함, 그만 말하고 싶어함)
-            if self._is_early_letter_request(user_message):
+            if "early_letter_request" in features:
                 session.awaiting_letter_confirm = True
+                self._precompute_letter(session, session.selected_drawer)  # "응 편지를 받을래"에 대비
                 self._save_session(session)
                 
                 reply = "아직 대화를 마무리하지 못했는데 편지를 먼저 꺼내줄까?"
@@ -2608,28 +3597,20 @@ class ChatbotService:
                     }
             
             # 의문문(왜~?/무슨~/어째서~/?)이면 대화 이어가기
-            if self._is_question(user_message):
+            if features.is_question:
                 session.drawer_conversation_count += 1
                 self._summarize_if_needed(session)
                 
-                # RAG 검색
-                rag_context = self._search_similar(
-                    user_message,
-                    top_k=3,
-                    room_filter=session.selected_room,
-                    similarity_threshold=0.72
-                )
-                if not rag_context:
-                    rag_context = self._search_similar(
-                        user_message,
-                        top_k=3,
-                        room_filter=None,
-                        similarity_threshold=0.65
-                    )
+                # 전환 기준에 가까우면 편지 선생성 (전환 턴의 우표 = 지금 대화로 결정한 우표)
+                if self.letter_precompute and session.drawer_conversation_count >= MIN_DRAWER_CONVERSATIONS - self.letter_precompute_lead:
+                    self._precompute_letter(session, self._determine_stamp_code(session))
+                
+                # 감정 분석 / RAG / RAG-P 병렬 조회
+                turn_tasks_question = self._start_turn_tasks(user_message, session, top_k=3)
+                rag_context, _ = self._join(turn_tasks_question["rag"])
                 
                 # RAG-P: 페르소나 검색 (의문문에서도 활성화!) ⭐
-                conversation_context_question = session.get_summary()
-                persona_match_question = self._search_persona(user_message, conversation_context_question, session.used_persona_stories)
+                persona_match_question = self._join(turn_tasks_question["persona"])
                 persona_story_question = ""
                 persona_guidance_question = ""
                 if persona_match_question["activation"]:
@@ -2647,9 +3628,7 @@ class ChatbotService:
 [부엉이의 상세 정보 - 일반 질문에 답할 때 참고]
 유저가 부엉이 자신에 대한 직접적인 질문을 할 경우, 아래 정보를 **적극 활용**하여 답변하세요:
 
-{json.dumps(self.persona.get('core_persona', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('preferences', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('life_story', {}), ensure_ascii=False, indent=2)}
+{self._fragments.get("persona_json")}
 
 ⚠️ **일반 정보 발화 규칙 (DIR-P-103):**
 1. 위 정보를 참고만 하세요. 부엉이의 정체성을 자연스럽게 유지하는 것이 중요합니다.
@@ -2680,7 +3659,7 @@ class ChatbotService:
 """
                 
                 # 의문문 응답 프롬프트 (말투 강화!)
-                principles = self._load_counselor_principles()
+                principles = self._fragments.get("counselor_principles")
                 simple_prompt = f"""당신은 별빛 우체국의 부엉이 우체국장입니다. 유저가 당신에게 질문했습니다.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -2780,6 +3759,11 @@ class ChatbotService:
 """
                 
                 try:
+                    # 유저 감정 분석은 메인 응답과 병렬 (상황으로 부엉이 감정이 정해지는 턴은 생략)
+                    is_crisis_q = "crisis" in features
+                    is_rejection_q = "rejection_direct" in features
+                    emotion_task = self._start_emotion_task(user_message, session, is_crisis_q, is_rejection_q, features)
+                    
                     response = self._chat_completion(
                         model="gpt-4o",
                         messages=[
@@ -2787,7 +3771,8 @@ class ChatbotService:
                             {"role": "user", "content": user_message}
                         ],
                         temperature=0.75,
-                        max_tokens=280
+                        max_tokens=280,
+                        on_token=on_token
                     )
                     raw_response = response.choices[0].message.content.strip()
                     
@@ -2807,17 +3792,15 @@ class ChatbotService:
                     replies = self._split_long_reply(raw_response, max_length=120) if raw_response else ["궁금한 점이 있구나. 더 알고 싶은 게 있다면 편하게 물어봐도 돼."]
                     
                     # DIR-E-103 & DIR-E-104: 감정 분석 및 태그 추가
-                    user_emotion = self._analyze_user_emotion(user_message)
-                    is_crisis_q = self._detect_crisis(user_message)
-                    rejection_keywords_q = ["꺼져", "시러", "싫어", "불쾌", "필요없", "그만"]
-                    is_rejection_q = any(k in user_message for k in rejection_keywords_q)
+                    user_emotion = self._join(emotion_task) if emotion_task else "BASIC"
                     
                     owl_emotion = self._determine_owl_emotion(
                         user_message, 
                         session, 
                         user_emotion,
                         is_crisis=is_crisis_q,
-                        is_rejection=is_rejection_q
+                        is_rejection=is_rejection_q,
+                        features=features
                     )
                     
                     # DIR-M-305: 감정 태그를 마지막 말풍선에만 추가 (조건부)
@@ -2859,21 +3842,22 @@ class ChatbotService:
                 # 우표 정보 가져오기
                 stamp_info = self._get_stamp_info(stamp_code)
                 stamp_msg = f"자 너의 편지에 붙어 있었던 우표다. {stamp_info['mean']}"
-                letter = self._generate_letter(session)
-                session.letter_content = letter
+                letter, letter_job = self._deliver_letter(session, add_to_history=True)  # 생성 중이면 letter_job으로 완료 확인
                 letter_bubble = f"{letter}"  # 편지 내용만
                 
                 session.phase = 5
                 session.crisis_mode_active = False  # ✅ 편지 출력 후 위기 모드 해제
                 session.crisis_emotion_shown = False  # 감정 플래그 초기화
                 session.add_message("assistant", stamp_msg)
-                session.add_message("assistant", letter_bubble)
+                if letter:
+                    session.add_message("assistant", letter_bubble)
                 self._save_session(session)
                 return {
-                    "replies": [stamp_msg, letter_bubble],
+                    "replies": [stamp_msg, letter_bubble] if letter else [stamp_msg],
                     "image": None,
                     "phase": 5,
                     "letter": letter,
+                    "letter_job": letter_job,
                     "stamp_code": stamp_code,  # DIR-S-404: 우표 코드 반환
                     "is_letter_end": True,
                     "buttons": ["별빛 우체국에 다시 한번 입장"],
@@ -2889,27 +3873,28 @@ class ChatbotService:
                 stamp_info = self._get_stamp_info(stamp_code)
                 stamp_msg = f"자 너의 편지에 붙어 있었던 우표다. {stamp_info['mean']}"
                 
-                letter = self._generate_letter(session)
-                session.letter_content = letter
+                letter, letter_job = self._deliver_letter(session, add_to_history=True)  # 생성 중이면 letter_job으로 완료 확인
                 letter_bubble = f"{letter}"  # 편지 내용만
                 
                 session.phase = 5
                 session.crisis_mode_active = False  # ✅ 편지 출력 후 위기 모드 해제
                 session.crisis_emotion_shown = False  # 감정 플래그 초기화
                 session.add_message("assistant", stamp_msg)
-                session.add_message("assistant", letter_bubble)
+                if letter:
+                    session.add_message("assistant", letter_bubble)
                 self._save_session(session)
                 return {
-                    "replies": [stamp_msg, letter_bubble],
+                    "replies": [stamp_msg, letter_bubble] if letter else [stamp_msg],
                     "image": None,
                     "phase": 5,
                     "letter": letter,
+                    "letter_job": letter_job,
                     "stamp_code": stamp_code,  # DIR-S-404: 우표 코드 반환
                     "stamp_description": stamp_msg,  # ✅ 우표 설명을 별도 필드로 전달
                     "buttons": ["별빛 우체국에 한번 더 입장하시겠습니까?"],
                     "is_letter_end": True
                 }
-            if getattr(self, "loading_embeddings", False) and self.collection and self.collection.count() == 0:
+            if self._room_loading(session.selected_room):
                 return {
                     "reply": "(자료를 정리하는 중이네… 잠깐만 기다려 주겠나.)",
                     "image": None,
@@ -2919,34 +3904,19 @@ class ChatbotService:
             # 길이 증가시 자동 요약
             self._summarize_if_needed(session)
             
-            # RAG 검색 (현재 방 우선)
-            rag_context = self._search_similar(
-                user_message,
-                top_k=5,
-                room_filter=session.selected_room,
-                similarity_threshold=0.72
-            )
-            # 매칭이 없으면 전역으로 완화 검색
-            if not rag_context:
-                rag_context = self._search_similar(
-                    user_message,
-                    top_k=5,
-                    room_filter=None,
-                    similarity_threshold=0.65
-                )
-            
-            # RAG-D: 위기 상황 또는 전문 상담이 필요한 경우 상담 매뉴얼 참조 (Phase 3.5)
-            counseling_knowledge_drawer = []
+            # 전환 기준에 가까우면 편지 선생성 (이번 턴 응답 생성과 병렬로 진행 → 전환 시 바로 사용)
+            if self.letter_precompute and session.drawer_conversation_count >= MIN_DRAWER_CONVERSATIONS - self.letter_precompute_lead:
+                self._precompute_letter(session, self._determine_stamp_code(session))
             
             # ✅ 위기 모드 활성화 체크: 기존 모드 유지 OR 새로운 위기 감지
-            current_crisis_detected_drawer = self._detect_crisis(user_message)
+            current_crisis_detected_drawer = "crisis" in features
             if current_crisis_detected_drawer and not session.crisis_mode_active:
                 session.crisis_mode_active = True
                 print(f"[위기 모드] 활성화 ✅ (Phase 3.5, 키워드 감지)")
             
             # ✅ 위기 모드 회복 감지 (Phase 4에서도 동일하게 적용)
             if session.crisis_mode_active:
-                if self._detect_crisis_recovery(user_message):
+                if "crisis_recovery" in features:
                     session.crisis_recovery_count += 1
                     print(f"[위기 회복] 감지 (Phase 4, {session.crisis_recovery_count}/2회)")
                     
@@ -2959,19 +3929,15 @@ class ChatbotService:
             
             is_crisis_drawer = session.crisis_mode_active  # 세션 플래그 우선
             
-            crisis_keywords_drawer = ["우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민",
-                                     "죽", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠"]
-            needs_counseling_drawer = is_crisis_drawer or any(k in user_message for k in crisis_keywords_drawer)
+            needs_counseling_drawer = is_crisis_drawer or "needs_counseling_drawer" in features
             
-            
-            if needs_counseling_drawer and self.counseling_vectordb:
-                counseling_knowledge_drawer = self._search_counseling_knowledge(user_message, top_k=3)
-            else:
-                counseling_knowledge_drawer = []
+            # 감정 분석 / RAG (현재 방 우선) / RAG-D / RAG-P 병렬 조회 (Phase 3.5)
+            turn_tasks_drawer = self._start_turn_tasks(user_message, session, top_k=5, needs_counseling=needs_counseling_drawer)
+            rag_context, rag_sources = self._join(turn_tasks_drawer["rag"])
+            counseling_knowledge_drawer = self._join(turn_tasks_drawer["counseling"])
             
             # RAG-P: 페르소나 검색 (상황에 맞는 부엉이의 자기 공개) - Phase 3.5
-            conversation_context_drawer = session.get_summary()
-            persona_match_drawer = self._search_persona(user_message, conversation_context_drawer, session.used_persona_stories)
+            persona_match_drawer = self._join(turn_tasks_drawer["persona"])
             persona_story_drawer = ""
             persona_guidance_drawer = ""
             if persona_match_drawer["activation"]:
@@ -2983,7 +3949,7 @@ class ChatbotService:
             
             # 시스템 프롬프트 (더 깊은 질문)
             room_data = self.config.get('rooms', {}).get(session.selected_room, {})  # room_data 정의!
-            principles = self._load_counselor_principles()
+            principles = self._fragments.get("counselor_principles")
             safety_rules = ""
             if is_crisis_drawer:
                 safety_rules = "\n[안전 지침 - 모델 내부 지침]\n- 위험이 의심되는 경우, 조심스럽게 안전을 우선하고 전문 도움 연결을 부드럽게 안내한다.\n- 단정/지시/위협 금지. 사용자의 자율성을 존중하며 정보 제공에 그친다."
@@ -3069,9 +4035,7 @@ class ChatbotService:
 [부엉이의 상세 정보 - 일반 질문에 답할 때 참고]
 유저가 "너는 누구야?", "좋아하는 게임은?", "취미가 뭐야?" 같은 **부엉이 자신에 대한 직접적인 질문**을 할 경우, 아래 정보를 **적극 활용**하여 답변하세요:
 
-{json.dumps(self.persona.get('core_persona', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('preferences', {}), ensure_ascii=False, indent=2)}
-{json.dumps(self.persona.get('life_story', {}), ensure_ascii=False, indent=2)}
+{self._fragments.get("persona_json")}
 
 ⚠️ **일반 정보 발화 규칙 (DIR-P-103):**
 1. 위 정보를 참고만 하세요. 부엉이의 정체성을 자연스럽게 유지하는 것이 중요합니다.
@@ -3306,6 +4270,9 @@ class ChatbotService:
             try:
                 # 위기 상황 시 temperature 낮춰서 프로토콜 준수율 높이기
                 temp_drawer = 0.6 if is_crisis_drawer else 0.8
+                # 유저 감정 분석은 메인 응답과 병렬 (상황으로 부엉이 감정이 정해지는 턴은 생략)
+                is_rejection_d = "rejection_direct" in features
+                emotion_task = self._start_emotion_task(user_message, session, is_crisis_drawer, is_rejection_d, features)
                 
                 response = self._chat_completion(
                     model="gpt-4o",
@@ -3314,7 +4281,8 @@ class ChatbotService:
                         {"role": "user", "content": user_prompt}
                     ],
                     temperature=temp_drawer,
-                    max_tokens=600  # 전문 지식 포함 답변을 위해 증가
+                    max_tokens=600,  # 전문 지식 포함 답변을 위해 증가
+                    on_token=on_token
                 )
                 
                 if is_crisis_drawer and self.debug_rag:
@@ -3357,18 +4325,17 @@ class ChatbotService:
                 else:
                     replies = self._split_long_reply(raw_response, max_length=120) if raw_response else ["흐음... 다시 말해주겠나."]
                 
-                # DIR-E-103 & DIR-E-104: 감정 분석 및 태그 추가
-                user_emotion = self._analyze_user_emotion(user_message)
-                # is_crisis_drawer와 관련 변수는 이미 계산됨
-                rejection_keywords_d = ["꺼져", "시러", "싫어", "불쾌", "필요없", "그만"]
-                is_rejection_d = any(k in user_message for k in rejection_keywords_d)
+                # DIR-E-103 & DIR-E-104: 감정 분석 및 태그 추가 (메인 응답과 병렬로 진행된 결과 합류)
+                user_emotion = self._join(emotion_task) if emotion_task else "BASIC"
+                # is_crisis_drawer / is_rejection_d는 이미 계산됨
                 
                 owl_emotion = self._determine_owl_emotion(
                     user_message, 
                     session, 
                     user_emotion,
                     is_crisis=is_crisis_drawer,
-                    is_rejection=is_rejection_d
+                    is_rejection=is_rejection_d,
+                    features=features
                 )
                 
                 # DIR-M-305: 감정 태그를 마지막 말풍선에만 추가 (조건부)
@@ -3393,9 +4360,8 @@ class ChatbotService:
                     session.selected_drawer = stamp_code  # 우표 코드 저장
                     stamp_info = self._get_stamp_info(stamp_code)
                     
-                    # 편지 생성
-                    letter = self._generate_letter(session)
-                    session.letter_content = letter
+                    # 편지 생성 (생성 중이면 letter_job으로 완료 확인)
+                    letter, letter_job = self._deliver_letter(session)
                     
                     # 편지 발견 안내 메시지 추가
                     letter_found_msgs = [
@@ -3423,6 +4389,7 @@ class ChatbotService:
                         "image": None,
                         "phase": 5,
                         "letter": letter,  # 편지 내용은 이 키를 통해 별도 출력 (연속 출력)
+                        "letter_job": letter_job,
                         "stamp_code": stamp_code,
                         "stamp_description": stamp_message,  # ✅ 우표 설명을 별도 필드로 전달 (프론트엔드에서 확실히 사용)
                         "is_letter_end": True, 
@@ -3436,8 +4403,8 @@ class ChatbotService:
                     "phase": 3.5,
                     "conversation_count": session.drawer_conversation_count
                 }
-                if self.debug_rag and getattr(self, "_last_sources", None):
-                    resp["sources"] = self._last_sources
+                if self.debug_rag and rag_sources:
+                    resp["sources"] = rag_sources
                 return resp
                 
             except Exception as e:
@@ -3456,9 +4423,8 @@ class ChatbotService:
             if not session.selected_drawer:
                 session.selected_drawer = stamp_code  # 우표 코드 저장
             
-            # 편지 생성
-            letter = self._generate_letter(session)
-            session.letter_content = letter
+            # 편지 생성 (생성 중이면 letter_job으로 완료 확인)
+            letter, letter_job = self._deliver_letter(session)
             
             # Phase 5로 전환 (다음 턴은 엔딩)
             session.phase = 5
@@ -3477,6 +4443,7 @@ class ChatbotService:
                 "image": None,
                 "phase": 5,
                 "letter": letter,  # 편지 내용은 이 키를 통해 별도 출력 (연속 출력)
+                "letter_job": letter_job,
                 "stamp_code": stamp_code,
                 "stamp_description": stamp_message,  # ✅ 우표 설명을 별도 필드로 전달
                 "is_letter_end": True, 
@@ -3487,7 +4454,8 @@ class ChatbotService:
         if session.phase == 5:
             # 사용자가 편지를 다시 보고 싶어하는 경우 (아니오 버튼 후 재요청)
             if any(keyword in user_message for keyword in ["편지", "열", "보여", "읽"]):
-                if session.letter_content:
+                letter_job = None if session.letter_content else self._pending_letter_job(username)
+                if session.letter_content or letter_job:
                     stamp_code = session.selected_drawer if session.selected_drawer else self._determine_stamp_code(session)
                     stamp_info = self._get_stamp_info(stamp_code)
                     stamp_message = f"좋아. 다시 한번 보여주지. 자 너의 편지에 붙어 있었던 우표다. {stamp_info['mean']}"
@@ -3499,6 +4467,7 @@ class ChatbotService:
                         "image": None,
                         "phase": 5,
                         "letter": session.letter_content,
+                        "letter_job": letter_job,  # 아직 생성 중이면 클라이언트가 이 작업으로 완료 확인
                         "stamp_code": stamp_code,
                         "stamp_description": stamp_message,  # ✅ 우표 설명을 별도 필드로 전달
                         "is_letter_end": True,
@@ -3525,16 +4494,149 @@ class ChatbotService:
         reply = "흐음... 무슨 말인지 알겠군."
         return {"reply": reply, "image": None, "phase": session.phase}
 
+    # --------------------------------------------
+    # 스트리밍 응답 (SSE /api/chat/stream)
+    # --------------------------------------------
+    def _stable_segments(self, text: str) -> list:
+        """스트리밍 중인 텍스트에서 더 이상 바뀌지 않을 말풍선만 반환 (마지막 조각 제외)"""
+        t = text.lstrip()
+        if t.startswith('"'):
+            t = t[1:].lstrip()
+        for prefix in ["부엉: ", "부엉이: ", "부엉:", "부엉이:"]:
+            if t.startswith(prefix):
+                t = t[len(prefix):].strip()
+                break
+        if not t:
+            return []
+        return self._split_long_reply(t, max_length=120)[:-1]
+
+    def stream_response(self, user_message: str, username: str = "방문자"):
+        """
+        generate_response를 워커 스레드에서 실행하며 토큰/말풍선을 즉시 흘려보내는 제너레이터
+        
+        Yields:
+            tuple: (event, data)
+                - ("token", {"text": str}): 도착한 LLM 토큰
+                - ("segment", {"text": str}): 확정된 말풍선 (_split_long_reply 기준)
+                - ("done", dict): generate_response 결과 + streamed/replace_streamed/emotion
+                - ("error", {"reply": str}): 응답 생성 실패
+        """
+        import queue
+        events = queue.Queue()
+
+        def _run():
+            try:
+                result = self.generate_response(
+                    user_message, username,
+                    on_token=lambda delta: events.put(("token", delta))
+                )
+                events.put(("done", result))
+            except Exception as e:
+                events.put(("error", e))
+
+        threading.Thread(target=_run, daemon=True).start()
+
+        state = {"text": "", "segments": [], "diverged": False}
+        while True:
+            kind, payload = events.get()
+            yield from self._stream_events(state, kind, payload)
+            if kind != "token":
+                return
+
+    async def astream_response(self, user_message: str, username: str = "방문자"):
+        """stream_response의 async 제너레이터 버전 (agenerate_response 기반, 이벤트 형식 동일)"""
+        events = asyncio.Queue()
+
+        async def _run():
+            try:
+                result = await self.agenerate_response(
+                    user_message, username,
+                    on_token=lambda delta: events.put_nowait(("token", delta))
+                )
+                events.put_nowait(("done", result))
+            except Exception as e:
+                events.put_nowait(("error", e))
+
+        # 클라이언트가 끊겨도 턴은 끝까지 진행되어 세션에 반영되도록 task로 분리
+        task = asyncio.ensure_future(_run())
+        self._atasks.add(task)
+        task.add_done_callback(self._atasks.discard)
+
+        state = {"text": "", "segments": [], "diverged": False}
+        while True:
+            kind, payload = await events.get()
+            for item in self._stream_events(state, kind, payload):
+                yield item
+            if kind != "token":
+                return
+
+    def _stream_events(self, state: dict, kind: str, payload) -> list:
+        """워커 이벤트 하나를 (event, data) 목록으로 변환 (stream_response / astream_response 공용)"""
+        if kind == "token":
+            state["text"] += payload
+            out = [("token", {"text": payload})]
+            if state["diverged"]:
+                return out
+            segments = state["segments"]
+            stable = self._stable_segments(state["text"])
+            if stable[:len(segments)] != segments:
+                # 분할 결과가 바뀌면 이후 말풍선은 최종 결과로만 전달
+                state["diverged"] = True
+                return out
+            for seg in stable[len(segments):]:
+                segments.append(seg)
+                out.append(("segment", {"text": seg}))
+            return out
+        if kind == "done":
+            segments = state["segments"]
+            result = dict(payload)
+            replies = result.get("replies") or []
+            plain = [r.split("\n##감정 :")[0] for r in replies]
+            matched = plain[:len(segments)] == segments
+            result["streamed"] = len(segments) if matched else 0
+            result["replace_streamed"] = bool(segments) and not matched
+            if replies and "\n##감정 :" in replies[-1]:
+                result["emotion"] = replies[-1].split("\n##감정 :")[1].strip()
+            return [("done", result)]
+        print(f"[에러] 스트리밍 응답 생성 실패: {payload}")
+        return [("error", {"reply": "죄송해요, 일시적인 오류가 발생했어요. 다시 시도해주세요."})]
+
 
 # ============================================================================
 # 싱글톤 패턴
 # ============================================================================
 
 _chatbot_service = None
+_chatbot_service_lock = threading.Lock()
+_warmup_thread = None
 
 def get_chatbot_service():
-    """챗봇 서비스 인스턴스 반환 (싱글톤)"""
+    """챗봇 서비스 인스턴스 반환 (싱글톤, 스레드 안전 - 동시 첫 요청에도 한 번만 생성)"""
     global _chatbot_service
     if _chatbot_service is None:
-        _chatbot_service = ChatbotService()
-    return _chatbot_service
\ No newline at end of file
+        with _chatbot_service_lock:
+            if _chatbot_service is None:
+                _chatbot_service = ChatbotService()
+    return _chatbot_service
+
+
+def peek_chatbot_service():
+    """이미 만들어진 인스턴스 (없으면 None - 헬스체크가 초기화를 일으키지 않도록)"""
+    return _chatbot_service
+
+
+def start_background_warmup():
+    """백그라운드 스레드에서 서비스 생성 + 워밍업 시작 (개발 서버 등 preload 없이 띄운 경우, 한 번만)"""
+    global _warmup_thread
+    with _chatbot_service_lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=_warmup, daemon=True)
+    _warmup_thread.start()
+
+
+def _warmup():
+    try:
+        get_chatbot_service().warmup()
+    except Exception as e:
+        print(f"[에러] 서비스 초기화/워밍업 실패: {e}")
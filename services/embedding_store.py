@@ -0,0 +1,174 @@
+"""
+임베딩 영속 캐시
+
+(모델명 + 텍스트 해시)를 키로 임베딩을 SQLite 파일에 float32로 저장합니다.
+재기동/여러 워커/재인덱싱 사이에서 같은 텍스트의 임베딩 API 호출을 재사용하며,
+앞단의 LRU 핫 티어가 자주 쓰는 벡터를 메모리에 유지합니다.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+
+class EmbeddingStore:
+    """
+    SQLite 기반 임베딩 캐시 + LRU 핫 티어 (스레드/프로세스 간 공유 가능)
+
+    핫 티어와 카운터는 self._lock으로 보호하고, SQLite는 스레드별 연결 + WAL로 동시 읽기/쓰기를 허용
+    """
+
+    def __init__(self, path, hot_size: int = 1000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hot_size = hot_size
+        self._hot = OrderedDict()  # {key: list[float]}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # 스레드별 SQLite 연결
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        """fork된 자식 프로세스에서 호출: 부모의 SQLite 연결과 락을 버림 (핫 티어는 유지)"""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _decode(blob: bytes) -> list:
+        vec = array("f")
+        vec.frombytes(blob)
+        return vec.tolist()
+
+    def _remember(self, key: str, embedding: list):
+        """LRU 핫 티어에 저장 (가장 오래 사용되지 않은 항목부터 제거)"""
+        with self._lock:
+            self._hot[key] = embedding
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)
+
+    def get(self, model: str, text: str):
+        """임베딩 조회 (핫 티어 → SQLite). 없으면 None"""
+        key = self.make_key(model, text)
+        with self._lock:
+            cached = self._hot.get(key)
+            if cached is not None:
+                self._hot.move_to_end(key)
+                self.hits += 1
+                return cached
+        row = self._conn().execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        embedding = self._decode(row[0])
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, embedding)
+        return embedding
+
+    def get_many(self, model: str, texts: list) -> dict:
+        """여러 텍스트 일괄 조회. Returns: {text: embedding} (있는 것만, 중복 텍스트는 한 번만 조회/집계)"""
+        unique = list(dict.fromkeys(texts))
+        found = {}
+        missing = {}
+        for text in unique:
+            key = self.make_key(model, text)
+            with self._lock:
+                cached = self._hot.get(key)
+                if cached is not None:
+                    self._hot.move_to_end(key)
+                    self.hits += 1
+                    found[text] = cached
+                    continue
+            missing[key] = text
+        keys = list(missing)
+        conn = self._conn()
+        disk_hits = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ):
+                embedding = self._decode(blob)
+                found[missing[key]] = embedding
+                disk_hits += 1
+                self._remember(key, embedding)
+        with self._lock:
+            self.disk_hits += disk_hits
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put(self, model: str, text: str, embedding: list):
+        self.put_many(model, [(text, embedding)])
+
+    def put_many(self, model: str, items: list):
+        """[(text, embedding), ...] 일괄 저장 (한 트랜잭션)"""
+        rows = []
+        for text, embedding in items:
+            key = self.make_key(model, text)
+            rows.append((key, model, len(embedding), array("f", embedding).tobytes()))
+            self._remember(key, list(embedding))
+        if not rows:
+            return
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hot_entries": len(self._hot), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+def wrap_langchain_embeddings(embeddings, store: EmbeddingStore, model: str):
+    """LangChain Embeddings 객체를 EmbeddingStore를 거치도록 감싸기 (RAG-D 구축/검색용)"""
+    from langchain_core.embeddings import Embeddings  # type: ignore
+
+    class StoreBackedEmbeddings(Embeddings):
+        def embed_documents(self, texts):
+            found = store.get_many(model, texts)
+            missing = [t for t in dict.fromkeys(texts) if t not in found]
+            if missing:
+                vectors = embeddings.embed_documents(missing)
+                store.put_many(model, list(zip(missing, vectors)))
+                found.update(zip(missing, vectors))
+            return [found[t] for t in texts]
+
+        def embed_query(self, text):
+            cached = store.get(model, text)
+            if cached is not None:
+                return cached
+            vector = embeddings.embed_query(text)
+            store.put(model, text, vector)
+            return vector
+
+    return StoreBackedEmbeddings()
@@ -0,0 +1,100 @@
+"""
+로컬 감정 분류기 (DIR-E-103)
+
+유저 메시지를 JOY / SADNESS / ANGER / QUESTION / BASIC 중 하나로 분류합니다.
+API 호출 없이 컴파일된 어휘(lexicon) 정규식 한 번으로 동작하며,
+신뢰도가 낮을 때만 ChatbotService가 LLM 분류로 대체합니다.
+"""
+
+import re
+
+EMOTION_LABELS = ["JOY", "SADNESS", "ANGER", "QUESTION", "BASIC"]
+
+# 카테고리별 어휘와 가중치 (어간 위주 - 활용형을 함께 잡기 위함)
+EMOTION_LEXICON = {
+    "JOY": {
+        1.0: ["행복", "기쁘", "기뻐", "기쁨", "신나", "신났", "설레", "감사", "고마", "즐거", "즐겁", "다행", "뿌듯", "만족"],
+        0.6: ["좋아", "좋았", "좋다", "웃", "희망", "기대", "재밌", "재미있", "괜찮아졌", "나아졌"],
+    },
+    "SADNESS": {
+        1.0: ["슬프", "슬퍼", "슬픔", "우울", "힘들", "힘드", "괴롭", "외로", "그리워", "보고싶", "눈물", "울었", "울고",
+              "죽고", "자살", "자해", "상처", "후회", "이별", "헤어", "차였", "버림", "상실", "허무", "공허"],
+        0.7: ["불안", "무서", "두렵", "두려", "걱정", "미안", "아프", "아파", "실패", "망했", "떠나", "잃", "지쳐", "지친",
+              "막막", "포기", "안 좋", "좋지 않", "못하겠"],
+    },
+    "ANGER": {
+        1.0: ["화나", "화가", "화났", "짜증", "열받", "빡치", "빡쳐", "꺼져", "불쾌", "분노", "억울", "어이없", "미워"],
+        0.7: ["싫어", "시러", "싫다", "필요없", "짜증나", "그만해", "묻지마"],
+    },
+}
+
+# 의문 신호: 물음표 또는 의문사 시작 / 의문형 어미
+QUESTION_START = ["왜", "뭐", "무슨", "무엇", "어떻게", "어떤", "어디", "언제", "누구", "어째서", "몇"]
+QUESTION_ENDINGS = ["까", "니", "냐", "나요", "가요", "어요?", "지?", "야?"]
+
+# 부정 신호: 키워드 바로 앞의 "안/못", 바로 뒤의 "~지 않/못/마" ("행복하지 않아", "안 기뻐")
+NEGATION_BEFORE = re.compile(r"(?:안|못)\s*$")
+NEGATION_AFTER = re.compile(r"[가-힣]{0,2}지\s*(?:않|못|마)")
+
+
+class LexiconEmotionClassifier:
+    """컴파일된 어휘 정규식 기반 감정 분류기 (메시지당 정규식 스캔 1회)"""
+
+    def __init__(self, lexicon: dict = None, neutral_confidence: float = 0.0,
+                 full_evidence: float = 1.5, negation_penalty: float = 0.5):
+        self.lexicon = lexicon or EMOTION_LEXICON
+        # 어휘가 하나도 안 걸린 메시지의 신뢰도 (기본 0 → hybrid에서는 항상 LLM 분류로 넘어감)
+        self.neutral_confidence = neutral_confidence
+        self.full_evidence = full_evidence  # 1위 점수가 이 이상이어야 근거가 충분하다고 봄
+        self.negation_penalty = negation_penalty  # 1위 감정 키워드가 부정되었을 때 신뢰도 배수
+        # 모든 어휘를 하나의 alternation으로 컴파일 (긴 키워드 우선)
+        self._weights = {}
+        for label, groups in self.lexicon.items():
+            for weight, words in groups.items():
+                for w in words:
+                    key = w.lower()
+                    if key not in self._weights or self._weights[key][1] < weight:
+                        self._weights[key] = (label, weight)
+        alternation = "|".join(re.escape(k) for k in sorted(self._weights, key=len, reverse=True))
+        self._pattern = re.compile(alternation)
+        self._question_start = re.compile(r"^\s*(?:" + "|".join(QUESTION_START) + r")")
+        self._question_end = re.compile(r"(?:" + "|".join(re.escape(e) for e in QUESTION_ENDINGS) + r")\s*$")
+
+    def scores(self, text: str) -> dict:
+        """카테고리별 점수 계산"""
+        return self._scan(text)[0]
+
+    def _scan(self, text: str) -> tuple:
+        """(카테고리별 점수, 부정된 키워드가 있는 카테고리 집합)"""
+        scores = {label: 0.0 for label in EMOTION_LABELS}
+        negated = set()
+        if not text:
+            return scores, negated
+        t = text.lower().strip()
+        for m in self._pattern.finditer(t):
+            label, weight = self._weights[m.group(0)]
+            scores[label] += weight
+            if NEGATION_BEFORE.search(t, 0, m.start()) or NEGATION_AFTER.match(t, m.end()):
+                negated.add(label)
+        if t.endswith("?") or t.endswith("？"):
+            scores["QUESTION"] += 1.0
+        elif self._question_start.search(t) or self._question_end.search(t):
+            scores["QUESTION"] += 0.6
+        return scores, negated
+
+    def classify(self, text: str) -> tuple:
+        """
+        Returns:
+            tuple: (label, confidence) - confidence는 0~1
+                   (1위/2위 점수 비율 × 근거 양(1위 점수 / full_evidence), 부정된 감정이면 negation_penalty 배)
+                   어휘 근거가 없으면 ("BASIC", neutral_confidence) - 판단 보류 신호
+        """
+        scores, negated = self._scan(text)
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        (top_label, top), (_, second) = ranked[0], ranked[1]
+        if top <= 0:
+            return "BASIC", self.neutral_confidence
+        confidence = top / (top + second) * min(1.0, top / self.full_evidence)
+        if top_label in negated:
+            confidence *= self.negation_penalty
+        return top_label, confidence
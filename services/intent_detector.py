@@ -0,0 +1,187 @@
+"""
+턴 단위 의도/키워드 감지기
+
+위기, 회복, 재입장, 편지 요청/확인, 방 선택/변경, 거부, 상담 필요, 부엉이 감정 키워드처럼
+generate_response 곳곳에서 따로 훑던 키워드 목록을 INTENT_TABLE 하나에 선언해 두고,
+기동 시 정규화 방식별 Aho–Corasick 자동자로 컴파일합니다.
+메시지마다 scan()을 한 번만 돌려 IntentFeatures(의도 비트셋 + 방/질문/반복 키)를 만들고,
+모든 분기는 이 결과만 봅니다.
+
+정규화 방식:
+- LOWER  : text.lower() (한글은 lower()로 바뀌지 않으므로 원문 `kw in text` 검사도 여기에 둠)
+- COMPACT: text.lower()에서 공백 제거 (띄어쓰기와 무관하게 매칭)
+"""
+
+import re
+
+from .persona_index import KeywordAutomaton
+
+LOWER = "lower"
+COMPACT = "compact"
+
+_NORMALIZERS = {
+    LOWER: lambda text: text.lower(),
+    COMPACT: lambda text: text.lower().replace(" ", ""),
+}
+
+# (의도 이름, 정규화 방식, 키워드) - 키워드도 같은 방식으로 정규화해서 컴파일
+INTENT_TABLE = (
+    # 위기 / 회복 (_detect_crisis, _detect_crisis_recovery)
+    ("crisis", LOWER, ("자살", "극단적", "죽고", "해치", "학대", "폭력", "살고싶지", "위험")),
+    ("crisis_recovery", LOWER, (
+        "괜찮", "나아", "좀 나은", "괜춘", "좀 낫", "좀 나아졌",
+        "덜 힘들", "조금 나은", "좀 좋", "회복", "나아지",
+        "괜찮아졌", "괜찮아져", "괜찮아질", "좀 괜찮",
+    )),
+    # 상담 매뉴얼(RAG-D) 검색 필요 (Phase 3 / Phase 3.5)
+    ("needs_counseling", LOWER, (
+        "우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민",
+        "죽고", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠",
+    )),
+    ("needs_counseling_drawer", LOWER, (
+        "우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민",
+        "죽", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠",
+    )),
+    # 편지 즉시 요청 (반복 의도 키 "ask_letter_now")
+    ("ask_letter_now", COMPACT, (
+        "편지나", "편지내놔", "편지줘", "편지 줘", "편지주세요", "편지 주세요",
+        "편지출력", "편지 출력", "편지를", "편지", "바로 편지", "편지 바로",
+    )),
+    # 재입장 / 편지 확인 버튼 (_detect_reenter, _detect_letter_confirm_yes/no)
+    ("reenter", COMPACT, (
+        "별빛우체국에한번더입장하시겠습니까?", "다시입장", "처음부터다시",
+        "다시시작", "별빛우체국에다시한번입장", "다시한번입장",
+    )),
+    ("letter_confirm_yes", COMPACT, ("응편지를받을래", "편지를받을래", "편지받을게", "편지받기")),
+    ("letter_confirm_no", COMPACT, ("아니더대화할래", "더대화할래", "계속대화", "대화계속")),
+    # 조기 편지 요청 (Phase 3.5)
+    ("early_letter_request", COMPACT, (
+        "편지줬", "편지를줘", "편지받고싶", "편지내놔", "편지줘", "편지주세요", "편지출력",
+        "그만", "싫어", "시러", "꺼져", "필요없", "불쾌", "하기싫", "묻지마",
+    )),
+    # 거부/불쾌감: Phase 3은 띄어쓰기 무시, 질문/서랍 분기는 원문 기준 (목록도 다름)
+    ("rejection", COMPACT, ("시러", "싫어", "꺼져", "불쾌", "필요없", "그만", "하기싫", "묻지마")),
+    ("rejection_direct", LOWER, ("꺼져", "시러", "싫어", "불쾌", "필요없", "그만")),
+    # 방 선택 (ROOM_ORDER 순서로 우선)
+    ("room_regret", LOWER, ("후회", "regret")),
+    ("room_love", LOWER, ("사랑", "love")),
+    ("room_anxiety", LOWER, ("불안", "anxiety")),
+    ("room_dream", LOWER, ("꿈", "dream")),
+    # 방 변경 요청 (_detect_room_change_request)
+    ("room_change", LOWER, (
+        "방으로", "방 가고", "방에 가", "다른 방", "바꾸고", "이동",
+        "말고", "대신", "방을", "방 할래", "방 하고", "가고 싶",
+        "바꿀래", "옮기고", "변경",
+    )),
+    ("room_change_any", LOWER, ("다른 방", "방 바꾸", "방 변경")),
+    # 부엉이 감정 오버라이드 (_determine_owl_emotion)
+    ("emotion_early_letter", LOWER, ("편지", "내놓", "줘", "보내줘", "빨리", "그만", "끝")),
+    ("emotion_reenter", LOWER, ("다시", "처음", "새로", "재입장", "리셋")),
+    ("emotion_reenter_action", LOWER, ("시작", "입장", "해", "할래")),
+    ("emotion_anger_at_owl", LOWER, ("너가 싫어", "너는 싫어", "넌 싫어", "당신 싫어", "부엉 싫어")),
+    ("emotion_attack", LOWER, ("꺼져", "시러", "불쾌", "까먹", "필요없")),
+    ("emotion_crisis", LOWER, ("죽고", "자살", "자해", "극단", "끝", "포기")),
+    ("emotion_sad", LOWER, (
+        "슬프", "힘들", "우울", "불안", "무서", "두렵", "걱정", "후회", "미안", "아프", "괴롭", "외로",
+        "실패", "망했", "이별", "헤어", "떠나", "차였", "버림", "잃", "상실", "그리워", "보고싶",
+    )),
+    ("emotion_hope", LOWER, ("하고싶", "희망", "바라", "소망")),
+    ("emotion_joy", LOWER, ("행복", "기쁨", "만족", "감사", "고마", "즐거", "웃")),
+)
+
+ROOM_ORDER = ("regret", "love", "anxiety", "dream")
+
+INTENT_BITS = {name: 1 << i for i, (name, _, _) in enumerate(INTENT_TABLE)}
+
+_ROOM_BITS = tuple((room, INTENT_BITS[f"room_{room}"]) for room in ROOM_ORDER)
+_QUESTION_PREFIXES = ("왜", "무슨", "어째서")
+_PUNCT_RE = re.compile(r"[^\w\s가-힣]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class IntentFeatures:
+    """
+    메시지 한 개의 감지 결과
+
+    - bits: 걸린 의도의 비트 OR (`"crisis" in features`로 확인)
+    - room: 메시지에서 고른 방 (ROOM_ORDER 우선, 없으면 None)
+    - room_after_malggo: "말고" 뒤에서 고른 방 ("말고"가 없으면 room과 같음)
+    - is_question: ?로 끝나거나 왜/무슨/어째서로 시작 (서랍 분기 의문문)
+    - ends_with_question: ? 또는 ？로 끝남 (부엉이 '의문' 감정)
+    - intent_key: 반복 의도 키 (편지 요청이면 "ask_letter_now", 아니면 구두점/공백 정규화한 문장)
+    """
+
+    __slots__ = ("bits", "room", "room_after_malggo", "is_question", "ends_with_question", "intent_key")
+
+    def __init__(self, bits, room, room_after_malggo, is_question, ends_with_question, intent_key):
+        self.bits = bits
+        self.room = room
+        self.room_after_malggo = room_after_malggo
+        self.is_question = is_question
+        self.ends_with_question = ends_with_question
+        self.intent_key = intent_key
+
+    def __contains__(self, name: str) -> bool:
+        return bool(self.bits & INTENT_BITS[name])
+
+    @property
+    def intents(self) -> list:
+        """걸린 의도 이름 (INTENT_TABLE 순서, 로그/디버그용)"""
+        return [name for name, bit in INTENT_BITS.items() if self.bits & bit]
+
+    def __repr__(self):
+        return f"IntentFeatures(intents={self.intents}, room={self.room!r}, intent_key={self.intent_key!r})"
+
+
+class IntentDetector:
+    """INTENT_TABLE → 정규화 방식별 자동자 + {키워드: 의도 비트}"""
+
+    def __init__(self, table=INTENT_TABLE):
+        self._scanners = []  # [(normalize, automaton, {정규화된 키워드: 비트 OR})]
+        for mode, normalize in _NORMALIZERS.items():
+            postings = {}
+            for name, intent_mode, keywords in table:
+                if intent_mode != mode:
+                    continue
+                for kw in keywords:
+                    kw = normalize(kw)
+                    postings[kw] = postings.get(kw, 0) | INTENT_BITS[name]
+            if postings:
+                self._scanners.append((normalize, KeywordAutomaton(postings), postings))
+        self._lower_scanner = next(s for s in self._scanners if s[0] is _NORMALIZERS[LOWER])
+
+    def _bits(self, text: str, scanners) -> int:
+        bits = 0
+        for normalize, automaton, postings in scanners:
+            for kw in automaton.find(normalize(text)):
+                bits |= postings[kw]
+        return bits
+
+    @staticmethod
+    def _room(bits: int):
+        for room, bit in _ROOM_BITS:
+            if bits & bit:
+                return room
+        return None
+
+    def scan(self, text: str) -> IntentFeatures:
+        """메시지를 정규화 방식별로 한 번씩 훑어 IntentFeatures 생성"""
+        text = text or ""
+        bits = self._bits(text, self._scanners)
+        room = self._room(bits)
+        room_after_malggo = room
+        if "말고" in text:
+            # 방 변경 요청("A 말고 B")은 "말고" 뒤의 방만 봄
+            room_after_malggo = self._room(self._bits(text.split("말고", 1)[1], (self._lower_scanner,)))
+
+        stripped = text.strip()
+        lowered = stripped.lower()
+        is_question = stripped.endswith("?") or lowered.startswith(_QUESTION_PREFIXES)
+        ends_with_question = stripped.endswith("?") or stripped.endswith("？")
+
+        if bits & INTENT_BITS["ask_letter_now"]:
+            intent_key = "ask_letter_now"
+        else:
+            # 단순 반복 질의 키(공백/구두점 제거) - 한글/영문/숫자/공백만 유지
+            intent_key = _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", lowered)).strip()
+        return IntentFeatures(bits, room, room_after_malggo, is_question, ends_with_question, intent_key)
@@ -0,0 +1,130 @@
+"""
+프로세스 내 백그라운드 작업 큐
+
+편지 생성, 대화 요약처럼 오래 걸리는 LLM 호출을 요청 경로 밖에서 돌리기 위한 작은 작업 관리자입니다.
+작업마다 id를 발급하고 상태(queued → running → done / failed / cancelled)와 결과를 보관하므로,
+클라이언트는 /api/jobs/<id>로 완료를 확인할 수 있습니다.
+
+- 워커 수(workers)와 대기 작업 수(max_pending)에 상한이 있어, 가득 차면 submit()이 None을 돌려줌
+  (호출 측은 기존처럼 요청 안에서 바로 처리)
+- 끝난 작업은 ttl초 동안만 보관 (submit할 때 정리)
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """작업 레코드 (future는 내부 대기용, 외부에는 snapshot()만 노출)"""
+
+    __slots__ = ("id", "kind", "owner", "status", "result", "error", "created_at", "finished_at", "future")
+
+    def __init__(self, kind: str, owner: str = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    def snapshot(self) -> dict:
+        data = {"id": self.id, "kind": self.kind, "status": self.status}
+        if self.status == DONE:
+            data["result"] = self.result
+        elif self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """워커 풀 + 작업 id 레지스트리 (스레드 안전)"""
+
+    def __init__(self, workers: int = 4, max_pending: int = 64, ttl: float = 600.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs = {}  # {job_id: Job}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, kind: str, fn, *args, owner: str = None):
+        """작업 등록 후 id 반환 (대기 작업이 max_pending개면 None)"""
+        with self._lock:
+            self._sweep(time.time())
+            pending = sum(1 for job in self._jobs.values() if job.status in (QUEUED, RUNNING))
+            if pending >= self.max_pending:
+                print(f"[작업 큐] 가득 참 ({pending}/{self.max_pending}) → {kind} 작업 거절")
+                return None
+            job = Job(kind, owner)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn, args)
+        return job.id
+
+    def _run(self, job: Job, fn, args):
+        job.status = RUNNING
+        try:
+            job.result = fn(*args)
+            job.status = DONE
+            return job.result
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            print(f"[작업 큐] {job.kind} 작업 실패 ({job.id}): {e}")
+            raise
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str, owner: str = None):
+        """작업 상태 dict (없거나 owner를 줬는데 다르면 None)
+
+        owner 대조는 서버 내부 호출용. 외부(HTTP)에는 신원이 없으므로 추측 불가능한
+        작업 id(uuid4) 자체가 조회 권한 - owner 없이 조회한다.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job.snapshot()
+
+    def future(self, job_id: str):
+        """작업 완료를 기다릴 concurrent.futures.Future (없으면 None)"""
+        job = self._jobs.get(job_id)
+        return job.future if job is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        """시작 전인 작업만 취소 (실행 중이면 끝까지 돌고 결과만 남음)"""
+        job = self._jobs.get(job_id)
+        if job is None or not job.future.cancel():
+            return False
+        job.status = CANCELLED
+        job.finished_at = time.time()
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "max_pending": self.max_pending, **counts}
+
+    def _sweep(self, now: float):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def after_fork(self):
+        """fork된 자식 프로세스에서 호출: 부모의 스레드 풀/작업 목록을 버림"""
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
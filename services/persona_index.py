@@ -0,0 +1,101 @@
+"""
+페르소나(RAG-P) 트리거 키워드 인덱스
+
+memory_vault의 모든 trigger_keywords를 Aho–Corasick 자동자 하나로 컴파일해 두고,
+유저 메시지 + 대화 맥락을 한 번만 훑어 등장한 키워드를 모두 찾은 뒤 스토리별 점수로 합산합니다.
+스토리 수가 늘어도 검색 비용은 텍스트 길이 + 매칭 수에만 비례합니다.
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho–Corasick 다중 패턴 자동자 (겹치는 키워드, 다른 키워드의 접두/접미인 키워드도 모두 찾음)"""
+
+    def __init__(self, keywords):
+        self._goto = [{}]  # 노드별 {문자: 다음 노드}
+        self._fail = [0]
+        self._out = [()]  # 노드에서 끝나는 키워드들 (실패 링크를 따라 이어진 것 포함)
+        self._always = set()  # 빈 문자열 키워드 ("" in text는 항상 참)
+        for kw in keywords:
+            if not kw:
+                self._always.add(kw)
+                continue
+            node = 0
+            for ch in kw:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (kw,)
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """text에 한 번 이상 등장하는 키워드 집합 (한 번 훑기)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self._always)
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class PersonaIndex:
+    """memory_vault → (스토리 목록, 키워드별 스토리 점수 기여, 자동자)"""
+
+    def __init__(self, memory_vault: dict):
+        self.stories = []  # [(category, story_id, story_data)] - 파일 순서 (동점 처리 순서 유지)
+        self.postings = {}  # {keyword: {스토리 순번: 목록 내 등장 횟수}}
+        for category, category_data in memory_vault.items():
+            if "stories" not in category_data:
+                continue
+            for story_id, story_data in category_data["stories"].items():
+                if "trigger_keywords" not in story_data:
+                    continue
+                index = len(self.stories)
+                self.stories.append((category, story_id, story_data))
+                for kw in story_data["trigger_keywords"]:
+                    counts = self.postings.setdefault(kw, {})
+                    counts[index] = counts.get(index, 0) + 1
+        self.automaton = KeywordAutomaton(self.postings)
+
+    def match(self, text: str) -> list:
+        """
+        키워드가 하나 이상 맞은 스토리를 파일 순서로 반환
+
+        Returns:
+            list: [(category, story_id, story_data, matched_keywords, score)]
+                  score는 trigger_keywords 중 text에 포함된 항목 수 (기존 `kw in text` 합산과 동일)
+        """
+        found = self.automaton.find(text)
+        scores = {}
+        for kw in found:
+            for index, count in self.postings[kw].items():
+                scores[index] = scores.get(index, 0) + count
+        matches = []
+        for index in sorted(scores):
+            category, story_id, story_data = self.stories[index]
+            matched = [kw for kw in story_data["trigger_keywords"] if kw in found]
+            matches.append((category, story_id, story_data, matched, scores[index]))
+        return matches
@@ -0,0 +1,77 @@
+"""
+정적 프롬프트 조각 캐시
+
+페르소나 JSON 덤프, 캐릭터 설명, 상담 원칙처럼 턴마다 똑같이 다시 만들던 문자열을
+한 번만 만들어 두고, 소스 파일이 바뀌면(mtime/크기) 해당 조각만 다시 만듭니다.
+파일 stat 확인은 조각마다 check_interval초에 한 번만 하므로 턴당 비용은 dict 조회 수준입니다.
+"""
+
+import threading
+import time
+
+_MISSING = object()
+
+
+def _stamp(path):
+    """파일 변경 감지용 (mtime_ns, size). 파일이 없으면 None"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PromptFragments:
+    """
+    이름 → (소스 파일, 빌더) 등록 후 get(name)으로 조회하는 조각 캐시 (스레드 안전)
+
+    빌더 안에서 다른 조각을 get()해도 됨 (예: persona_json은 persona 조각으로 만듦)
+    """
+
+    def __init__(self, check_interval: float = 2.0):
+        self.check_interval = check_interval
+        self._builders = {}  # {name: (paths, build)}
+        self._values = {}  # {name: (value, stamps, last_check)}
+        self._lock = threading.RLock()
+        self.builds = 0
+
+    def register(self, name: str, paths, build):
+        """조각 등록 (paths 중 하나라도 바뀌면 build()로 다시 만듦). 첫 get()에서 만듦"""
+        with self._lock:
+            self._builders[name] = (tuple(paths), build)
+            self._values.pop(name, None)
+
+    def get(self, name: str):
+        entry = self._values.get(name, _MISSING)
+        now = time.monotonic()
+        if entry is not _MISSING and now - entry[2] < self.check_interval:
+            return entry[0]
+        with self._lock:
+            paths, build = self._builders[name]
+            stamps = tuple(_stamp(p) for p in paths)
+            entry = self._values.get(name, _MISSING)
+            if entry is not _MISSING and entry[1] == stamps:
+                self._values[name] = (entry[0], stamps, now)
+                return entry[0]
+            if entry is not _MISSING:
+                # 같은 파일에서 만든 다른 조각도 함께 무효화 (빌더가 그 조각을 get()하면 새 값으로)
+                for other, (other_paths, _) in self._builders.items():
+                    if other != name and set(other_paths) & set(paths):
+                        self._values.pop(other, None)
+            value = build()
+            self._values[name] = (value, stamps, now)
+            self.builds += 1
+            return value
+
+    def warm(self):
+        """등록된 조각을 모두 미리 만듦 (기동 시 한 번)"""
+        for name in list(self._builders):
+            self.get(name)
+
+    def invalidate(self, name: str = None):
+        """조각 하나(또는 전부)를 다음 get()에서 다시 만들도록 표시"""
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
@@ -0,0 +1,160 @@
+"""
+메모리 세션 캐시
+
+ChatbotService.sessions를 최대 세션 수 / 메모리 예산 / 유휴 TTL로 제한하는 LRU 캐시입니다.
+내보내는(evict) 세션은 on_evict 콜백으로 저장소에 기록한 뒤 버리며,
+다음 요청 때 _load_session으로 다시 읽어옵니다.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from .session_store import LazyHistory
+
+# 세션 객체 자체(속성/집합 등)의 대략적인 고정 비용
+SESSION_BASE_BYTES = 4096
+
+
+def estimate_session_bytes(session) -> int:
+    """세션이 차지하는 메모리 추정치 (메모리에 올라온 대화 기록 기준)"""
+    history = session.conversation_history
+    messages = history.resident() if isinstance(history, LazyHistory) else history
+    total = SESSION_BASE_BYTES + sys.getsizeof(messages)
+    for msg in messages:
+        total += sys.getsizeof(msg) + sys.getsizeof(msg.get("content", ""))
+    total += sys.getsizeof(session.summary_text or "") + sys.getsizeof(session.letter_content or "")
+    window = getattr(session, "repetition_window", None)
+    if window is not None:
+        total += window.nbytes  # 의미 반복 감지용 임베딩 창
+    return total
+
+
+class SessionCache:
+    """
+    LRU + 유휴 TTL + 메모리 예산 세션 캐시 (스레드 안전)
+
+    - max_sessions: 최대 상주 세션 수
+    - max_bytes: 상주 세션 메모리 추정치 합계 상한
+    - ttl: 마지막 접근 후 이 시간(초)이 지나면 만료
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: float = 3600.0, on_evict=None, estimate=estimate_session_bytes):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.estimate = estimate
+        self._entries = OrderedDict()  # {username: [session, last_access, bytes]}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"capacity": 0, "bytes": 0, "ttl": 0}
+
+    def get(self, username: str):
+        """세션 조회 (없거나 만료되었으면 None). 조회 시 크기 추정치를 갱신"""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                evicted.append(self._pop(username, "ttl"))
+                entry = None
+            if entry is None:
+                self.misses += 1
+                session = None
+            else:
+                self.hits += 1
+                session = entry[0]
+                self._touch(username, entry, now)
+            evicted.extend(self._shrink(now, keep=username))
+        self._notify(evicted)
+        return session
+
+    def put(self, username: str, session):
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            if username in self._entries:
+                self._pop(username, None)
+            entry = [session, now, 0]
+            self._entries[username] = entry
+            self._touch(username, entry, now)
+            evicted.extend(self._shrink(now, keep=username))
+        self._notify(evicted)
+
+    def discard(self, username: str):
+        """세션을 기록 없이 버림 (on_evict 호출 안 함 - 저장소 쪽이 더 최신인 세션용)"""
+        with self._lock:
+            if username in self._entries:
+                self._pop(username, None)
+
+    def __contains__(self, username: str) -> bool:
+        with self._lock:
+            return username in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sweep(self):
+        """만료된 세션 일괄 정리"""
+        with self._lock:
+            evicted = self._shrink(time.monotonic())
+        self._notify(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "resident_sessions": len(self._entries),
+                "resident_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": dict(self.evictions),
+            }
+
+    # 내부 (self._lock 보유 상태에서 호출)
+
+    def _touch(self, username: str, entry: list, now: float):
+        size = self.estimate(entry[0])
+        self._bytes += size - entry[2]
+        entry[1] = now
+        entry[2] = size
+        self._entries.move_to_end(username)
+
+    def _pop(self, username: str, reason):
+        session, _, size = self._entries.pop(username)
+        self._bytes -= size
+        if reason:
+            self.evictions[reason] += 1
+        return session
+
+    def _shrink(self, now: float, keep: str = None) -> list:
+        """TTL 만료 → 개수 초과 → 메모리 초과 순으로 오래된 세션부터 내보냄"""
+        evicted = []
+        while self._entries:
+            username, (_, last_access, _) = next(iter(self._entries.items()))
+            if username == keep:
+                break
+            if self.ttl and now - last_access > self.ttl:
+                reason = "ttl"
+            elif len(self._entries) > self.max_sessions:
+                reason = "capacity"
+            elif self._bytes > self.max_bytes:
+                reason = "bytes"
+            else:
+                break
+            evicted.append(self._pop(username, reason))
+        return evicted
+
+    def _notify(self, evicted: list):
+        if self.on_evict:
+            for session in evicted:
+                try:
+                    self.on_evict(session)
+                except Exception as e:
+                    print(f"[경고] 세션 내보내기 실패 ({session.username}): {e}")
@@ -0,0 +1,733 @@
+"""
+세션 저장소
+
+PostOfficeSession 상태를 디스크에 보관합니다. (SESSION_BACKEND로 선택)
+- SessionStore: 저장소 인터페이스 (load / save / save_many)
+- FileSessionStore: 유저별 상태 헤더 session_<name>.json (임시 파일 + rename으로 원자적 교체)
+  + 대화 기록 session_<name>.log.jsonl (append-only, 저장 비용은 새 메시지 수에 비례)
+- SqliteSessionStore: WAL 모드 SQLite (상태/메시지 테이블 분리, 여러 워커 프로세스가 공유 가능)
+- 두 저장소 모두 유저별 version을 두고 저장 시 비교 (다른 프로세스가 먼저 기록했으면 덮어쓰지 않고
+  SessionConflictError - 여러 워커 프로세스가 같은 저장소를 써도 서로의 기록을 지우지 않음)
+- Message: 대화 메시지 1개 (__slots__ 레코드, role은 intern되어 모든 세션이 공유)
+- LazyHistory: 로드 시 로그의 마지막 일부만 읽고, 앞부분이 필요할 때만 나머지를 읽는 대화 기록
+- WriteBehindSessionWriter: 변경된 세션을 dirty로만 표시하고,
+  백그라운드 스레드가 턴 종료 시점 또는 주기마다 한 번에 기록
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import MutableSequence
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows (프로세스 간 락 없이 프로세스 내 락만)
+    fcntl = None
+
+SESSION_FORMAT = 2
+
+
+class SessionConflictError(RuntimeError):
+    """
+    저장하려는 세션을 다른 프로세스가 먼저 기록함 (version 불일치)
+
+    충돌한 유저는 저장하지 않으며(나머지는 저장됨), 메모리의 세션을 버리고 저장소에서 다시 읽어야 함
+    """
+
+    def __init__(self, usernames):
+        self.usernames = list(usernames)
+        super().__init__(f"세션 version 충돌 ({len(self.usernames)}명): {', '.join(self.usernames)}")
+
+
+class Message:
+    """
+    대화 메시지 레코드 (dict 대신 __slots__로 메시지당 메모리 절약)
+
+    기존 코드와의 호환을 위해 msg["role"], msg["content"], msg.get(...)을 그대로 지원
+    """
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = sys.intern(role)
+        self.content = content
+
+    @classmethod
+    def coerce(cls, msg) -> "Message":
+        """dict 또는 Message → Message"""
+        if isinstance(msg, cls):
+            return msg
+        return cls(msg["role"], msg["content"])
+
+    def __getitem__(self, key: str):
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ("role", "content")
+
+    def to_dict(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+    def __eq__(self, other):
+        try:
+            return self.role == other["role"] and self.content == other["content"]
+        except (KeyError, TypeError):
+            return NotImplemented
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content!r})"
+
+
+class LazyHistory(MutableSequence):
+    """
+    tail만 메모리에 올린 대화 기록
+
+    _build_user_prompt / get_summary / 반복 감지는 최근 메시지만 보므로
+    음수 인덱스/끝부분 슬라이스는 tail에서 바로 처리하고,
+    그보다 앞을 보거나 전체를 순회할 때만 로그 앞부분을 읽어 합침
+    """
+
+    def __init__(self, tail: list, offset: int, load_head):
+        self._items = tail
+        self._offset = offset  # 아직 읽지 않은 앞부분 메시지 수
+        self._load_head = load_head  # (count) -> 앞부분 메시지 list
+        self._lock = threading.Lock()
+
+    def _materialize(self):
+        with self._lock:
+            if self._offset:
+                self._items = self._load_head(self._offset) + self._items
+                self._offset = 0
+
+    def _resolve(self, index):
+        """tail만으로 처리 가능한 인덱스/슬라이스면 tail 기준으로 변환, 아니면 None"""
+        offset = self._offset
+        if not offset:
+            return index
+        n = offset + len(self._items)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(n)
+            if step == 1 and (start >= offset or stop <= start):
+                return slice(max(start, offset) - offset, max(stop, offset) - offset)
+            return None
+        if index < 0:
+            index += n
+        return index - offset if index >= offset else None
+
+    def wrap_loader(self, wrapper):
+        """앞부분 읽기를 wrapper(load_head, count)로 감쌈 (async 경로에서 디스크 읽기를 스레드로 넘기는 용도)"""
+        load_head = self._load_head
+        self._load_head = lambda count: wrapper(load_head, count)
+
+    @property
+    def loaded(self) -> bool:
+        return not self._offset
+
+    def resident(self) -> list:
+        """메모리에 올라와 있는 메시지 (앞부분을 읽지 않음)"""
+        return self._items
+
+    def __len__(self):
+        return self._offset + len(self._items)
+
+    def __getitem__(self, index):
+        local = self._resolve(index)
+        if local is None:
+            self._materialize()
+            return self._items[index]
+        return self._items[local]
+
+    def __setitem__(self, index, value):
+        self._materialize()
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        self._materialize()
+        del self._items[index]
+
+    def insert(self, index, value):
+        self._materialize()
+        self._items.insert(index, value)
+
+    def append(self, value):
+        self._items.append(value)
+
+    def __iter__(self):
+        self._materialize()
+        return iter(self._items)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"LazyHistory(len={len(self)}, loaded={self.loaded})"
+
+
+class SessionStore:
+    """
+    세션 저장소 인터페이스
+
+    load/save는 PostOfficeSession.to_dict() 형태의 dict를 주고받으며,
+    conversation_history는 LazyHistory로 돌려줄 수 있음.
+    같은 history 객체를 다시 저장하면 새로 붙은 메시지만 기록하는 것이 구현 규약.
+    save할 dict에 message_count가 있으면 history의 앞 message_count개까지만 기록
+    (writer가 턴 락 안에서 잡은 길이 - 그 뒤에 붙은 메시지는 다음 저장 때 헤더와 함께 기록)
+    저장은 마지막으로 읽거나 쓴 version과 저장소의 version이 같을 때만 하고, 다르면 SessionConflictError
+    """
+
+    def load(self, username: str):
+        """세션 dict 로드 (없으면 None)"""
+        raise NotImplementedError
+
+    def save(self, username: str, data: dict):
+        raise NotImplementedError
+
+    def save_many(self, items: list):
+        """[(username, data), ...] 일괄 저장 (백엔드가 지원하면 한 트랜잭션, 충돌한 유저만 빼고 저장)"""
+        conflicts = []
+        for username, data in items:
+            try:
+                self.save(username, data)
+            except SessionConflictError as e:
+                conflicts.extend(e.usernames)
+        if conflicts:
+            raise SessionConflictError(conflicts)
+
+    def forget(self, username: str):
+        """메모리에서 내려간 세션의 대화 기록 참조 해제 (version은 남겨 두어 밀린 저장도 충돌 검사를 통과)"""
+        pass
+
+    def close(self):
+        pass
+
+    def after_fork(self):
+        """fork된 자식 프로세스에서 호출: 부모 프로세스의 락/연결을 버림"""
+        self._lock = threading.Lock()
+
+
+class FileSessionStore(SessionStore):
+    """
+    유저별 파일 세션 저장소 (상태 헤더 + append-only 대화 로그)
+
+    헤더의 log_bytes까지가 유효한 로그이므로, 로그를 덧붙인 뒤 헤더를 쓰기 전에 죽어도
+    읽을 때는 log_bytes까지만 보고 마지막으로 커밋된 상태로 복구됨.
+    (그 뒤의 꼬리는 다음 저장 때 writer가 잘라냄 - 읽기는 파일을 바꾸지 않으므로
+    기록 중인 로그를 동시에 읽거나 도구가 읽기 전용으로 열어도 안전)
+    예전 형식(conversation_history를 헤더에 포함)도 그대로 읽고, 다음 저장 때 새 형식으로 바뀜.
+    저장은 유저별 .lock 파일의 flock 안에서 디스크 헤더의 version을 확인한 뒤 수행 (여러 워커 프로세스 대비)
+    """
+
+    def __init__(self, directory, tail_messages: int = 60):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.tail_messages = tail_messages
+        self._logged = {}  # {username: (history 객체, 로그에 기록된 메시지 수, log_bytes, version)}
+        self._lock = threading.Lock()
+
+    def path(self, username: str) -> Path:
+        safe = re.sub(r"[^\w\-가-힣]", "_", username)
+        return self.directory / f"session_{safe}.json"
+
+    @staticmethod
+    def log_path(path: Path) -> Path:
+        return path.with_name(path.stem + ".log.jsonl")
+
+    def load(self, username: str):
+        """세션 dict 로드 (없으면 None). conversation_history는 LazyHistory"""
+        path = self.path(username)
+        if not path.exists():
+            return None
+        return self.load_file(path, username)
+
+    def load_file(self, path: Path, username: str = None) -> dict:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        username = username or data.get("username")
+        if "conversation_history" in data:
+            # 예전 형식 (version 없음 = 0, 다음 저장 때 로그 전체를 새로 씀)
+            if username:
+                with self._lock:
+                    self._logged[username] = (None, 0, 0, 0)
+            return data
+        log = self.log_path(Path(path))
+        count = data.pop("message_count", 0)
+        log_bytes = data.pop("log_bytes", 0)
+        version = data.pop("version", 0)
+        data.pop("format", None)
+        # 헤더에 반영되지 않은 꼬리(기록 중이거나 중단된 append)는 log_bytes 경계로 무시
+        tail = self._read_tail(log, log_bytes, min(count, self.tail_messages))
+        history = LazyHistory(tail, count - len(tail), lambda n: self._read_head(log, n))
+        data["conversation_history"] = history
+        if username:
+            with self._lock:
+                self._logged[username] = (history, count, log_bytes, version)
+        return data
+
+    @staticmethod
+    def _disk_version(path: Path):
+        """디스크 헤더의 version (파일이 없으면 None, version 도입 이전 헤더는 0)"""
+        try:
+            return json.loads(path.read_text(encoding="utf-8")).get("version", 0)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    @contextmanager
+    def _file_lock(path: Path):
+        """유저별 프로세스 간 쓰기 락 (session_<name>.lock에 flock)"""
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_suffix(".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_head(log: Path, count: int) -> list:
+        messages = []
+        with open(log, "r", encoding="utf-8") as f:
+            for line in f:
+                if len(messages) >= count:
+                    break
+                messages.append(Message.coerce(json.loads(line)))
+        return messages
+
+    @staticmethod
+    def _read_tail(log: Path, end: int, count: int, block: int = 65536) -> list:
+        """로그 끝(end 바이트)에서 거꾸로 읽어 마지막 count개 메시지만 파싱"""
+        if count <= 0 or not log.exists():
+            return []
+        with open(log, "rb") as f:
+            pos = end
+            buf = b""
+            while pos > 0 and buf.count(b"\n") <= count:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        lines = buf.rstrip(b"\n").split(b"\n")
+        return [Message.coerce(json.loads(line)) for line in lines[-count:]]
+
+    @staticmethod
+    def _atomic_write(path: Path, text: str):
+        """임시 파일에 쓴 뒤 rename (쓰는 도중 죽어도 기존 파일은 온전)"""
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _encode(messages) -> str:
+        return "".join(
+            json.dumps({"role": m["role"], "content": m["content"]}, ensure_ascii=False) + "\n" for m in messages
+        )
+
+    def save(self, username: str, data: dict):
+        """
+        새 메시지만 로그에 덧붙이고 작은 상태 헤더를 원자적으로 교체
+
+        대화 기록 객체가 바뀐 경우(init 등으로 초기화) 또는 처음 저장 시에만 로그 전체를 다시 씀.
+        디스크 헤더의 version이 마지막으로 읽거나 쓴 version과 다르면(다른 프로세스가 기록) SessionConflictError
+        """
+        path = self.path(username)
+        log = self.log_path(path)
+        state = dict(data)
+        history = state.pop("conversation_history", [])
+        end = state.pop("message_count", len(history))
+        with self._lock:
+            logged = self._logged.get(username)
+        with self._file_lock(path):
+            current = self._disk_version(path)
+            if current != (logged[3] if logged else None):
+                raise SessionConflictError([username])
+            version = (current or 0) + 1
+            if logged and logged[0] is history and end >= logged[1]:
+                _, count, log_bytes, _ = logged
+                new = history[count:end]
+                if new:
+                    with open(log, "r+b") as f:
+                        f.seek(log_bytes)
+                        f.truncate()
+                        f.write(self._encode(new).encode("utf-8"))
+                        f.flush()
+                        os.fsync(f.fileno())
+                        log_bytes = f.tell()
+                count += len(new)
+            else:
+                messages = history[:end]
+                self._atomic_write(log, self._encode(messages))
+                count = len(messages)
+                log_bytes = log.stat().st_size
+            state.update({"format": SESSION_FORMAT, "message_count": count, "log_bytes": log_bytes, "version": version})
+            self._atomic_write(path, json.dumps(state, ensure_ascii=False))
+        with self._lock:
+            self._logged[username] = (history, count, log_bytes, version)
+
+    def forget(self, username: str):
+        with self._lock:
+            logged = self._logged.get(username)
+            if logged is not None:
+                self._logged[username] = (None,) + logged[1:]
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    SQLite 세션 저장소 (WAL 모드, 스레드별 연결)
+
+    - sessions: 유저별 상태(JSON) + 메시지 수 + version
+    - messages: (username, seq) 단위 대화 기록 → 저장은 새 메시지 INSERT만, 로드는 최근 N개만 조회
+    - save_many는 한 트랜잭션으로 커밋 (턴 종료 시 writer가 한 번 호출)
+    - 상태 행은 version이 마지막으로 읽거나 쓴 값일 때만 교체(compare-and-swap, 새 유저는 행이 없을 때만 INSERT)하고,
+      그 유저의 메시지는 CAS가 성공한 경우에만 기록 → 다른 프로세스가 먼저 쓴 유저는 SessionConflictError
+    """
+
+    _SELECT_STATE = "SELECT state, message_count, version FROM sessions WHERE username = ?"
+    _SELECT_TAIL = "SELECT role, content FROM messages WHERE username = ? ORDER BY seq DESC LIMIT ?"
+    _SELECT_HEAD = "SELECT role, content FROM messages WHERE username = ? AND seq < ? ORDER BY seq"
+    _INSERT_STATE = (
+        "INSERT INTO sessions (username, state, message_count, updated_at, version) VALUES (?, ?, ?, ?, 1) "
+        "ON CONFLICT(username) DO NOTHING"
+    )
+    _CAS_STATE = (
+        "UPDATE sessions SET state = ?, message_count = ?, updated_at = ?, version = ? "
+        "WHERE username = ? AND version = ?"
+    )
+    _DELETE_FROM = "DELETE FROM messages WHERE username = ? AND seq >= ?"
+    _INSERT_MESSAGE = "INSERT INTO messages (username, seq, role, content) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path, tail_messages: int = 60):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tail_messages = tail_messages
+        self._logged = {}  # {username: (history 객체, DB에 기록된 메시지 수, version)}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " username TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " message_count INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " username TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " role TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " PRIMARY KEY (username, seq)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);"
+        )
+        # version 도입 이전 DB
+        if "version" not in {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}:
+            try:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):  # 다른 워커가 먼저 추가함
+                    raise
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, username: str):
+        conn = self._conn()
+        row = conn.execute(self._SELECT_STATE, (username,)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        count, version = row[1], row[2]
+        rows = conn.execute(self._SELECT_TAIL, (username, min(count, self.tail_messages))).fetchall()
+        tail = [Message(role, content) for role, content in reversed(rows)]
+        history = LazyHistory(tail, count - len(tail), lambda n: self._load_head(username, n))
+        data["conversation_history"] = history
+        with self._lock:
+            self._logged[username] = (history, count, version)
+        return data
+
+    def _load_head(self, username: str, count: int) -> list:
+        rows = self._conn().execute(self._SELECT_HEAD, (username, count)).fetchall()
+        return [Message(role, content) for role, content in rows]
+
+    def save(self, username: str, data: dict):
+        self.save_many([(username, data)])
+
+    def save_many(self, items: list):
+        conn = self._conn()
+        committed = []
+        conflicts = []
+        with conn:  # 한 트랜잭션 (실패 시 전체 롤백, 첫 문장이 쓰기라 바로 쓰기 락을 잡음)
+            for username, data in items:
+                state = dict(data)
+                history = state.pop("conversation_history", [])
+                end = state.pop("message_count", len(history))
+                with self._lock:
+                    logged = self._logged.get(username)
+                if logged and logged[0] is history and end >= logged[1]:
+                    start = logged[1]
+                    new = history[start:end]
+                else:
+                    # 처음 저장하거나 대화 기록이 초기화된 경우 → 전체 교체
+                    start = 0
+                    new = history[:end]
+                count = start + len(new)
+                state_json = json.dumps(state, ensure_ascii=False)
+                # 상태 행 compare-and-swap: 0행이면 다른 프로세스가 먼저 기록 → 이 유저는 건드리지 않음
+                if logged is None:
+                    version = 1
+                    cur = conn.execute(self._INSERT_STATE, (username, state_json, count, time.time()))
+                else:
+                    version = logged[2] + 1
+                    cur = conn.execute(self._CAS_STATE, (state_json, count, time.time(), version, username, logged[2]))
+                if cur.rowcount != 1:
+                    conflicts.append(username)
+                    continue
+                conn.execute(self._DELETE_FROM, (username, start))
+                conn.executemany(
+                    self._INSERT_MESSAGE,
+                    [(username, start + i, m["role"], m["content"]) for i, m in enumerate(new)]
+                )
+                committed.append((username, history, count, version))
+        with self._lock:
+            for username, history, count, version in committed:
+                self._logged[username] = (history, count, version)
+        if conflicts:
+            raise SessionConflictError(conflicts)
+
+    def forget(self, username: str):
+        with self._lock:
+            logged = self._logged.get(username)
+            if logged is not None:
+                self._logged[username] = (None,) + logged[1:]
+
+    def after_fork(self):
+        super().after_fork()
+        self._local = threading.local()
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_session_store(backend: str, base_dir, tail_messages: int = 60, db_path=None) -> SessionStore:
+    """SESSION_BACKEND(file / sqlite)에 맞는 저장소 생성"""
+    base_dir = Path(base_dir)
+    if backend == "sqlite":
+        return SqliteSessionStore(db_path or base_dir / "sessions.sqlite3", tail_messages=tail_messages)
+    if backend != "file":
+        print(f"[경고] 알 수 없는 SESSION_BACKEND '{backend}' → file 사용")
+    return FileSessionStore(base_dir, tail_messages=tail_messages)
+
+
+class WriteBehindSessionWriter:
+    """
+    dirty 세션을 모아 백그라운드에서 기록 (write-behind)
+
+    한 턴 안에서 여러 번 저장 요청이 와도 세션당 한 번만 직렬화/기록하며,
+    요청 스레드는 디스크 I/O를 기다리지 않음.
+    기록 중인 세션은 저장이 끝날 때까지 _inflight에 남겨 pending()이 계속 돌려주므로,
+    그 사이 캐시에서 내려간 세션을 저장소의 옛 상태로 다시 읽지 않음.
+    직렬화(to_dict)는 session_lock(username)으로 유저 턴 락을 잡은 상태에서만 하므로
+    헤더와 대화 기록이 항상 같은 턴 경계의 상태 (턴이 진행 중이면 다음 주기로 미룸)
+    """
+
+    def __init__(self, store, interval: float = 1.0, session_lock=None, on_conflict=None):
+        self.store = store
+        self.interval = interval
+        self.session_lock = session_lock  # (username) -> 획득 여부(bool)를 yield하는 non-blocking 컨텍스트 매니저
+        self.on_conflict = on_conflict  # (username) -> None: 다른 프로세스가 먼저 기록한 세션 (메모리 사본 폐기용)
+        self._dirty = {}  # {username: session}
+        self._inflight = {}  # {username: session} - dirty에서 꺼내 저장 중인 세션
+        self._lock = threading.Lock()
+        self._saved = threading.Condition(self._lock)  # in-flight 저장이 끝날 때마다 notify
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.marks = 0
+        self.writes = 0
+        self.failures = 0
+        self.conflicts = 0
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, session):
+        with self._lock:
+            self._dirty[session.username] = session
+            self.marks += 1
+
+    def flush_soon(self):
+        """턴 종료: 쌓인 dirty 세션을 바로 기록하도록 writer를 깨움"""
+        self._wakeup.set()
+
+    def pending(self, username: str):
+        """아직 기록이 끝나지 않은 세션 객체 (dirty 또는 저장 중, 없으면 None)"""
+        with self._lock:
+            return self._dirty.get(username) or self._inflight.get(username)
+
+    def _snapshot(self, username: str, session):
+        """턴 경계의 세션 dict (턴 락을 바로 못 잡으면 None - 턴이 끝난 뒤 다시 시도)"""
+        if self.session_lock is None:
+            return self._serialize(session)
+        with self.session_lock(username) as acquired:
+            return self._serialize(session) if acquired else None
+
+    @staticmethod
+    def _serialize(session) -> dict:
+        data = session.to_dict()
+        # 대화 기록은 참조로 넘어가므로 지금 길이를 같이 고정 (저장 중에 붙는 메시지는 다음 저장으로)
+        data["message_count"] = len(data.get("conversation_history", []))
+        return data
+
+    def _finish(self, usernames, failed: bool, conflicts=()):
+        """
+        저장이 끝난 세션을 in-flight에서 제거 (실패하면 다시 dirty로 - 다음 주기에 재시도)
+
+        conflicts(version 충돌)는 재시도해도 계속 충돌하므로 dirty에서도 버리고,
+        on_conflict로 알려 다음 요청 때 저장소의 최신 상태를 읽도록 함
+        """
+        with self._lock:
+            for username in usernames:
+                session = self._inflight.pop(username, None)
+                if username in conflicts:
+                    if self._dirty.get(username) is session:
+                        del self._dirty[username]
+                elif failed and session is not None:
+                    # 일시적인 디스크/DB 오류로 턴이 사라지지 않도록
+                    self._dirty.setdefault(username, session)
+            self._saved.notify_all()
+        if conflicts:
+            self.conflicts += len(conflicts)
+            print(f"[경고] 다른 프로세스가 먼저 기록한 세션 {len(conflicts)}개 → 메모리 사본 폐기: {', '.join(conflicts)}")
+            if self.on_conflict is not None:
+                for username in conflicts:
+                    self.on_conflict(username)
+
+    def flush_user(self, username: str):
+        """특정 세션만 즉시 기록 (캐시에서 내보내기 전에 사용, 진행 중인 저장이 있으면 끝날 때까지 대기)"""
+        with self._lock:
+            while username in self._inflight:
+                self._saved.wait()
+            session = self._dirty.pop(username, None)
+            if session is None:
+                return
+            self._inflight[username] = session
+        try:
+            data = self._snapshot(username, session)
+            if data is None:
+                # 턴 진행 중 → dirty로 남겨 두고 턴 종료 후 writer가 기록 (pending()이 계속 돌려줌)
+                self._finish([username], failed=True)
+                return
+            self.store.save(username, data)
+            self.writes += 1
+            failed, conflicts = False, ()
+        except SessionConflictError as e:
+            failed, conflicts = False, e.usernames
+        except Exception as e:
+            self.failures += 1
+            failed, conflicts = True, ()
+            print(f"[경고] 세션 저장 실패 ({username}): {e}")
+        self._finish([username], failed, conflicts)
+
+    def flush(self):
+        """dirty 세션을 호출 스레드에서 즉시 모두 기록 (다른 스레드가 저장 중인 유저는 다음 주기로)"""
+        with self._lock:
+            pending = {u: s for u, s in self._dirty.items() if u not in self._inflight}
+            for username in pending:
+                del self._dirty[username]
+            self._inflight.update(pending)
+        items = []
+        for username, session in pending.items():
+            data = None
+            try:
+                data = self._snapshot(username, session)
+            except RuntimeError:
+                # (락 없이 쓰는 경우) 요청 스레드가 직렬화 도중 세션을 바꿈
+                pass
+            if data is None:
+                # 턴 진행 중 → 다음 주기에 재시도
+                self._finish([username], failed=True)
+            else:
+                items.append((username, data))
+        if not items:
+            return
+        usernames = [username for username, _ in items]
+        conflicts = ()
+        try:
+            self.store.save_many(items)
+            self.writes += len(items)
+            failed = False
+        except SessionConflictError as e:
+            # 충돌한 유저 외에는 저장됨
+            self.writes += len(items) - len(e.usernames)
+            failed, conflicts = False, e.usernames
+        except Exception as e:
+            self.failures += len(items)
+            failed = True
+            print(f"[경고] 세션 저장 실패 ({len(items)}개): {e}")
+        self._finish(usernames, failed, conflicts)
+
+    def close(self):
+        """종료 시 남은 세션 기록"""
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.store.close()
+
+    def after_fork(self):
+        """fork된 자식 프로세스에서 호출: 락/저장소 연결을 새로 만들고 writer 스레드를 다시 띄움"""
+        self._lock = threading.Lock()
+        self._saved = threading.Condition(self._lock)
+        self._inflight = {}
+        self._wakeup = threading.Event()
+        self.store.after_fork()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            dirty = len(self._dirty)
+            inflight = len(self._inflight)
+        return {"dirty": dirty, "inflight": inflight, "marks": self.marks, "writes": self.writes,
+                "failures": self.failures, "conflicts": self.conflicts}
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
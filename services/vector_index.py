@@ -0,0 +1,233 @@
+"""
+인메모리 NumPy 벡터 인덱스
+
+post_office_memories 컬렉션은 수백 개 청크 규모라 HNSW/SQLite 메타데이터 필터 없이
+정규화된 float32 행렬 하나와 행렬-벡터 곱 + argpartition으로 충분히 빠르게 top-k를 구할 수 있습니다.
+
+NumpyVectorIndex는 ChatbotService가 쓰는 ChromaDB 컬렉션 API(count/get/add/delete/query)를
+그대로 흉내 내는 쓰기 투과(write-through) 래퍼입니다.
+- 쓰기(add/delete)는 영속 컬렉션에 먼저 반영한 뒤 메모리 행렬에도 반영
+- 검색(query)은 메모리에서만 처리 (cosine 거리 = 1 - 코사인 유사도, Chroma와 동일)
+"""
+
+import threading
+
+import numpy as np
+
+
+class NumpyVectorIndex:
+    """ChromaDB 컬렉션을 감싸는 인메모리 정확(brute-force) 검색 인덱스"""
+
+    def __init__(self, collection=None):
+        self._collection = collection  # 영속 저장소 (None이면 순수 메모리 인덱스)
+        self._lock = threading.Lock()
+        self._ids = []
+        self._documents = []
+        self._metadatas = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._masks = {}  # {(key, value): bool 배열} - where 필터용 사전 계산 마스크
+
+    @classmethod
+    def from_collection(cls, collection, batch_size: int = 1000):
+        """영속 컬렉션의 임베딩을 모두 읽어 인덱스 구성"""
+        index = cls(collection)
+        total = collection.count()
+        for offset in range(0, total, batch_size):
+            got = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset
+            )
+            index._append(got["ids"], got["embeddings"], got["documents"], got["metadatas"])
+        return index
+
+    def attach(self, collection):
+        """영속 컬렉션만 교체 (fork한 워커에서 재연결할 때). 메모리 인덱스는 그대로 공유"""
+        self._collection = collection
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 내부 상태 갱신 (행렬은 통째로 교체하여 검색 스레드는 항상 일관된 스냅샷을 봄)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(matrix / norms)
+
+    def _append(self, ids, embeddings, documents, metadatas, replace: bool = False):
+        if not ids:
+            return
+        new_rows = self._normalize(embeddings)
+        with self._lock:
+            old_ids, old_documents, old_metadatas, old_matrix = self._ids, self._documents, self._metadatas, self._matrix
+            if replace:
+                # upsert: 같은 id의 기존 행을 빼고 새 행으로 교체 (Chroma upsert와 동일)
+                incoming = set(ids)
+                rest = [i for i, cid in enumerate(old_ids) if cid not in incoming]
+                if len(rest) < len(old_ids):
+                    old_ids = [old_ids[i] for i in rest]
+                    old_documents = [old_documents[i] for i in rest]
+                    old_metadatas = [old_metadatas[i] for i in rest]
+                    old_matrix = old_matrix[rest] if rest else np.zeros((0, 0), dtype=np.float32)
+            known = set(old_ids)
+            keep = []
+            for i, cid in enumerate(ids):
+                if cid not in known:  # 중복 id는 무시 (Chroma add와 동일)
+                    known.add(cid)
+                    keep.append(i)
+            if not keep:
+                return
+            rows = new_rows[keep]
+            matrix = rows if old_matrix.size == 0 else np.vstack([old_matrix, rows])
+            self._ids = old_ids + [ids[i] for i in keep]
+            self._documents = old_documents + [documents[i] for i in keep]
+            self._metadatas = old_metadatas + [(metadatas[i] or {}) for i in keep]
+            self._matrix = matrix
+            self._masks = {}
+
+    def _remove(self, ids):
+        drop = set(ids)
+        with self._lock:
+            keep = [i for i, cid in enumerate(self._ids) if cid not in drop]
+            if len(keep) == len(self._ids):
+                return
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._matrix = self._matrix[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+            self._masks = {}
+
+    @staticmethod
+    def _mask(key: str, value, metadatas: list, masks: dict) -> np.ndarray:
+        mask = masks.get((key, value))
+        if mask is None:
+            mask = np.fromiter((md.get(key) == value for md in metadatas), dtype=bool, count=len(metadatas))
+            masks[(key, value)] = mask  # 스냅샷의 마스크 캐시 (인덱스가 바뀌면 새 dict로 교체됨)
+        return mask
+
+    # ------------------------------------------------------------------
+    # ChromaDB 컬렉션 호환 API
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def add(self, documents, embeddings, metadatas, ids):
+        if self._collection is not None:
+            self._collection.add(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+        self._append(ids, embeddings, documents, metadatas)
+
+    def upsert(self, documents, embeddings, metadatas, ids):
+        if self._collection is not None:
+            self._collection.upsert(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+        self._append(ids, embeddings, documents, metadatas, replace=True)
+
+    def delete(self, ids):
+        if self._collection is not None:
+            self._collection.delete(ids=ids)
+        self._remove(ids)
+
+    def get(self, ids=None, include=None, **kwargs):
+        if self._collection is not None:
+            return self._collection.get(ids=ids, include=include if include is not None else ["documents", "metadatas"], **kwargs)
+        wanted = None if ids is None else set(ids)
+        picked = [i for i, cid in enumerate(self._ids) if wanted is None or cid in wanted]
+        return {
+            "ids": [self._ids[i] for i in picked],
+            "documents": [self._documents[i] for i in picked],
+            "metadatas": [self._metadatas[i] for i in picked],
+        }
+
+    def query(self, query_embeddings, n_results: int = 10, where: dict = None, include=None):
+        """Chroma collection.query와 같은 형태의 결과 반환 (쿼리마다 행렬-벡터 곱 1회)"""
+        with self._lock:
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            matrix, masks = self._matrix, self._masks
+
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if not ids:
+            for key in out:
+                out[key] = [[] for _ in query_embeddings]
+            return out
+        for q in self._normalize(query_embeddings):
+            scores = matrix @ q
+            candidates = None
+            if where:
+                mask = None
+                for key, value in where.items():
+                    m = self._mask(key, value, metadatas, masks)
+                    mask = m if mask is None else (mask & m)
+                candidates = np.flatnonzero(mask)
+                scores = scores[candidates]
+            k = min(n_results, scores.shape[0])
+            if k <= 0:
+                top = np.zeros(0, dtype=np.int64)
+            elif k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+            else:
+                top = np.argsort(-scores, kind="stable")
+            rows = top if candidates is None else candidates[top]
+            out["ids"].append([ids[i] for i in rows])
+            out["documents"].append([documents[i] for i in rows])
+            out["metadatas"].append([metadatas[i] for i in rows])
+            out["distances"].append((1.0 - scores[top]).astype(float).tolist())
+        return out
+
+
+class EmbeddingWindow:
+    """
+    최근 N개 텍스트의 정규화 임베딩 행렬 (세션별 의미 반복 감지용)
+
+    행은 오래된 것 → 최신 순. 비교는 행렬-벡터 곱 1회라 창 크기를 늘려도 파이썬 루프가 늘지 않음.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.texts = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    @staticmethod
+    def normalize(embedding) -> np.ndarray:
+        return NumpyVectorIndex._normalize(embedding)[0]
+
+    def vectors(self) -> dict:
+        """{텍스트: 정규화 벡터} - 창을 다시 맞출 때 이미 가진 벡터 재사용"""
+        return dict(zip(self.texts, self._matrix))
+
+    def reset(self, texts: list, vectors: list):
+        """창 내용을 (텍스트, 정규화 벡터) 목록으로 교체 (최근 size개만 유지)"""
+        self.texts = list(texts[-self.size:]) if self.size > 0 else []
+        kept = vectors[len(vectors) - len(self.texts):]
+        self._matrix = np.vstack(kept).astype(np.float32, copy=False) if kept else np.zeros((0, 0), dtype=np.float32)
+
+    def push(self, text: str, unit: np.ndarray):
+        """정규화 벡터 하나를 최신 행으로 추가 (가득 차면 가장 오래된 행 제거)"""
+        if self.size <= 0:
+            return
+        rows = [self._matrix[-(self.size - 1):]] if self.texts and self.size > 1 else []
+        self._matrix = np.vstack(rows + [unit[None, :]]).astype(np.float32, copy=False)
+        self.texts = (self.texts[-(self.size - 1):] if self.size > 1 else []) + [text]
+
+    def most_similar(self, unit: np.ndarray, exclude: str = None) -> tuple:
+        """창에서 unit과 코사인 유사도가 가장 높은 (유사도, 텍스트). exclude와 같은 텍스트는 제외"""
+        if not self.texts:
+            return None, None
+        scores = self._matrix @ unit
+        if exclude is not None:
+            for i, text in enumerate(self.texts):
+                if text == exclude:
+                    scores[i] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] == -np.inf:
+            return None, None
+        return float(scores[best]), self.texts[best]
@@ -685,294 +685,410 @@ async function sendMessage(isInitial = false) {
   const loadingId = appendMessage("bot", "생각 중...", null, { showAvatar: false });
 
   try {
-    const response = await fetch("/api/chat", {
+    const data = await requestChatStream(message, loadingId);
+    renderChatResponse(data, message, data.streamed > 0);
+  } catch (err) {
+    console.error("메시지 전송 에러:", err);
+    removeMessage(loadingId);
+    appendMessage("bot", "죄송합니다. 오류가 발생했습니다. 다시 시도해주세요.");
+  }
+}
+
+// SSE 스트리밍 요청: 토큰/말풍선을 도착하는 대로 표시하고 최종 응답 데이터 반환
+async function requestChatStream(message, loadingId) {
+  const response = await fetch("/api/chat/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ message, username }),
+  });
+
+  // 스트리밍을 쓸 수 없으면 기존 JSON 엔드포인트로 대체
+  if (!response.ok || !response.body) {
+    const fallback = await fetch("/api/chat", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ message, username }),
     });
-    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-
-    const data = await response.json();
+    if (!fallback.ok) throw new Error(`HTTP error! status: ${fallback.status}`);
     removeMessage(loadingId);
-    console.log("응답 데이터:", data);
-    // 봉투 편지 메시지
-    if (data.is_letter_end && data.letter) {
-      let totalDelay = 0;
-      
-      // 1단계: 앞의 일반 대화 메시지들 먼저 표시 (편지 발견 메시지 등)
-      if (Array.isArray(data.replies) && data.replies.length > 0) {
-        const allSplitMessages = [];
-        
-        // 우표 설명과 편지 내용을 제외한 일반 메시지만 먼저 처리
-        const regularReplies = data.replies.filter(text => 
-          !text.includes('우표') && 
-          !text.includes('stamp') &&
-          !text.startsWith('To.') &&  
-          !text.startsWith('to.') &&  
-          !text.includes('년 전의') && 
-          !text.includes('년 후의')    
-        );
-        
-        // 메시지 분할 및 총 시간 계산
-        regularReplies.forEach((replyText, index) => {
-          const splitMessages = splitLongMessage(replyText, 100);
-          allSplitMessages.push({ messages: splitMessages, originalIndex: index });
-          totalDelay += splitMessages.length * 800;
-        });
-        
-        // 순차적으로 표시
-        let currentDelay = 0;
-        allSplitMessages.forEach((item, index) => {
-          item.messages.forEach((msg, subIndex) => {
-            setTimeout(() => {
-              const showAvatar = index === 0 && subIndex === 0;
-              appendMessage("bot", msg, null, { showAvatar });
-              scrollToBottomSmooth();
-            }, currentDelay);
-            currentDelay += 800;
-          });
-        });
+    return fallback.json();
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  let buffer = "";
+  let liveText = "";
+  let liveId = loadingId;
+  const segmentIds = [];
+
+  const updateLiveBubble = (text) => {
+    const liveElem = document.getElementById(`${liveId}-0`);
+    if (liveElem) {
+      liveElem.textContent = text || "...";
+      scrollToBottomSmooth();
+    }
+  };
+
+  const handleEvent = (event, payload) => {
+    if (event === "token") {
+      liveText += payload.text;
+      const lastSegment = segmentIds.length ? segmentIds[segmentIds.length - 1].text : "";
+      const tailStart = lastSegment ? liveText.lastIndexOf(lastSegment) + lastSegment.length : 0;
+      updateLiveBubble(liveText.slice(tailStart).trim());
+    } else if (event === "segment") {
+      // 확정된 말풍선은 실제 메시지로 고정하고, 진행 중 말풍선은 그 아래로 이동
+      removeMessage(liveId);
+      const segId = appendMessage("bot", payload.text, null, { showAvatar: segmentIds.length === 0 });
+      segmentIds.push({ id: segId, text: payload.text });
+      liveId = appendMessage("bot", "...", null, { showAvatar: false });
+    } else if (event === "done") {
+      removeMessage(liveId);
+      if (payload.replace_streamed) {
+        segmentIds.forEach((seg) => removeMessage(seg.id));
       }
-      
-      // 2단계: 앞의 메시지가 모두 끝난 후 우표 설명 표시
-      const stampDescription = data.stamp_description;
-      const stampCode = data.stamp_code;
-      
-      // 우표 설명 메시지에 새 이름 적용
-      let processedStampDescription = stampDescription;
-      if (stampDescription && stampCode && STAMP_NAMES[stampCode]) {
-        const stampName = STAMP_NAMES[stampCode];
-        
-        processedStampDescription = processedStampDescription.replace(
-          /^이건 [^.]* 우표(?:야|지)\.\s*/,
-          ''
-        );
-        
-        processedStampDescription = processedStampDescription.replace(
-          /자 너의 편지에 붙어 있었던 우표다\./,
-          `이 우표의 이름은 ${stampName}이다.`
-        );
-        processedStampDescription = processedStampDescription.replace(
-          /좋아\. 다시 한번 보여주지\. 자 너의 편지에 붙어 있었던 우표다\./,
-          `좋아. 다시 한번 보여주지. 이 우표의 이름은 ${stampName}이다.`
-        );
+      if (payload.streamed > 0 && Array.isArray(payload.replies)) {
+        payload.replies = payload.replies.slice(payload.streamed);
       }
-      
-      const stampReplies = processedStampDescription 
-        ? [processedStampDescription] 
-        : extractStampOnly(Array.isArray(data.replies) ? data.replies : []);
-      
-      if (stampReplies.length) {
-        // 앞의 메시지 완료 후 1초 대기 후 우표 설명 시작
-        const stampStartDelay = totalDelay + 1000;
-        
-        // 우표 설명을 문장 단위로 분할하여 순차 표시
-        const stampSentences = stampReplies[0].split(/(?<=[.?!])\s+/);
-        
-        stampSentences.forEach((sentence, index) => {
-          setTimeout(() => {
-            const showAvatar = totalDelay === 0 && index === 0; // 앞에 메시지가 없었으면 첫 우표 메시지에 아바타
-            appendMessage("bot", sentence.trim(), null, { showAvatar });
-            scrollToBottomSmooth();
-          }, stampStartDelay + index * 800);
-        });
-        
-        // 3단계: 우표 설명 완료 후 봉투 미리보기
-        setTimeout(() => {
-          const stampSrc = data.stamp_image || (data.stamp_code ? `/static/images/chatbot/stamp/${data.stamp_code}.png` : null);
-          showEnvelopePreview(data.letter, data.buttons || [], stampSrc);
-        }, stampStartDelay + stampSentences.length * 800 + 500);
-      } else {
-        // 우표 설명이 없으면 앞의 메시지 후 바로 봉투
-        setTimeout(() => {
-          const stampSrc = data.stamp_image || (data.stamp_code ? `/static/images/chatbot/stamp/${data.stamp_code}.png` : null);
-          showEnvelopePreview(data.letter, data.buttons || [], stampSrc);
-        }, totalDelay + 500);
+      return payload;
+    } else if (event === "error") {
+      removeMessage(liveId);
+      segmentIds.forEach((seg) => removeMessage(seg.id));
+      throw new Error(payload.reply || "stream error");
+    }
+    return null;
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let dataText = "";
+      rawEvent.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) dataText += line.slice(5).trim();
+      });
+      if (!dataText) continue;
+
+      const result = handleEvent(event, JSON.parse(dataText));
+      if (result) return result;
+    }
+  }
+  throw new Error("stream closed before done event");
+}
+
+// 백그라운드 작업(편지 생성 등) 완료까지 /api/jobs/<id> 폴링 → 결과 반환
+const JOB_POLL_INTERVAL = 1000;
+const JOB_POLL_TIMEOUT = 90000;
+const LETTER_FALLBACK = "To. 지금의 나에게.\n\n네가 찾고 있던 그 마음, 여기 있어. 잊지 마.";
+
+async function waitForJob(jobId) {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT;
+  while (Date.now() < deadline) {
+    try {
+      const response = await fetch(`/api/jobs/${encodeURIComponent(jobId)}`);
+      if (response.status === 404) break;
+      if (response.ok) {
+        const job = await response.json();
+        if (job.status === "done") return job.result;
+        if (job.status === "failed" || job.status === "cancelled") break;
       }
-      return; 
+    } catch (error) {
+      console.warn("작업 상태 조회 실패:", error);
     }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+  }
+  throw new Error(`job ${jobId} did not finish`);
+}
 
-    // 일반 연속 메시지
-    if (Array.isArray(data.replies)) {
-      let totalDelay = 0;
+function renderChatResponse(data, message, continued = false) {
+  console.log("응답 데이터:", data);
+  // 봉투 편지 메시지 (편지가 아직 생성 중이면 letter_job으로 완료를 기다림)
+  if (data.is_letter_end && (data.letter || data.letter_job)) {
+    const letterPromise = data.letter
+      ? Promise.resolve(data.letter)
+      : waitForJob(data.letter_job)
+          .then((result) => result.letter)
+          .catch((error) => {
+            console.warn("편지 생성 대기 실패:", error);
+            return LETTER_FALLBACK;
+          });
+    let totalDelay = 0;
+    
+    // 1단계: 앞의 일반 대화 메시지들 먼저 표시 (편지 발견 메시지 등)
+    if (Array.isArray(data.replies) && data.replies.length > 0) {
       const allSplitMessages = [];
       
-      // 모든 메시지를 미리 분할하고 총 지연 시간 계산
-      data.replies.forEach((replyText, index) => {
+      // 우표 설명과 편지 내용을 제외한 일반 메시지만 먼저 처리
+      const regularReplies = data.replies.filter(text => 
+        !text.includes('우표') && 
+        !text.includes('stamp') &&
+        !text.startsWith('To.') &&  
+        !text.startsWith('to.') &&  
+        !text.includes('년 전의') && 
+        !text.includes('년 후의')    
+      );
+      
+      // 메시지 분할 및 총 시간 계산
+      regularReplies.forEach((replyText, index) => {
         const splitMessages = splitLongMessage(replyText, 100);
         allSplitMessages.push({ messages: splitMessages, originalIndex: index });
         totalDelay += splitMessages.length * 800;
       });
       
-      // 메시지 순차적으로 표시
+      // 순차적으로 표시
       let currentDelay = 0;
       allSplitMessages.forEach((item, index) => {
         item.messages.forEach((msg, subIndex) => {
           setTimeout(() => {
-            const showAvatar = index === 0 && subIndex === 0;
+            const showAvatar = !continued && index === 0 && subIndex === 0;
             appendMessage("bot", msg, null, { showAvatar });
             scrollToBottomSmooth();
           }, currentDelay);
           currentDelay += 800;
         });
       });
+    }
+    
+    // 2단계: 앞의 메시지가 모두 끝난 후 우표 설명 표시
+    const stampDescription = data.stamp_description;
+    const stampCode = data.stamp_code;
+    
+    // 우표 설명 메시지에 새 이름 적용
+    let processedStampDescription = stampDescription;
+    if (stampDescription && stampCode && STAMP_NAMES[stampCode]) {
+      const stampName = STAMP_NAMES[stampCode];
       
-      // 재입장 관련 키워드 확인
-      const isReentranceMessage = message && (
-        message.includes("재입장") || 
-        message.includes("다시 입장") ||
-        message.includes("우체국에 재입장")
+      processedStampDescription = processedStampDescription.replace(
+        /^이건 [^.]* 우표(?:야|지)\.\s*/,
+        ''
       );
-      const isReentranceInReplies = data.replies?.some(reply => 
-        reply && (reply.includes("재입장") || reply.includes("다시 입장"))
+      
+      processedStampDescription = processedStampDescription.replace(
+        /자 너의 편지에 붙어 있었던 우표다\./,
+        `이 우표의 이름은 ${stampName}이다.`
       );
-      const hasReentranceButton = data.buttons?.some(btn => 
-        btn.includes("재입장") || btn.includes("다시 입장")
+      processedStampDescription = processedStampDescription.replace(
+        /좋아\. 다시 한번 보여주지\. 자 너의 편지에 붙어 있었던 우표다\./,
+        `좋아. 다시 한번 보여주지. 이 우표의 이름은 ${stampName}이다.`
       );
+    }
+    
+    const stampReplies = processedStampDescription 
+      ? [processedStampDescription] 
+      : extractStampOnly(Array.isArray(data.replies) ? data.replies : []);
+    
+    if (stampReplies.length) {
+      // 앞의 메시지 완료 후 1초 대기 후 우표 설명 시작
+      const stampStartDelay = totalDelay + 1000;
       
-      // 모든 메시지가 끝난 후 이미지 표시
-      setTimeout(() => {
-        if (data.image) {
-          setTimeout(() => {
-            appendMessage("bot", "", data.image, { showAvatar: false });
-            scrollToBottomSmooth();
+      // 우표 설명을 문장 단위로 분할하여 순차 표시
+      const stampSentences = stampReplies[0].split(/(?<=[.?!])\s+/);
+      
+      stampSentences.forEach((sentence, index) => {
+        setTimeout(() => {
+          const showAvatar = totalDelay === 0 && index === 0; // 앞에 메시지가 없었으면 첫 우표 메시지에 아바타
+          appendMessage("bot", sentence.trim(), null, { showAvatar });
+          scrollToBottomSmooth();
+        }, stampStartDelay + index * 800);
+      });
+      
+      // 3단계: 우표 설명 완료 후 봉투 미리보기
+      setTimeout(async () => {
+        const stampSrc = data.stamp_image || (data.stamp_code ? `/static/images/chatbot/stamp/${data.stamp_code}.png` : null);
+        showEnvelopePreview(await letterPromise, data.buttons || [], stampSrc);
+      }, stampStartDelay + stampSentences.length * 800 + 500);
+    } else {
+      // 우표 설명이 없으면 앞의 메시지 후 바로 봉투
+      setTimeout(async () => {
+        const stampSrc = data.stamp_image || (data.stamp_code ? `/static/images/chatbot/stamp/${data.stamp_code}.png` : null);
+        showEnvelopePreview(await letterPromise, data.buttons || [], stampSrc);
+      }, totalDelay + 500);
+    }
+    return; 
+  }
+
+  // 일반 연속 메시지
+  if (Array.isArray(data.replies)) {
+    let totalDelay = 0;
+    const allSplitMessages = [];
+    
+    // 모든 메시지를 미리 분할하고 총 지연 시간 계산
+    data.replies.forEach((replyText, index) => {
+      const splitMessages = splitLongMessage(replyText, 100);
+      allSplitMessages.push({ messages: splitMessages, originalIndex: index });
+      totalDelay += splitMessages.length * 800;
+    });
+    
+    // 메시지 순차적으로 표시
+    let currentDelay = 0;
+    allSplitMessages.forEach((item, index) => {
+      item.messages.forEach((msg, subIndex) => {
+        setTimeout(() => {
+          const showAvatar = !continued && index === 0 && subIndex === 0;
+          appendMessage("bot", msg, null, { showAvatar });
+          scrollToBottomSmooth();
+        }, currentDelay);
+        currentDelay += 800;
+      });
+    });
+    
+    // 재입장 관련 키워드 확인
+    const isReentranceMessage = message && (
+      message.includes("재입장") || 
+      message.includes("다시 입장") ||
+      message.includes("우체국에 재입장")
+    );
+    const isReentranceInReplies = data.replies?.some(reply => 
+      reply && (reply.includes("재입장") || reply.includes("다시 입장"))
+    );
+    const hasReentranceButton = data.buttons?.some(btn => 
+      btn.includes("재입장") || btn.includes("다시 입장")
+    );
+    
+    // 모든 메시지가 끝난 후 이미지 표시
+    setTimeout(() => {
+      if (data.image) {
+        setTimeout(() => {
+          appendMessage("bot", "", data.image, { showAvatar: false });
+          scrollToBottomSmooth();
+          
+          // 이미지 후 추가 메시지가 있으면 표시
+          if (Array.isArray(data.replies_after_image) && data.replies_after_image.length > 0) {
+            let afterImageDelay = 500; // 이미지 후 대기 시간
             
-            // 이미지 후 추가 메시지가 있으면 표시
-            if (Array.isArray(data.replies_after_image) && data.replies_after_image.length > 0) {
-              let afterImageDelay = 500; // 이미지 후 대기 시간
-              
-              data.replies_after_image.forEach((replyText, index) => {
-                const splitMessages = splitLongMessage(replyText, 100);
-                splitMessages.forEach((msg, subIndex) => {
-                  setTimeout(() => {
-                    appendMessage("bot", msg, null, { showAvatar: false });
-                    scrollToBottomSmooth();
-                  }, afterImageDelay);
-                  afterImageDelay += 800;
-                });
+            data.replies_after_image.forEach((replyText, index) => {
+              const splitMessages = splitLongMessage(replyText, 100);
+              splitMessages.forEach((msg, subIndex) => {
+                setTimeout(() => {
+                  appendMessage("bot", msg, null, { showAvatar: false });
+                  scrollToBottomSmooth();
+                }, afterImageDelay);
+                afterImageDelay += 800;
               });
-              
-              // 이미지 후 메시지까지 모두 끝난 후 버튼 표시 또는 재입장 처리
-              setTimeout(() => {
-                if ((isReentranceMessage && (isReentranceInReplies || hasReentranceButton)) || hasReentranceButton) {
-                  if (hasReentranceButton) {
-                    renderButtons(data.buttons);
-                    setInputEnabled(false);
-                  } else {
-                    reEnterPostOffice();
-                  }
-                } else {
-                  if (data.buttons?.length) {
-                    renderButtons(data.buttons);
-                    setInputEnabled(false);
-                  } else {
-                    setInputEnabled(true);
-                  }
-                }
-              }, afterImageDelay);
-            } else {
-              // 이미지 후 메시지가 없으면 바로 버튼 표시 또는 재입장 처리
+            });
+            
+            // 이미지 후 메시지까지 모두 끝난 후 버튼 표시 또는 재입장 처리
+            setTimeout(() => {
               if ((isReentranceMessage && (isReentranceInReplies || hasReentranceButton)) || hasReentranceButton) {
                 if (hasReentranceButton) {
-                  setTimeout(() => {
-                    renderButtons(data.buttons);
-                    setInputEnabled(false);
-                  }, 500);
+                  renderButtons(data.buttons);
+                  setInputEnabled(false);
                 } else {
-                  setTimeout(() => {
-                    reEnterPostOffice();
-                  }, 500);
+                  reEnterPostOffice();
                 }
               } else {
                 if (data.buttons?.length) {
-                  setTimeout(() => {
-                    renderButtons(data.buttons);
-                    setInputEnabled(false);
-                  }, 500);
+                  renderButtons(data.buttons);
+                  setInputEnabled(false);
                 } else {
                   setInputEnabled(true);
                 }
               }
-            }
-          }, 300);
-        } else {
-          if ((isReentranceMessage && (isReentranceInReplies || hasReentranceButton)) || hasReentranceButton) {
-            if (hasReentranceButton) {
-              setTimeout(() => {
-                renderButtons(data.buttons);
-                setInputEnabled(false);
-              }, 200);
-            } else {
-              setTimeout(() => {
-                reEnterPostOffice();
-              }, 200);
-            }
+            }, afterImageDelay);
           } else {
-            if (data.buttons?.length) {
-              setTimeout(() => {
-                renderButtons(data.buttons);
-                setInputEnabled(false);
-              }, 200);
+            // 이미지 후 메시지가 없으면 바로 버튼 표시 또는 재입장 처리
+            if ((isReentranceMessage && (isReentranceInReplies || hasReentranceButton)) || hasReentranceButton) {
+              if (hasReentranceButton) {
+                setTimeout(() => {
+                  renderButtons(data.buttons);
+                  setInputEnabled(false);
+                }, 500);
+              } else {
+                setTimeout(() => {
+                  reEnterPostOffice();
+                }, 500);
+              }
             } else {
-              setInputEnabled(true);
+              if (data.buttons?.length) {
+                setTimeout(() => {
+                  renderButtons(data.buttons);
+                  setInputEnabled(false);
+                }, 500);
+              } else {
+                setInputEnabled(true);
+              }
             }
           }
+        }, 300);
+      } else {
+        if ((isReentranceMessage && (isReentranceInReplies || hasReentranceButton)) || hasReentranceButton) {
+          if (hasReentranceButton) {
+            setTimeout(() => {
+              renderButtons(data.buttons);
+              setInputEnabled(false);
+            }, 200);
+          } else {
+            setTimeout(() => {
+              reEnterPostOffice();
+            }, 200);
+          }
+        } else {
+          if (data.buttons?.length) {
+            setTimeout(() => {
+              renderButtons(data.buttons);
+              setInputEnabled(false);
+            }, 200);
+          } else {
+            setInputEnabled(true);
+          }
         }
-      }, totalDelay);
-      
-      return;
-    }
+      }
+    }, totalDelay);
+    
+    return;
+  }
 
-    let replyText, imagePath;
-    if (typeof data.reply === "object" && data.reply !== null) {
-      replyText = data.reply.reply || data.reply;
-      imagePath = data.reply.image || null;
-    } else {
-      replyText = data.reply;
-      imagePath = data.image || null;
-    }
+  let replyText, imagePath;
+  if (typeof data.reply === "object" && data.reply !== null) {
+    replyText = data.reply.reply || data.reply;
+    imagePath = data.reply.image || null;
+  } else {
+    replyText = data.reply;
+    imagePath = data.image || null;
+  }
 
-    appendMessage("bot", replyText, imagePath);
-    
-    // 재입장 관련 처리: 사용자 메시지나 봇 응답에 재입장 관련 키워드가 있으면 재입장 처리
-    const isReentranceMessage = message && (
-      message.includes("재입장") || 
-      message.includes("다시 입장") ||
-      message.includes("우체국에 재입장")
-    );
-    const isReentranceResponse = replyText && (
-      replyText.includes("재입장") || 
-      replyText.includes("다시 입장")
-    );
-    const hasReentranceButton = data.buttons?.some(btn => 
-      btn.includes("재입장") || btn.includes("다시 입장")
-    );
-    
-    if ((isReentranceMessage && (isReentranceResponse || hasReentranceButton)) || hasReentranceButton) {
-      // 재입장 버튼이 있으면 버튼 클릭을 기다리고, 없으면 바로 재입장 처리
-      if (hasReentranceButton) {
-        // 버튼이 있으면 버튼 클릭을 기다림 (버튼 클릭 핸들러에서 처리됨)
-        if (data.buttons?.length) {
-          renderButtons(data.buttons);
-          setInputEnabled(false);
-        }
-      } else {
-        // 버튼이 없고 사용자가 재입장을 요청했으면 바로 재입장 처리
-        setTimeout(() => {
-          reEnterPostOffice();
-        }, 500);
-      }
-    } else {
+  appendMessage("bot", replyText, imagePath);
+  
+  // 재입장 관련 처리: 사용자 메시지나 봇 응답에 재입장 관련 키워드가 있으면 재입장 처리
+  const isReentranceMessage = message && (
+    message.includes("재입장") || 
+    message.includes("다시 입장") ||
+    message.includes("우체국에 재입장")
+  );
+  const isReentranceResponse = replyText && (
+    replyText.includes("재입장") || 
+    replyText.includes("다시 입장")
+  );
+  const hasReentranceButton = data.buttons?.some(btn => 
+    btn.includes("재입장") || btn.includes("다시 입장")
+  );
+  
+  if ((isReentranceMessage && (isReentranceResponse || hasReentranceButton)) || hasReentranceButton) {
+    // 재입장 버튼이 있으면 버튼 클릭을 기다리고, 없으면 바로 재입장 처리
+    if (hasReentranceButton) {
+      // 버튼이 있으면 버튼 클릭을 기다림 (버튼 클릭 핸들러에서 처리됨)
       if (data.buttons?.length) {
         renderButtons(data.buttons);
         setInputEnabled(false);
-      } else setInputEnabled(true);
+      }
+    } else {
+      // 버튼이 없고 사용자가 재입장을 요청했으면 바로 재입장 처리
+      setTimeout(() => {
+        reEnterPostOffice();
+      }, 500);
     }
-
-  } catch (err) {
-    console.error("메시지 전송 에러:", err);
-    removeMessage(loadingId);
-    appendMessage("bot", "죄송합니다. 오류가 발생했습니다. 다시 시도해주세요.");
+  } else {
+    if (data.buttons?.length) {
+      renderButtons(data.buttons);
+      setInputEnabled(false);
+    } else setInputEnabled(true);
   }
 }
 
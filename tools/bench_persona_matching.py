@@ -0,0 +1,105 @@
+"""
+페르소나(RAG-P) 키워드 매칭 벤치마크
+
+owl_persona.json의 memory_vault를 스토리 수천 개 규모로 부풀려,
+기존 방식(스토리마다 `kw in combined_text` 반복)과 PersonaIndex(Aho–Corasick 한 번 훑기)를 비교합니다.
+두 방식의 매칭 결과(스토리, 키워드, 점수)가 같은지도 함께 확인합니다.
+('훑기'는 자동자 스캔만의 시간 - 스토리 수와 무관, 나머지는 맞은 스토리 수에 비례)
+
+사용법:
+    python tools/bench_persona_matching.py
+    python tools/bench_persona_matching.py --scales 25 500 5000 20000 --context-chars 4000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.persona_index import PersonaIndex
+
+PERSONA_PATH = Path(__file__).parent.parent / "static" / "data" / "chatbot" / "chardb_text" / "owl_persona.json"
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호기니디리미비시이지치"
+
+
+def scale_vault(memory_vault: dict, target: int, rng: random.Random) -> dict:
+    """원본 스토리를 복제해 target개로 늘림 (복제본 키워드 일부는 새 단어로 바꿔 자동자 크기도 함께 증가)"""
+    originals = [(c, sid, s) for c, d in memory_vault.items() for sid, s in d.get("stories", {}).items()]
+    vault = {c: {"stories": dict(d.get("stories", {}))} for c, d in memory_vault.items()}
+    i = 0
+    while sum(len(d["stories"]) for d in vault.values()) < target:
+        category, story_id, story = originals[i % len(originals)]
+        keywords = [kw if rng.random() < 0.5 else "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+                    for kw in story["trigger_keywords"]]
+        vault[category]["stories"][f"{story_id}_{i}"] = dict(story, trigger_keywords=keywords)
+        i += 1
+    return vault
+
+
+def naive_match(memory_vault: dict, text: str) -> list:
+    """변경 전 _search_persona의 매칭 루프"""
+    matches = []
+    for category, category_data in memory_vault.items():
+        if "stories" not in category_data:
+            continue
+        for story_id, story_data in category_data["stories"].items():
+            if "trigger_keywords" not in story_data:
+                continue
+            matched = [kw for kw in story_data["trigger_keywords"] if kw in text]
+            if matched:
+                matches.append((category, story_id, story_data, matched, len(matched)))
+    return matches
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페르소나 키워드 매칭 (기존 vs Aho–Corasick)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[25, 250, 2500, 10000], help="스토리 수")
+    parser.add_argument("--context-chars", type=int, default=3000, help="유저 메시지 + 요약 길이")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    persona = json.loads(PERSONA_PATH.read_text(encoding="utf-8"))
+    vocabulary = [kw for d in persona["memory_vault"].values()
+                  for s in d.get("stories", {}).values() for kw in s.get("trigger_keywords", [])]
+    words = []
+    while sum(len(w) + 1 for w in words) < args.context_chars:
+        words.append(rng.choice(vocabulary) if rng.random() < 0.1 else
+                     "".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))))
+    text = " ".join(words).lower()
+
+    print("\n" + "=" * 60)
+    print(f"🦉 페르소나 매칭: combined_text {len(text):,}자")
+    print("=" * 60)
+    print(f"\n{'스토리 수':>10}{'빌드 ms':>10}{'기존 ms':>10}{'자동자 ms':>11}{'훑기 ms':>10}{'매칭':>8}{'배속':>8}")
+    for scale in args.scales:
+        vault = scale_vault(persona["memory_vault"], scale, rng)
+        start = time.perf_counter()
+        index = PersonaIndex(vault)
+        build = (time.perf_counter() - start) * 1000
+        expected = [(c, sid, kws, n) for c, sid, _, kws, n in naive_match(vault, text)]
+        got = [(c, sid, kws, n) for c, sid, _, kws, n in index.match(text)]
+        assert got == expected, f"매칭 결과 불일치 (스토리 {scale}개)"
+        before = timed(lambda: naive_match(vault, text), args.repeat)
+        after = timed(lambda: index.match(text), args.repeat)
+        scan = timed(lambda: index.automaton.find(text), args.repeat)
+        print(f"{len(index.stories):>10,}{build:>10.1f}{before:>10.2f}{after:>11.2f}{scan:>10.2f}"
+              f"{len(got):>8,}{before / after:>7.1f}x")
+    print("\n✅ 모든 규모에서 매칭 결과 동일")
+
+
+if __name__ == "__main__":
+    main()
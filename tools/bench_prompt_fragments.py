@@ -0,0 +1,98 @@
+"""
+턴당 프롬프트 조립 비용 마이크로벤치마크
+
+상담 턴(Phase 3 / 3.5 질문 / 서랍)의 시스템 프롬프트에 들어가는 정적 조각을 조립하는 비용을 비교합니다.
+
+- before: 턴마다 페르소나 섹션 json.dumps(indent=2) 3회 + counselor_principles.txt 읽기 + 캐릭터 정보 보간
+- after : PromptFragments 캐시 조회 + 보간 (파일 stat 확인은 check_interval마다)
+
+사용법:
+    python tools/bench_prompt_fragments.py
+    python tools/bench_prompt_fragments.py --turns 20000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.prompt_fragments import PromptFragments
+
+TEXT_DIR = Path(__file__).parent.parent / "static" / "data" / "chatbot" / "chardb_text"
+PERSONA_PATH = TEXT_DIR / "owl_persona.json"
+CHARACTER_PATH = TEXT_DIR / "owl_character.txt"
+PRINCIPLES_PATH = TEXT_DIR / "guides" / "counselor_principles.txt"
+
+
+def assemble(character_txt: str, persona_json: str, principles: str, username: str) -> str:
+    """시스템 프롬프트의 정적 조각 + 턴마다 바뀌는 값 (실제 프롬프트 구조를 축약)"""
+    return f"""당신은 별빛 우체국의 부엉이 우체국장입니다.
+
+**[부엉이 캐릭터 정보]**
+{character_txt}
+
+- **유저 이름**: {username}
+
+[상담 원칙]
+{principles}
+
+[부엉이의 상세 정보]
+{persona_json}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 조각 캐시 before/after 측정")
+    parser.add_argument("--turns", type=int, default=5000, help="조립 반복 횟수")
+    args = parser.parse_args()
+
+    persona = json.loads(PERSONA_PATH.read_text(encoding="utf-8"))
+    character_txt = CHARACTER_PATH.read_text(encoding="utf-8")
+
+    def before(i: int) -> str:
+        persona_json = "\n".join(
+            json.dumps(persona.get(key, {}), ensure_ascii=False, indent=2)
+            for key in ("core_persona", "preferences", "life_story")
+        )
+        try:
+            principles = PRINCIPLES_PATH.read_text(encoding="utf-8").strip()
+        except Exception:
+            principles = ""
+        return assemble(character_txt, persona_json, principles, f"user{i}")
+
+    fragments = PromptFragments()
+    fragments.register("persona", [PERSONA_PATH], lambda: json.loads(PERSONA_PATH.read_text(encoding="utf-8")))
+    fragments.register("character_txt", [CHARACTER_PATH], lambda: CHARACTER_PATH.read_text(encoding="utf-8"))
+    fragments.register("counselor_principles", [PRINCIPLES_PATH],
+                       lambda: PRINCIPLES_PATH.read_text(encoding="utf-8").strip())
+    fragments.register("persona_json", [PERSONA_PATH], lambda: "\n".join(
+        json.dumps(fragments.get("persona").get(key, {}), ensure_ascii=False, indent=2)
+        for key in ("core_persona", "preferences", "life_story")
+    ))
+    fragments.warm()
+
+    def after(i: int) -> str:
+        return assemble(fragments.get("character_txt"), fragments.get("persona_json"),
+                        fragments.get("counselor_principles"), f"user{i}")
+
+    assert before(0) == after(0), "캐시된 조각이 원래 조립 결과와 다릅니다"
+
+    print("\n" + "=" * 60)
+    print(f"🧩 프롬프트 조립: {args.turns}턴 (프롬프트 {len(after(0)):,}자)")
+    print("=" * 60)
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        start = time.perf_counter()
+        for i in range(args.turns):
+            fn(i)
+        results[name] = (time.perf_counter() - start) / args.turns * 1e6
+        print(f"   {name:<7} {results[name]:>9.1f} µs/턴")
+    print(f"\n   {results['before'] / results['after']:.0f}배 빠름 (조각 재생성 {fragments.builds}회)")
+
+
+if __name__ == "__main__":
+    main()
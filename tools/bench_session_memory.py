@@ -0,0 +1,121 @@
+"""
+상주 세션 메모리 벤치마크
+
+50턴(메시지 100개) 세션을 저장소에서 읽어 올린 상태를 가정하고,
+세션 1개가 차지하는 메모리를 tracemalloc으로 측정합니다.
+
+- before: 인스턴스 __dict__ 세션 + 메시지마다 {"role", "content"} dict (JSON 로드 그대로)
+- after : __slots__ PostOfficeSession + Message 레코드 (role intern)
+
+사용법:
+    python tools/bench_session_memory.py
+    python tools/bench_session_memory.py --sessions 2000 --turns 50
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.chatbot_service import PostOfficeSession
+
+USER_LINES = [
+    "요즘 너무 지쳐서 아무것도 하기 싫어요",
+    "헤어진 지 한 달이 됐는데 아직도 생각나요",
+    "시험을 망쳐서 부모님께 말을 못 하겠어요",
+    "제가 뭘 좋아하는지도 잘 모르겠어요",
+    "친구들이랑 멀어진 것 같아서 불안해요",
+]
+OWL_LINES = [
+    "흐음. 그 마음이 꽤 오래 쌓여 있었던 모양이군.",
+    "(장부를 넘기며) 그때 자네가 가장 하고 싶었던 말은 무엇이었나?",
+    "서두를 필요는 없네. 여기선 시간이 천천히 흐르니까.",
+    "그 선택이 틀렸다고 단정하기엔, 자네는 너무 많은 걸 견뎌왔네.",
+]
+
+
+class DictSession:
+    """변경 전 표현: 인스턴스 __dict__ + dict 메시지"""
+
+    def __init__(self, data: dict):
+        for name in PostOfficeSession.__slots__:
+            setattr(self, name, data.get(name))
+        self.conversation_history = data["conversation_history"]
+        self.used_persona_stories = set(data.get("used_persona_stories", []))
+        self.used_persona_categories = set(data.get("used_persona_categories", []))
+
+
+def make_log(index: int, turns: int, rng: random.Random) -> tuple:
+    """세션 하나의 (상태 dict, JSONL 대화 로그)"""
+    state = PostOfficeSession(f"user{index}").to_dict()
+    state.update({"phase": 3, "selected_room": "love", "room_conversation_count": turns})
+    lines = []
+    for t in range(turns):
+        lines.append(json.dumps({"role": "user", "content": f"{rng.choice(USER_LINES)} ({index}-{t})"}, ensure_ascii=False))
+        lines.append(json.dumps({"role": "assistant", "content": f"{rng.choice(OWL_LINES)} ({index}-{t})"}, ensure_ascii=False))
+    return state, lines
+
+
+def measure(build, logs: list) -> int:
+    """logs 전체를 build로 올렸을 때 늘어난 메모리 (bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    resident = [build(state, lines) for state, lines in logs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resident
+    return after - before
+
+
+def build_before(state: dict, lines: list):
+    data = dict(state)
+    data["conversation_history"] = [json.loads(line) for line in lines]
+    return DictSession(data)
+
+
+def build_after(state: dict, lines: list):
+    data = dict(state)
+    data["conversation_history"] = [json.loads(line) for line in lines]
+    return PostOfficeSession.from_dict(data)
+
+
+def build_content_only(state: dict, lines: list):
+    return [json.loads(line)["content"] for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상주 세션 메모리 (before/after) 측정")
+    parser.add_argument("--sessions", type=int, default=1000, help="동시에 올릴 세션 수")
+    parser.add_argument("--turns", type=int, default=50, help="세션당 대화 턴 수 (턴당 메시지 2개)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    logs = [make_log(i, args.turns, rng) for i in range(args.sessions)]
+
+    print("\n" + "=" * 60)
+    print(f"🧠 상주 세션 메모리: {args.sessions}개 × {args.turns}턴")
+    print("=" * 60)
+
+    content = measure(build_content_only, logs) / args.sessions
+    results = {
+        "before": measure(build_before, logs) / args.sessions,
+        "after": measure(build_after, logs) / args.sessions,
+    }
+    for name, per_session in results.items():
+        print(f"   {name:<7} {per_session / 1024:>8.1f} KiB/세션 "
+              f"(대화 본문 제외 오버헤드 {(per_session - content) / 1024:>6.1f} KiB)")
+    saved = results["before"] - results["after"]
+    print(f"\n   절감: {saved / 1024:.1f} KiB/세션 ({saved / results['before']:.1%}), "
+          f"1만 세션 기준 {saved * 10000 / 1024 / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
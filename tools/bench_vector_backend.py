@@ -0,0 +1,112 @@
+"""
+캐릭터 코퍼스 검색 백엔드 벤치마크 (ChromaDB HNSW vs NumPy 인메모리)
+
+chardb_embedding의 post_office_memories 컬렉션을 그대로 읽어
+같은 쿼리 벡터로 두 백엔드의 지연 시간(p50/p99)과 top-k 결과 일치율을 비교합니다.
+쿼리 벡터는 저장된 청크 임베딩에 잡음을 더해 만들므로 임베딩 API를 호출하지 않습니다.
+쿼리 형태는 서비스의 _search_room_context와 같음 (방 필터 없이 1회, n_results는 서비스와 같은 계산식).
+
+사용법:
+    python tools/bench_vector_backend.py
+    python tools/bench_vector_backend.py --queries 500 --top-k 5 --overfetch 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+import numpy as np
+
+from services.chatbot_service import ChatbotService
+from services.vector_index import NumpyVectorIndex
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+DB_PATH = BASE_DIR / "static" / "data" / "chatbot" / "chardb_embedding"
+
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run(backend, queries: list, n_results: int) -> tuple:
+    """(지연 ms 목록, 쿼리별 id 목록)"""
+    latencies = []
+    results = []
+    for vector in queries:
+        start = time.perf_counter()
+        got = backend.query(
+            query_embeddings=[vector],
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"]
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(got["ids"][0])
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB vs NumPy 검색 백엔드 지연 시간 비교")
+    parser.add_argument("--queries", type=int, default=300, help="측정할 쿼리 수")
+    parser.add_argument("--top-k", type=int, default=5, help="_search_room_context의 top_k")
+    parser.add_argument("--overfetch", type=int, default=int(os.getenv("RAG_OVERFETCH", "6")),
+                        help="RAG_OVERFETCH (n_results = ChatbotService._rag_query_size(top_k, overfetch))")
+    parser.add_argument("--noise", type=float, default=0.02, help="쿼리 벡터에 더할 가우시안 잡음 표준편차")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("⏱️  검색 백엔드 벤치마크")
+    print("=" * 60)
+
+    client = chromadb.PersistentClient(path=str(DB_PATH))
+    collection = client.get_collection("post_office_memories")
+    start = time.perf_counter()
+    index = NumpyVectorIndex.from_collection(collection)
+    print(f"\n📚 문서 {collection.count()}개 / NumPy 인덱스 구성 {(time.perf_counter() - start) * 1000:.1f}ms")
+    if index.count() == 0:
+        print("❌ 컬렉션이 비어 있습니다. 서버를 한 번 띄워 인덱싱한 뒤 실행하세요.")
+        return
+
+    rng = random.Random(args.seed)
+    np_rng = np.random.default_rng(args.seed)
+    stored = collection.get(include=["embeddings"])["embeddings"]
+    queries = []
+    for _ in range(args.queries):
+        base = np.asarray(rng.choice(stored), dtype=np.float32)
+        vector = (base + np_rng.normal(0, args.noise, base.shape).astype(np.float32)).tolist()
+        queries.append(vector)
+
+    n_results = ChatbotService._rag_query_size(args.top_k, args.overfetch)
+    # 워밍업 (HNSW 인덱스 로드 등)
+    run(collection, queries[:10], n_results)
+    run(index, queries[:10], n_results)
+
+    chroma_ms, chroma_ids = run(collection, queries, n_results)
+    numpy_ms, numpy_ids = run(index, queries, n_results)
+
+    overlap = [
+        len(set(a[:args.top_k]) & set(b[:args.top_k])) / max(1, min(args.top_k, len(a)))
+        for a, b in zip(chroma_ids, numpy_ids)
+    ]
+    exact = sum(a[:args.top_k] == b[:args.top_k] for a, b in zip(chroma_ids, numpy_ids))
+
+    print(f"\n📊 {len(queries)}개 쿼리 (n_results={n_results})")
+    print(f"   {'backend':<8}{'p50':>10}{'p99':>10}{'mean':>10}")
+    for name, samples in (("chroma", chroma_ms), ("numpy", numpy_ms)):
+        print(f"   {name:<8}{percentile(samples, 50):>8.3f}ms{percentile(samples, 99):>8.3f}ms"
+              f"{sum(samples) / len(samples):>8.3f}ms")
+    print(f"\n   top-{args.top_k} 겹침 평균: {sum(overlap) / len(overlap):.1%} "
+          f"(순서까지 동일 {exact}/{len(queries)}, 차이는 HNSW 근사 오차)")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,8 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 
+from services.embedding_store import EmbeddingStore, wrap_langchain_embeddings
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -30,6 +32,9 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent.parent
 PDF_DIR = BASE_DIR / "static" / "data" / "chatbot" / "source_pdfs"
 VECTOR_DB_DIR = BASE_DIR / "static" / "data" / "chatbot" / "counseling_vectordb"
+EMBEDDING_CACHE_PATH = Path(os.getenv(
+    "EMBEDDING_CACHE_PATH", str(BASE_DIR / "static" / "data" / "chatbot" / "embedding_cache.sqlite3")
+))
 
 
 def load_pdfs() -> List[Document]:
@@ -112,10 +117,15 @@ def build_vectordb(chunks: List[Document]):
     
     # 임베딩 모델 초기화
     print(f"   🧠 OpenAI 임베딩 모델 로드 중...")
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-small",  # 빠르고 효율적
-        openai_api_key=api_key,
-        chunk_size=100  # ⭐ 배치 크기 제한 (토큰 제한 회피)
+    # ⭐ 챗봇 서비스와 같은 영속 캐시 사용 (재구축 시 이미 임베딩한 청크는 API 호출 생략)
+    embeddings = wrap_langchain_embeddings(
+        OpenAIEmbeddings(
+            model="text-embedding-3-small",  # 빠르고 효율적
+            openai_api_key=api_key,
+            chunk_size=100  # ⭐ 배치 크기 제한 (토큰 제한 회피)
+        ),
+        EmbeddingStore(EMBEDDING_CACHE_PATH),
+        "text-embedding-3-small"
     )
     
     # 기존 벡터 DB 삭제 (재구축)
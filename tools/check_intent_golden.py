@@ -0,0 +1,381 @@
+"""
+의도 감지기 골든 테스트 (세션 재생)
+
+services/intent_detector.py(INTENT_TABLE 컴파일 + 메시지당 scan 한 번)로 바꾸기 전의
+키워드 검사 코드를 그대로 옮겨 둔 LEGACY 구현과, 현재 ChatbotService의 분기 결정이
+메시지마다 같은지 확인합니다.
+
+재생하는 메시지:
+- 저장된 세션(sessions/session_*.json, SQLite)의 유저 메시지 전부
+- 버튼 문구, INTENT_TABLE의 모든 키워드와 그 변형(띄어쓰기/대문자/"말고"/물음표)
+- 키워드를 무작위로 섞은 문장 (--random)
+
+비교하는 결정: 위기/회복, 반복 의도 키, 재입장, 편지 확인 예/아니오, 조기 편지 요청, 의문문,
+방 선택("말고" 포함), 방 변경 요청(현재 방별), 거부(Phase 3 / 질문·서랍), 상담 필요(방 / 서랍),
+부엉이 감정(세션 상태 × 위기 × 거부 × LLM 감정 조합)
+
+사용법:
+    python tools/check_intent_golden.py
+    python tools/check_intent_golden.py --random 20000 --db static/data/chatbot/sessions/sessions.sqlite3
+"""
+
+import argparse
+import io
+import itertools
+import random
+import re
+import sqlite3
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.chatbot_service import ChatbotService
+from services.intent_detector import INTENT_TABLE, ROOM_ORDER, IntentDetector
+from services.session_store import FileSessionStore
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+SESSION_DIR = BASE_DIR / "static" / "data" / "chatbot" / "sessions"
+
+BUTTONS = [
+    "init", "저에게 온 편지요?", "나에게 온 편지라고?", "'후회'의 방", "'사랑'의 방", "'불안'의 방", "'꿈'의 방",
+    "응 편지를 받을래", "아니, 더 대화할래", "응, 다시 시작할래", "아니, 계속 할래",
+    "응, 우체국에 재입장할래", "아니, 이 방에서 계속 할래", "별빛 우체국에 다시 한번 입장",
+    "별빛 우체국에 한번 더 입장하시겠습니까?",
+]
+FILLERS = ["", " ", "음", "그냥", "오늘은", "너무", "정말", "Hello", "?", "…", "ㅠㅠ", "왜", "그래서", "\n"]
+
+
+# ============================================
+# LEGACY: 통합 감지기 도입 전 코드 (원문 그대로)
+# ============================================
+
+def legacy_detect_crisis(text):
+    if not text:
+        return False
+    t = text.lower()
+    crisis_keywords = ["자살", "극단적", "죽고", "해치", "학대", "폭력", "살고싶지", "위험"]
+    return any(k in t for k in crisis_keywords)
+
+
+def legacy_detect_crisis_recovery(text):
+    if not text:
+        return False
+    t = text.lower()
+    recovery_keywords = [
+        "괜찮", "나아", "좀 나은", "괜춘", "좀 낫", "좀 나아졌",
+        "덜 힘들", "조금 나은", "좀 좋", "회복", "나아지",
+        "괜찮아졌", "괜찮아져", "괜찮아질", "좀 괜찮"
+    ]
+    return any(k in t for k in recovery_keywords)
+
+
+def legacy_normalize_intent_key(text):
+    if not text:
+        return ""
+    t = text.lower().strip()
+    letter_now_tokens = [
+        "편지나", "편지내놔", "편지줘", "편지 줘", "편지주세요", "편지 주세요",
+        "편지출력", "편지 출력", "편지를", "편지", "바로 편지", "편지 바로"
+    ]
+    if any(tok.replace(" ", "") in t.replace(" ", "") for tok in letter_now_tokens):
+        return "ask_letter_now"
+    base = re.sub(r"\s+", " ", re.sub(r"[^\w\s가-힣]", " ", t)).strip()
+    return base
+
+
+def legacy_detect_reenter(text):
+    if not text:
+        return False
+    t = text.replace(" ", "").lower()
+    phrases = [
+        "별빛우체국에한번더입장하시겠습니까?",
+        "다시입장",
+        "처음부터다시",
+        "다시시작",
+        "별빛우체국에다시한번입장",
+        "다시한번입장",
+    ]
+    return any(p in t for p in phrases)
+
+
+def legacy_detect_letter_confirm_yes(text):
+    if not text:
+        return False
+    t = text.replace(" ", "").lower()
+    yes = ["응편지를받을래", "편지를받을래", "편지받을게", "편지받기"]
+    return any(p in t for p in yes)
+
+
+def legacy_detect_letter_confirm_no(text):
+    if not text:
+        return False
+    t = text.replace(" ", "").lower()
+    no = ["아니더대화할래", "더대화할래", "계속대화", "대화계속"]
+    return any(p in t for p in no)
+
+
+def legacy_is_early_letter_request(user_message):
+    keywords = [
+        "편지줬", "편지를줘", "편지받고싶", "편지내놔", "편지줘", "편지주세요", "편지출력",
+        "그만", "싫어", "시러", "꺼져", "필요없", "불쾌", "하기싫", "묻지마"
+    ]
+    t = user_message.lower().replace(" ", "")
+    return any(k in t for k in keywords)
+
+
+def legacy_is_question(user_message):
+    t = user_message.strip()
+    lowers = t.lower()
+    return t.endswith("?") or lowers.startswith("왜") or lowers.startswith("무슨") or lowers.startswith("어째서")
+
+
+def legacy_detect_room_selection(user_message, exclude_before_malggo=False):
+    message = user_message
+    message_lower = user_message.lower()
+    if exclude_before_malggo and "말고" in message:
+        message = message.split("말고", 1)[1]
+        message_lower = message.lower()
+    if '후회' in message or 'regret' in message_lower:
+        return 'regret'
+    elif '사랑' in message or 'love' in message_lower:
+        return 'love'
+    elif '불안' in message or 'anxiety' in message_lower:
+        return 'anxiety'
+    elif '꿈' in message or 'dream' in message_lower:
+        return 'dream'
+    return None
+
+
+def legacy_detect_room_change_request(user_message, current_room):
+    change_keywords = [
+        "방으로", "방 가고", "방에 가", "다른 방", "바꾸고", "이동",
+        "말고", "대신", "방을", "방 할래", "방 하고", "가고 싶",
+        "바꿀래", "옮기고", "변경"
+    ]
+    has_change_intent = any(keyword in user_message for keyword in change_keywords)
+    if not has_change_intent:
+        return {"type": None, "room": None}
+    requested_room = legacy_detect_room_selection(user_message, exclude_before_malggo=True)
+    if requested_room and requested_room != current_room:
+        return {"type": "specific", "room": requested_room}
+    if requested_room and requested_room == current_room:
+        return {"type": "same", "room": current_room}
+    if "다른 방" in user_message or "방 바꾸" in user_message or "방 변경" in user_message:
+        return {"type": "any", "room": None}
+    return {"type": None, "room": None}
+
+
+def legacy_is_rejection(user_message):
+    rejection_keywords = ["시러", "싫어", "꺼져", "불쾌", "필요없", "그만", "하기싫", "묻지마"]
+    user_lower = user_message.lower().replace(" ", "")
+    return any(keyword in user_lower for keyword in rejection_keywords)
+
+
+def legacy_is_rejection_direct(user_message):
+    rejection_keywords_q = ["꺼져", "시러", "싫어", "불쾌", "필요없", "그만"]
+    return any(k in user_message for k in rejection_keywords_q)
+
+
+def legacy_needs_counseling(user_message):
+    crisis_keywords = ["우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민",
+                       "죽고", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠"]
+    return any(k in user_message for k in crisis_keywords)
+
+
+def legacy_needs_counseling_drawer(user_message):
+    crisis_keywords_drawer = ["우울", "불안", "힘들", "무서", "두렵", "걱정", "슬프", "외로", "고민",
+                              "죽", "자해", "자살", "극단", "아프", "괴롭", "지쳐", "버티", "견디", "잠"]
+    return any(k in user_message for k in crisis_keywords_drawer)
+
+
+def legacy_determine_owl_emotion(user_message, session, user_emotion, is_crisis=False, is_rejection=False):
+    if hasattr(session, 'awaiting_reenter_confirm') and session.awaiting_reenter_confirm:
+        return "의문"
+    if hasattr(session, 'awaiting_room_change_confirm') and session.awaiting_room_change_confirm:
+        return "의문"
+    early_letter_keywords = ["편지", "내놓", "줘", "보내줘", "빨리", "그만", "끝"]
+    if any(k in user_message for k in early_letter_keywords):
+        if session.phase == 3 and session.room_conversation_count < 3:
+            return "의문"
+        if session.phase == 3.5 and session.drawer_conversation_count < 2:
+            return "의문"
+    reenter_keywords = ["다시", "처음", "새로", "재입장", "리셋"]
+    if any(k in user_message for k in reenter_keywords) and any(w in user_message for w in ["시작", "입장", "해", "할래"]):
+        return "의문"
+    if user_message.strip().endswith("?") or user_message.strip().endswith("？"):
+        return "의문"
+    if is_rejection:
+        return "분노"
+    if any(pattern in user_message for pattern in ["너가 싫어", "너는 싫어", "넌 싫어", "당신 싫어", "부엉 싫어"]):
+        return "분노"
+    direct_attack_keywords = ["꺼져", "시러", "불쾌", "까먹", "필요없"]
+    if any(k in user_message for k in direct_attack_keywords):
+        return "분노"
+    if is_crisis:
+        return "슬픔"
+    crisis_keywords = ["죽고", "자살", "자해", "극단", "끝", "포기"]
+    if any(k in user_message for k in crisis_keywords):
+        return "슬픔"
+    sad_keywords = ["슬프", "힘들", "우울", "불안", "무서", "두렵", "걱정", "후회", "미안", "아프", "괴롭", "외로",
+                    "실패", "망했", "이별", "헤어", "떠나", "차였", "버림", "잃", "상실", "그리워", "보고싶"]
+    if any(k in user_message for k in sad_keywords):
+        return "슬픔"
+    if session.phase in [4, 5]:
+        return "기쁨"
+    joy_keywords = ["행복", "기쁨", "만족", "감사", "고마", "즐거", "웃"]
+    hope_keywords = ["하고싶", "희망", "바라", "소망"]
+    if any(k in user_message for k in hope_keywords):
+        return "기본"
+    if any(k in user_message for k in joy_keywords):
+        return "기쁨"
+    emotion_map = {"JOY": "기쁨", "SADNESS": "슬픔", "ANGER": "분노", "QUESTION": "의문", "BASIC": "기본"}
+    return emotion_map.get(user_emotion, "기본")
+
+
+# 부엉이 감정 조합: (phase, 방 대화 수, 서랍 대화 수) × 위기 × 거부 × LLM 감정
+EMOTION_CASES = [
+    (SimpleNamespace(phase=phase, room_conversation_count=count, drawer_conversation_count=count,
+                     awaiting_reenter_confirm=False, awaiting_room_change_confirm=False),
+     emotion, is_crisis, is_rejection)
+    for phase, count, emotion, is_crisis, is_rejection in itertools.product(
+        (3, 3.5, 4), (0, 5), ("BASIC", "JOY", "SADNESS"), (False, True), (False, True))
+]
+
+
+def legacy_decisions(message: str) -> dict:
+    return {
+        "crisis": legacy_detect_crisis(message),
+        "crisis_recovery": legacy_detect_crisis_recovery(message),
+        "intent_key": legacy_normalize_intent_key(message),
+        "reenter": legacy_detect_reenter(message),
+        "letter_confirm_yes": legacy_detect_letter_confirm_yes(message),
+        "letter_confirm_no": legacy_detect_letter_confirm_no(message),
+        "early_letter_request": legacy_is_early_letter_request(message),
+        "is_question": legacy_is_question(message),
+        "room": legacy_detect_room_selection(message),
+        "room_after_malggo": legacy_detect_room_selection(message, exclude_before_malggo=True),
+        "room_change": [legacy_detect_room_change_request(message, room) for room in (None,) + ROOM_ORDER],
+        "rejection": legacy_is_rejection(message),
+        "rejection_direct": legacy_is_rejection_direct(message),
+        "needs_counseling": legacy_needs_counseling(message),
+        "needs_counseling_drawer": legacy_needs_counseling_drawer(message),
+        "owl_emotion": [legacy_determine_owl_emotion(message, s, e, c, r) for s, e, c, r in EMOTION_CASES],
+    }
+
+
+def current_decisions(service, message: str) -> dict:
+    """현재 _generate_response가 쓰는 방식 그대로: scan 한 번 → 모든 분기가 같은 features 사용"""
+    features = service.intent_detector.scan(message)
+    with redirect_stdout(io.StringIO()):  # 방 변경 감지 디버그 로그 숨김
+        room_change = [service._detect_room_change_request(message, room, features) for room in (None,) + ROOM_ORDER]
+    return {
+        "crisis": "crisis" in features,
+        "crisis_recovery": "crisis_recovery" in features,
+        "intent_key": features.intent_key,
+        "reenter": "reenter" in features,
+        "letter_confirm_yes": "letter_confirm_yes" in features,
+        "letter_confirm_no": "letter_confirm_no" in features,
+        "early_letter_request": "early_letter_request" in features,
+        "is_question": features.is_question,
+        "room": features.room,
+        "room_after_malggo": features.room_after_malggo,
+        "room_change": room_change,
+        "rejection": "rejection" in features,
+        "rejection_direct": "rejection_direct" in features,
+        "needs_counseling": "needs_counseling" in features,
+        "needs_counseling_drawer": "needs_counseling_drawer" in features,
+        "owl_emotion": [service._determine_owl_emotion(message, s, e, c, r, features=features)
+                        for s, e, c, r in EMOTION_CASES],
+    }
+
+
+def session_messages(db_path: Path = None) -> list:
+    """저장된 세션의 유저 메시지 (파일 + SQLite)"""
+    messages = []
+    source = FileSessionStore(SESSION_DIR)
+    for path in sorted(SESSION_DIR.glob("session_*.json")):
+        try:
+            data = source.load_file(path)
+        except Exception as e:
+            print(f"   ⚠️  {path.name} 건너뜀 (읽기 실패): {e}")
+            continue
+        messages.extend(m["content"] for m in data.get("conversation_history") or [] if m["role"] == "user")
+    if db_path and db_path.exists():
+        conn = sqlite3.connect(str(db_path))
+        rows = conn.execute("SELECT content FROM messages WHERE role = 'user' ORDER BY username, seq").fetchall()
+        conn.close()
+        messages.extend(content for (content,) in rows)
+    return messages
+
+
+def synthetic_messages(count: int, seed: int) -> list:
+    """키워드/버튼 문구와 그 변형 + 무작위 조합"""
+    keywords = sorted({kw for _, _, kws in INTENT_TABLE for kw in kws})
+    messages = list(BUTTONS) + ["", " ", "?", "？", "말고"]
+    for kw in keywords:
+        messages += [kw, kw.upper(), " ".join(kw), f"{kw}?", f"왜 {kw}", f"  {kw}  ",
+                     f"{kw} 말고 사랑의 방으로", f"사랑 말고 {kw}", f"다른 방 {kw}"]
+    rng = random.Random(seed)
+    vocabulary = keywords + BUTTONS + FILLERS
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 5))]
+        message = rng.choice(["", " "]).join(words)
+        if rng.random() < 0.2:
+            message = message.upper()
+        messages.append(message)
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의도 감지기 골든 테스트 (기존 키워드 검사와 결정 비교)")
+    parser.add_argument("--random", type=int, default=5000, help="무작위 조합 문장 수")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", type=Path, help="함께 재생할 SQLite 세션 DB")
+    parser.add_argument("--max-diffs", type=int, default=10, help="출력할 불일치 수")
+    args = parser.parse_args()
+
+    # 감지 메서드만 쓰므로 클라이언트/벡터DB 없이 감지기만 붙임
+    service = ChatbotService.__new__(ChatbotService)
+    service.intent_detector = IntentDetector()
+
+    print("\n" + "=" * 60)
+    print("🧪 의도 감지기 골든 테스트")
+    print("=" * 60)
+    recorded = session_messages(args.db)
+    synthetic = synthetic_messages(args.random, args.seed)
+    print(f"\n📂 세션 유저 메시지 {len(recorded)}개 + 합성 메시지 {len(synthetic)}개")
+
+    diffs = []
+    decisions = 0
+    for message in recorded + synthetic:
+        expected = legacy_decisions(message)
+        got = current_decisions(service, message)
+        decisions += sum(len(v) if isinstance(v, list) else 1 for v in expected.values())
+        for name in expected:
+            if expected[name] != got[name]:
+                diffs.append((message, name, expected[name], got[name]))
+
+    timings = {}
+    for name, fn in (("기존", legacy_decisions), ("현재", lambda m: current_decisions(service, m))):
+        start = time.perf_counter()
+        for message in synthetic:
+            fn(message)
+        timings[name] = (time.perf_counter() - start) / len(synthetic) * 1000
+    print(f"⏱️  메시지당 결정 {len(expected)}종 계산: 기존 {timings['기존']:.3f} ms / 현재 {timings['현재']:.3f} ms")
+
+    if diffs:
+        print(f"\n❌ 불일치 {len(diffs)}건")
+        for message, name, expected, got in diffs[:args.max_diffs]:
+            print(f"   {name}: {message!r}\n      기존={expected}\n      현재={got}")
+        sys.exit(1)
+    print(f"\n✅ 결정 {decisions:,}개 모두 동일")
+
+
+if __name__ == "__main__":
+    main()
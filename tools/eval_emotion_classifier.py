@@ -0,0 +1,186 @@
+"""
+감정 분류기 오프라인 평가 스크립트
+
+저장된 세션 파일(sessions/session_*.json)의 유저 메시지를 재생하여
+로컬 어휘 분류기와 LLM(gpt-4o) 감정 라벨의 일치율을 측정합니다.
+
+LLM 라벨은 --labels 파일에 캐시되므로, 한 번 라벨링한 메시지는
+다시 API를 호출하지 않습니다.
+
+사용법:
+    python tools/eval_emotion_classifier.py
+    python tools/eval_emotion_classifier.py --no-llm          # 캐시된 라벨만 사용
+    python tools/eval_emotion_classifier.py --min-confidence 0.6
+    python tools/eval_emotion_classifier.py --no-llm --sweep  # 임계값별 일치율/LLM 대체 비율 (EMOTION_MIN_CONFIDENCE 보정)
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from services.emotion_classifier import EMOTION_LABELS, LexiconEmotionClassifier
+from services.session_store import FileSessionStore
+
+# 환경 변수 로드
+load_dotenv()
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+SESSION_DIR = BASE_DIR / "static" / "data" / "chatbot" / "sessions"
+DEFAULT_LABELS_PATH = BASE_DIR / "static" / "data" / "chatbot" / "emotion_eval_labels.json"
+
+
+def load_user_messages() -> list:
+    """세션 파일에서 유저 메시지 추출 (init/버튼 입력 포함, 중복 제거)"""
+    messages = []
+    seen = set()
+    store = FileSessionStore(SESSION_DIR)
+    for path in sorted(SESSION_DIR.glob("session_*.json")):
+        try:
+            data = store.load_file(path)
+        except Exception as e:
+            print(f"   ⚠️  {path.name} 건너뜀: {e}")
+            continue
+        for msg in data.get("conversation_history", []):
+            text = (msg.get("content") or "").strip()
+            if msg.get("role") != "user" or not text or text.lower() == "init" or text in seen:
+                continue
+            seen.add(text)
+            messages.append(text)
+    return messages
+
+
+def load_labels(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def fetch_llm_labels(messages: list, labels: dict, path: Path) -> dict:
+    """
+    캐시에 없는 메시지만 LLM으로 라벨링 후 저장
+
+    호출 실패나 유효하지 않은 응답은 BASIC으로 바꾸지 않고 중단 (그때까지 받은 라벨만 저장)
+    """
+    missing = [m for m in messages if m not in labels]
+    if not missing:
+        return labels
+
+    from openai import OpenAI
+    from services.chatbot_service import ChatbotService
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다!")
+
+    # 서비스 전체(ChromaDB, RAG-D 등)를 초기화하지 않고 OpenAI 클라이언트만 붙여 실제 분류 메서드 사용
+    service = ChatbotService.__new__(ChatbotService)
+    service._client = OpenAI(api_key=api_key)
+    service._client_lock = threading.Lock()
+
+    print(f"\n🏷️  LLM 라벨링: {len(missing)}개 메시지")
+    try:
+        for i, text in enumerate(missing, 1):
+            label = service._classify_emotion_llm(text)
+            if label not in EMOTION_LABELS:
+                raise ValueError(f"유효하지 않은 LLM 라벨 {label!r}: {text[:40]}")
+            labels[text] = label
+            print(f"   [{i}/{len(missing)}] {label:<8} {text[:40]}")
+    finally:
+        path.write_text(json.dumps(labels, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"   💾 라벨 캐시 저장: {path}")
+    return labels
+
+
+def sweep(messages: list, labels: dict, thresholds: list):
+    """임계값별 hybrid 일치율 / LLM 대체 비율"""
+    classifier = LexiconEmotionClassifier()
+    rows = [(classifier.classify(m), labels[m]) for m in messages if m in labels]
+    if not rows:
+        return
+    print(f"\n   {'임계값':>8}{'hybrid 일치율':>14}{'LLM 대체':>10}")
+    for threshold in thresholds:
+        fallback = sum(1 for (_, conf), _ in rows if conf < threshold)
+        agree = sum(1 for (pred, conf), gold in rows if conf >= threshold and pred == gold) + fallback
+        print(f"   {threshold:>8.2f}{agree / len(rows):>14.1%}{fallback / len(rows):>10.1%}")
+
+
+def evaluate(messages: list, labels: dict, min_confidence: float):
+    """일치율 / 혼동 행렬 / LLM 대체 비율 / 지연 시간 출력"""
+    classifier = LexiconEmotionClassifier()
+    rows = [m for m in messages if m in labels]
+    if not rows:
+        print("\n❌ 평가할 라벨이 없습니다.")
+        return
+
+    confusion = Counter()
+    agree = 0
+    agree_confident = 0
+    confident = 0
+    start = time.perf_counter()
+    predictions = [classifier.classify(text) for text in rows]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for text, (pred, conf) in zip(rows, predictions):
+        gold = labels[text]
+        confusion[(gold, pred)] += 1
+        if pred == gold:
+            agree += 1
+        if conf >= min_confidence:
+            confident += 1
+            if pred == gold:
+                agree_confident += 1
+
+    # hybrid 모드: 저신뢰도는 LLM 라벨을 그대로 쓰게 되므로 일치로 계산
+    hybrid_agree = agree_confident + (len(rows) - confident)
+
+    print(f"\n📊 평가 결과 ({len(rows)}개 메시지)")
+    print(f"   local  일치율: {agree / len(rows):.1%}")
+    print(f"   hybrid 일치율: {hybrid_agree / len(rows):.1%} "
+          f"(LLM 대체 {len(rows) - confident}건 = {(len(rows) - confident) / len(rows):.1%})")
+    print(f"   로컬 분류 지연: 평균 {elapsed_ms / len(rows) * 1000:.1f}µs/메시지")
+
+    print(f"\n   혼동 행렬 (행: LLM, 열: local)")
+    print("   " + " " * 9 + "".join(f"{p:>9}" for p in EMOTION_LABELS))
+    for gold in EMOTION_LABELS:
+        print(f"   {gold:<9}" + "".join(f"{confusion[(gold, p)]:>9}" for p in EMOTION_LABELS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 감정 분류기 vs LLM 라벨 일치율 평가")
+    parser.add_argument("--labels", type=Path, default=DEFAULT_LABELS_PATH, help="LLM 라벨 캐시 JSON 경로")
+    parser.add_argument("--no-llm", action="store_true", help="LLM 호출 없이 캐시된 라벨만 사용")
+    parser.add_argument("--min-confidence", type=float,
+                        default=float(os.getenv("EMOTION_MIN_CONFIDENCE", "0.55")),
+                        help="hybrid 모드의 LLM 대체 임계값")
+    parser.add_argument("--sweep", action="store_true", help="임계값 0.30~0.90별 일치율/LLM 대체 비율 출력")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("🧪 감정 분류기 오프라인 평가")
+    print("=" * 60)
+
+    messages = load_user_messages()
+    print(f"\n📚 세션에서 유저 메시지 {len(messages)}개 로드")
+
+    labels = load_labels(args.labels)
+    if not args.no_llm:
+        labels = fetch_llm_labels(messages, labels, args.labels)
+
+    evaluate(messages, labels, args.min_confidence)
+    if args.sweep:
+        sweep(messages, labels, [round(0.3 + 0.05 * i, 2) for i in range(13)])
+
+
+if __name__ == "__main__":
+    main()
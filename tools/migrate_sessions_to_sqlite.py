@@ -0,0 +1,93 @@
+"""
+세션 파일 → SQLite 마이그레이션 스크립트
+
+sessions/session_*.json (예전 단일 JSON 형식과 헤더 + .log.jsonl 형식 모두)을 읽어
+SqliteSessionStore로 옮깁니다. 이미 DB에 있는 유저는 --overwrite 없이는 건너뜁니다.
+원본 파일은 읽기만 하고(로그의 커밋되지 않은 꼬리도 자르지 않음) 지우지 않으므로,
+확인 후 SESSION_BACKEND=sqlite로 전환하면 됩니다. --dry-run은 어떤 파일도 바꾸지 않습니다.
+
+사용법:
+    python tools/migrate_sessions_to_sqlite.py
+    python tools/migrate_sessions_to_sqlite.py --db static/data/chatbot/sessions/sessions.sqlite3 --overwrite
+    python tools/migrate_sessions_to_sqlite.py --dry-run
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from services.session_store import FileSessionStore, SqliteSessionStore
+
+# 환경 변수 로드
+load_dotenv()
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+SESSION_DIR = BASE_DIR / "static" / "data" / "chatbot" / "sessions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 JSON 파일을 SQLite 세션 저장소로 이전")
+    parser.add_argument("--db", type=Path,
+                        default=Path(os.getenv("SESSION_DB_PATH") or SESSION_DIR / "sessions.sqlite3"),
+                        help="대상 SQLite 파일 경로")
+    parser.add_argument("--overwrite", action="store_true", help="DB에 이미 있는 유저도 파일 내용으로 덮어쓰기")
+    parser.add_argument("--dry-run", action="store_true", help="읽기만 하고 DB에 쓰지 않음")
+    parser.add_argument("--batch", type=int, default=100, help="한 트랜잭션에 커밋할 세션 수")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("🗄️  세션 마이그레이션: 파일 → SQLite")
+    print("=" * 60)
+
+    source = FileSessionStore(SESSION_DIR)
+    target = None if args.dry_run else SqliteSessionStore(args.db)
+    paths = sorted(SESSION_DIR.glob("session_*.json"))
+    print(f"\n📂 세션 파일 {len(paths)}개 ({SESSION_DIR})")
+
+    batch = []
+    migrated = skipped = failed = messages = 0
+    for path in paths:
+        try:
+            data = source.load_file(path)  # 읽기 전용 (헤더의 log_bytes까지만 읽음)
+        except Exception as e:
+            print(f"   ⚠️  {path.name} 건너뜀 (읽기 실패): {e}")
+            failed += 1
+            continue
+        username = data.get("username")
+        if not username:
+            print(f"   ⚠️  {path.name} 건너뜀 (username 없음)")
+            failed += 1
+            continue
+        # 기존 행을 읽어 두어야 --overwrite 저장이 version 비교(CAS)를 통과함
+        if target is not None and target.load(username) is not None:
+            if not args.overwrite:
+                skipped += 1
+                continue
+            target.forget(username)
+        data["conversation_history"] = list(data.get("conversation_history", []))
+        messages += len(data["conversation_history"])
+        batch.append((username, data))
+        migrated += 1
+        if target is not None and len(batch) >= args.batch:
+            target.save_many(batch)
+            batch = []
+    if target is not None and batch:
+        target.save_many(batch)
+
+    print(f"\n✅ 이전 {migrated}개 (메시지 {messages}개) / 건너뜀 {skipped}개 / 실패 {failed}개")
+    if args.dry_run:
+        print("   (dry-run: DB에 쓰지 않았습니다)")
+    else:
+        print(f"   💾 {args.db}")
+        print("   .env에 SESSION_BACKEND=sqlite 를 설정하면 서버가 이 DB를 사용합니다.")
+
+
+if __name__ == "__main__":
+    main()
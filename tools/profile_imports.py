@@ -0,0 +1,82 @@
+"""
+import 시간 프로파일 (콜드 스타트 추적용)
+
+새 파이썬 프로세스에서 `python -X importtime`으로 대상 모듈을 import하고,
+모듈별 누적 시간(ms, 하위 import 포함)을 집계합니다. 릴리스마다 --save로 저장해 두고 --compare로 비교하세요.
+
+사용법:
+    python tools/profile_imports.py                          # services.chatbot_service
+    python tools/profile_imports.py --module app --top 15
+    python tools/profile_imports.py --save import_profile.json
+    python tools/profile_imports.py --compare import_profile.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def profile(module: str) -> tuple:
+    """(모듈별 누적 ms, 전체 ms, 에러 메시지)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    modules = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative)  # 최상위 import만 합산 (하위 import는 들여쓰기, 누적에 이미 포함)
+        modules[name.strip()] = int(cumulative) / 1000
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return modules, total_us / 1000, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 프로파일")
+    parser.add_argument("--module", default="services.chatbot_service", help="import할 모듈")
+    parser.add_argument("--top", type=int, default=20, help="출력할 모듈 수 (누적 시간 순)")
+    parser.add_argument("--save", type=Path, help="결과를 JSON으로 저장")
+    parser.add_argument("--compare", type=Path, help="이전에 저장한 JSON과 비교")
+    args = parser.parse_args()
+
+    modules, total, error = profile(args.module)
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  import 프로파일: {args.module}")
+    print("=" * 60)
+    if error:
+        print(f"\n❌ import 실패: {error}")
+        sys.exit(1)
+
+    previous = {}
+    if args.compare:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))
+    prev_modules = previous.get("modules", {})
+
+    print(f"\n{'모듈':<40}{'누적 ms':>10}{'변화':>10}")
+    for name, ms in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+        delta = f"{ms - prev_modules[name]:+.1f}" if name in prev_modules else "new" if prev_modules else ""
+        print(f"{name:<40}{ms:>10.1f}{delta:>10}")
+    total_delta = f" ({total - previous['total_ms']:+.1f})" if "total_ms" in previous else ""
+    print(f"\n📊 전체: {total:.1f} ms{total_delta}")
+
+    if args.save:
+        args.save.write_text(json.dumps(
+            {"module": args.module, "total_ms": round(total, 1),
+             "modules": {k: round(v, 1) for k, v in modules.items()}},
+            ensure_ascii=False, indent=2
+        ), encoding="utf-8")
+        print(f"💾 {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+세션 동시성 스트레스 테스트
+
+여러 유저가 동시에, 그리고 같은 유저가 같은 메시지를 여러 번(더블클릭) 보내는 상황을
+스레드 풀로 재현하여 세션 상태가 일관되게 유지되는지 확인합니다.
+
+- OpenAI 클라이언트는 지연만 흉내 내는 가짜 클라이언트로 대체 (API 호출/비용 없음)
+- ChromaDB / RAG-D는 띄우지 않음 (세션 경로만 검사, 실제 벡터 DB에 가짜 임베딩이 들어가지 않도록)
+- 세션/임베딩 캐시는 임시 디렉터리에 기록
+- 세션 캐시 크기를 유저 수보다 작게 잡아 evict → 재로드 경로도 함께 검사
+
+검사 항목:
+1. 같은 유저의 턴이 겹쳐 실행된 적이 없는지
+2. 모든 기록이 끝난 뒤 저장소에서 다시 읽은 세션이 메모리 세션과 같은지
+
+사용법:
+    python tools/stress_session_concurrency.py
+    python tools/stress_session_concurrency.py --users 20 --turns 15 --dup 3 --backend sqlite
+    python tools/stress_session_concurrency.py --no-lock      # 유저별 락을 끄면 1번 검사가 실패해야 함
+"""
+
+import argparse
+import contextlib
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+# 프로젝트 루트 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+USER_LINES = [
+    "요즘 너무 지쳐요", "헤어진 사람이 자꾸 생각나요", "시험이 불안해요",
+    "꿈이 뭔지 모르겠어요", "친구랑 멀어졌어요", "응", "잘 모르겠어", "고마워",
+]
+
+
+class FakeOpenAI:
+    """지연만 흉내 내는 OpenAI 클라이언트 (chat.completions.create / embeddings.create)"""
+
+    def __init__(self, latency: float = 0.02, **kwargs):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _sleep(self):
+        time.sleep(random.uniform(0, self.latency))
+
+    def _chat(self, model=None, messages=None, stream=False, **kwargs):
+        self._sleep()
+        content = "흐음. 그 이야기를 조금 더 들려주겠나?"
+        if stream:
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+                for piece in (content[:10], content[10:])
+            )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _embed(self, model=None, input=None, **kwargs):
+        self._sleep()
+        texts = input if isinstance(input, list) else [input]
+        data = []
+        for text in texts:
+            seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+            rng = random.Random(seed)
+            data.append(SimpleNamespace(embedding=[rng.uniform(-1, 1) for _ in range(64)]))
+        return SimpleNamespace(data=data)
+
+
+def build_service(args, workdir: Path):
+    """격리된 임시 저장소 + 가짜 클라이언트로 ChatbotService 생성"""
+    os.environ.setdefault("OPENAI_API_KEY", "stress-test")
+    os.environ["EMBEDDING_CACHE_PATH"] = str(workdir / "embedding_cache.sqlite3")
+    os.environ["SESSION_CACHE_MAX"] = str(max(1, args.users // 2))
+    os.environ["SESSION_FLUSH_INTERVAL"] = "0.05"
+    os.environ["EMOTION_BACKEND"] = "local"
+
+    import openai
+    from services import chatbot_service as cs
+    from services.session_store import create_session_store
+
+    # 서비스는 첫 호출 때 openai.OpenAI를 가져오므로 모듈 속성을 바꿔 둠
+    openai.OpenAI = lambda **kwargs: FakeOpenAI(latency=args.latency)
+    cs.ChatbotService._init_chromadb = lambda self: None
+    cs.ChatbotService._init_counseling_vectordb = lambda self: None
+    cs.create_session_store = lambda backend, base_dir, **kwargs: create_session_store(
+        args.backend, workdir / "sessions", tail_messages=kwargs.get("tail_messages", 60),
+        db_path=workdir / "sessions.sqlite3"
+    )
+    service = cs.ChatbotService()
+    if args.no_lock:
+        service._user_lock = lambda username, blocking=True: contextlib.nullcontext(True)
+    return service, cs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 동시성 스트레스 테스트")
+    parser.add_argument("--users", type=int, default=12)
+    parser.add_argument("--turns", type=int, default=10, help="유저당 메시지 수")
+    parser.add_argument("--dup", type=int, default=2, help="메시지당 동시 전송 횟수 (더블클릭)")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02, help="가짜 API 최대 지연(초)")
+    parser.add_argument("--backend", choices=["file", "sqlite"], default="file")
+    parser.add_argument("--no-lock", action="store_true", help="유저별 락 비활성화 (검사가 실패하는지 확인용)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="stress_sessions_"))
+    service, cs = build_service(args, workdir)
+
+    # 같은 유저의 턴이 겹치는지 계측
+    active = {}
+    overlaps = []
+    guard = threading.Lock()
+    original = service._generate_response
+
+    def instrumented(user_message, username, on_token=None):
+        with guard:
+            active[username] = active.get(username, 0) + 1
+            if active[username] > 1:
+                overlaps.append(username)
+        try:
+            return original(user_message, username, on_token)
+        finally:
+            with guard:
+                active[username] -= 1
+
+    service._generate_response = instrumented
+
+    users = [f"stress{i}" for i in range(args.users)]
+    rng = random.Random(7)
+    print("\n" + "=" * 60)
+    print(f"🔥 세션 동시성 스트레스: 유저 {args.users} × 메시지 {args.turns} × 동시 {args.dup} "
+          f"(backend={args.backend}, lock={'off' if args.no_lock else 'on'})")
+    print("=" * 60)
+
+    errors = []
+
+    def send(username, message):
+        try:
+            service.generate_response(message, username)
+        except Exception as e:
+            errors.append(f"{username}: {e!r}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(lambda u: send(u, "init"), users))
+        futures = []
+        for turn in range(args.turns):
+            for username in users:
+                message = f"{rng.choice(USER_LINES)} #{turn}"
+                futures.extend(pool.submit(send, username, message) for _ in range(args.dup))
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    requests = args.users * (1 + args.turns * args.dup)
+
+    # 모든 기록을 마친 뒤 저장소에서 다시 읽어 메모리 세션과 비교
+    # (writer 스레드를 멈추고 join한 뒤 남은 것만 기록 - 다른 스레드에서 flush()를 겹쳐 부르지 않음)
+    service._session_writer.close()
+    mismatched = []
+    for username in users:
+        memory = service.sessions.get(username) or service._session_writer.pending(username)
+        stored = service._load_session(username)
+        if memory is None:
+            continue  # 캐시에서 내려간 세션은 저장소가 유일한 사본
+        if stored is None or stored.to_dict() != memory.to_dict():
+            mismatched.append(username)
+
+    print(f"\n📊 요청 {requests}개 / {elapsed:.2f}s ({requests / elapsed:.0f} req/s)")
+    print(f"   세션 캐시: {service.sessions.stats()}")
+    print(f"   세션 writer: {service._session_writer.stats()}")
+    print(f"   턴 겹침: {len(overlaps)}건 {sorted(set(overlaps))[:5]}")
+    print(f"   저장소 불일치: {len(mismatched)}건 {mismatched[:5]}")
+    print(f"   요청 에러: {len(errors)}건 {errors[:3]}")
+    print(f"   임시 디렉터리: {workdir}")
+
+    ok = not overlaps and not mismatched and not errors
+    print("\n✅ 일관성 유지" if ok else "\n❌ 일관성 깨짐")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
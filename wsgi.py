@@ -0,0 +1,44 @@
+"""
+프로덕션 WSGI 엔트리포인트
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- PRELOAD_SERVICE=1(기본)이면 import 시점(gunicorn master, preload_app)에 ChatbotService를 만들고
+  chardb 인덱싱까지 끝낸 뒤 워커를 fork → 배포 후 첫 요청이 ChromaDB/RAG-D/페르소나 로딩을 기다리지 않음
+- 읽기 전용 데이터(NumPy 인덱스 행렬, 페르소나, 설정)는 fork 후 copy-on-write로 워커끼리 공유
+- 워커별로 새로 만들어야 하는 자원(HTTP/SQLite 연결, 스레드)은 gunicorn.conf.py의 post_fork → after_fork()에서 재초기화
+"""
+
+import gc
+import os
+
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+from app import app  # noqa: E402
+
+_service = None
+
+
+def preload_service():
+    """서비스 생성 + 워밍업 (master 프로세스에서 한 번)"""
+    global _service
+    from services import get_chatbot_service
+
+    _service = get_chatbot_service()
+    _service.warmup()
+    # 지금까지 만든 객체는 GC 추적에서 제외 → 워커의 GC가 공유 페이지를 건드려 복사되는 것 방지
+    gc.freeze()
+    return _service
+
+
+def after_fork():
+    """워커 프로세스에서 호출 (gunicorn post_fork 훅)"""
+    if _service is not None:
+        _service.after_fork()
+
+
+if os.getenv("PRELOAD_SERVICE", "1") == "1":
+    preload_service()